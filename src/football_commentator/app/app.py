@@ -1,18 +1,85 @@
 """Module for the streamlit interface."""
 
 import time
+from contextlib import nullcontext
 from pathlib import Path
 
 import streamlit as st
 
-from football_commentator.constants import PATH_MATCH_INFO, SOURCE_EVENTS
-from football_commentator.data.preprocessor_json import JSONPreprocessor
-from football_commentator.llm import invoke_llm
+from football_commentator.app.render import (
+    CommentaryFeed,
+    CommentaryHistory,
+    render_scoreboard,
+    render_timer,
+)
+from football_commentator.broadcast import CommentaryBroadcast
+from football_commentator.constants import (
+    ADAPTIVE_WINDOWS,
+    EVENTS_SOURCE,
+    FOLLOW_SOURCE_EVENTS,
+    METRICS_PORT,
+    PATH_MATCH_INFO,
+    PROFILE_TICK_PATH,
+    SOURCE_EVENTS,
+)
+from football_commentator.data import get_source
+from football_commentator.data.event_store import MatchEventStore
+from football_commentator.match_state import MatchStateAggregator
+from football_commentator.metrics import METRICS, profile, start_metrics_server
+from football_commentator.pipeline import LookAheadCommentator, WindowScheduler
+from football_commentator.spatial import ZoneHeatmaps
 from football_commentator.utils import load_match_info_from_config
 
 MATCH_INFO = load_match_info_from_config(PATH_MATCH_INFO)
 
 
+@st.cache_resource
+def load_event_store(source: str, streaming: bool) -> MatchEventStore:
+    """Load the events of the game once, shared by all reruns and sessions.
+
+    Args:
+        source (str): path to the events' source.
+        streaming (bool): follow the source while a live feed appends events to it.
+
+    Returns:
+        MatchEventStore: The store of the game's events.
+    """
+    return get_source(EVENTS_SOURCE, source=Path(source), streaming=streaming).event_store
+
+
+@st.cache_resource
+def start_broadcast(source: str, streaming: bool) -> CommentaryBroadcast:
+    """Start generating the commentaries of the game, once for all sessions.
+
+    Args:
+        source (str): path to the events' source.
+        streaming (bool): follow the source while a live feed appends events to it.
+
+    Returns:
+        CommentaryBroadcast: The broadcast of the game's commentaries.
+    """
+    # The LLM stack is only imported when the broadcast starts, once for all sessions
+    from football_commentator.llm import stream_llm
+
+    store = load_event_store(source, streaming)
+    scheduler = WindowScheduler(store)
+    if ADAPTIVE_WINDOWS:
+        # Windows close 3 seconds after a shot, quiet ones are merged
+        scheduler = WindowScheduler(store, close_on_score=10.0, quiet_events=3)
+    # Commentaries are streamed, a late one is shown while it is generated. The state of
+    # the game (score, shots ..) follows the windows, for the prompts and the sidebar, as
+    # the zones where the teams play, for the prompts.
+    commentator = LookAheadCommentator(
+        store,
+        commentate=stream_llm,
+        live=streaming,
+        scheduler=scheduler,
+        match_state=MatchStateAggregator(),
+        heatmaps=ZoneHeatmaps(),
+    )
+    return CommentaryBroadcast(commentator, tick_duration=0.2).start()
+
+
 # ----------------- CSS Styling for the Timer & Commentary Areas -----------------
 st.set_page_config(layout="wide")
 st.markdown(
@@ -60,15 +127,21 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# Metrics of the pipeline are served once for all sessions
+if METRICS_PORT:
+    st.cache_resource(start_metrics_server)(int(METRICS_PORT))
+
+# Commentaries are generated once in background and published to all sessions,
+# the loop below never waits for the LLM
+BROADCAST = start_broadcast(str(SOURCE_EVENTS), streaming=FOLLOW_SOURCE_EVENTS)
+
 # Sesstion state setup with
-if "start_time" not in st.session_state:
-    st.session_state.start_time = time.time()
 if "comment_index" not in st.session_state:
     st.session_state.comment_index = 0
 if "commentary_data" not in st.session_state:
     st.session_state.commentary_data = []
 
-SCORE = {"HOME_TEAM": 0, "AWAY_TEAM": 0}
+MAX_VISIBLE_COMMENTARIES = 20
 
 # ----------------- Sidebar (Left Side) -----------------
 with st.sidebar:
@@ -78,8 +151,9 @@ with st.sidebar:
     </div>
     """
     st.sidebar.markdown(competition_header_html, unsafe_allow_html=True)
-    # Placeholder for the timer
+    # Placeholders for the timer and the score
     timer_placeholder = st.empty()
+    scoreboard_placeholder = st.empty()
 
     # Team Info
     team_html = f"""
@@ -89,27 +163,21 @@ with st.sidebar:
         <div style="text-align: center;">
             <img src="{MATCH_INFO.home_team.logo}" width="80"><br>
             <h2 style="margin-bottom: 5px;">{MATCH_INFO.home_team.name}</h2>
-            <h1 style="margin-top: 0px;">{SCORE["HOME_TEAM"]}</h1>
             <h4 style="margin-bottom: 5px;">Line-up</h4>
             <ul style="list-style: none; padding: 0; text-align: left;">
     """
     for player in MATCH_INFO.home_team.lineup:
         team_html += f"<li>{player.number}.{player.name}</li>"
-    team_html += """
+    team_html += f"""
             </ul>
         </div>
         <!-- AWAY TEAM Block -->
         <div style="text-align: center;">
-            <img src="{away_logo}" width="80"><br>
-            <h2 style="margin-bottom: 5px;">{away_name}</h2>
-            <h1 style="margin-top: 0px;">{away_score}</h1>
+            <img src="{MATCH_INFO.away_team.logo}" width="80"><br>
+            <h2 style="margin-bottom: 5px;">{MATCH_INFO.away_team.name}</h2>
             <h4 style="margin-bottom: 5px;">Line-up</h4>
             <ul style="list-style: none; padding: 0; text-align: left;">
-    """.format(
-        away_logo=MATCH_INFO.away_team.logo,
-        away_name=MATCH_INFO.away_team.name,
-        away_score=SCORE["AWAY_TEAM"],
-    )
+    """
     for player in MATCH_INFO.away_team.lineup:
         team_html += f"<li>{player.number}.{player.name}</li>"
     team_html += """
@@ -128,62 +196,63 @@ with col1:
 with col2:
     st.image(MATCH_INFO.competition.logo, width=80)
 
-# Commentary container placeholder
-commentary_placeholder = st.empty()
-
-# Additional and Starting event: The Kick Off
-st.session_state.commentary_data.append({"Time": "00'00", "Commentary": "Kick Off"})
+# Commentary container: one placeholder per visible entry, only new entries are sent,
+# and one for the entry being generated
+commentary_container = st.container(height=500)
+with commentary_container:
+    commentary_feed = CommentaryFeed(
+        [st.empty() for _ in range(MAX_VISIBLE_COMMENTARIES)], partial_slot=st.empty()
+    )
+commentary_feed.append(st.session_state.commentary_data)
 
-last_minutes, last_secondes = 0, 0
+# Older entries are paginated, counted back from the latest page, which is rendered again
+# when entries leave the feed
+with st.expander("Earlier commentary"):
+    pages_back = st.number_input("Pages back", min_value=0, value=0)
+    commentary_history = CommentaryHistory(
+        st.empty(), page_size=MAX_VISIBLE_COMMENTARIES, pages_back=int(pages_back)
+    )
+commentary_history.update(st.session_state.commentary_data)
 
 # ----------------- Main Loop -----------------
+scoreboard_html = None
+# The first tick is profiled, if requested
+tick_profile = profile(PROFILE_TICK_PATH) if PROFILE_TICK_PATH else nullcontext()
 while True:
-    # Calculate elapsed time for the timer
-    elapsed = time.time() - st.session_state.start_time
-    minutes = int(elapsed // 60)
-    seconds = int(elapsed % 60)
-    timer_str = f"{minutes:02d}'{seconds:02d}"
-
-    # Update the timer in the sidebar with a nice gradient
-    timer_html = f"""
-    <div style="text-align:center; font-size:36px; font-weight:bold;
-         background: linear-gradient(to right, #6a11cb, #2575fc); color:white;
-         padding:10px; border-radius:10px; margin-bottom:10px;">
-         {timer_str}
-    </div>
-    """
-    timer_placeholder.markdown(timer_html, unsafe_allow_html=True)
-
-    # Every 20 seconds, add a new commentary if available
-    if (seconds in (20, 40, 0)) and (minutes != 0 or seconds != 0):
-        new_events = JSONPreprocessor(
-            source=Path(str(SOURCE_EVENTS))
-        ).load_all_events_in_intervall(
-            start=60 * last_minutes + last_secondes,
-            end=60 * minutes + seconds,
+    with tick_profile, METRICS.span("tick"):
+        # Calculate elapsed time for the timer
+        elapsed = BROADCAST.elapsed
+        minutes = int(elapsed // 60)
+        seconds = int(elapsed % 60)
+        timer_str = f"{minutes:02d}'{seconds:02d}"
+
+        # Update the timer in the sidebar, on its own
+        timer_placeholder.markdown(render_timer(timer_str), unsafe_allow_html=True)
+
+        # The score is the state of the game at the clock, sent only when it changes
+        commentator = BROADCAST.commentator
+        if commentator.match_state is not None:
+            state = commentator.match_state.snapshot(
+                commentator.store.elapsed_to_clock(int(1000 * elapsed))
+            )
+            html = render_scoreboard(state, MATCH_INFO.home_team.name, MATCH_INFO.away_team.name)
+            if html != scoreboard_html:
+                scoreboard_placeholder.markdown(html, unsafe_allow_html=True)
+                scoreboard_html = html
+
+        # A new commentary is published by the broadcast at the end of each window
+        new_entries, st.session_state.comment_index = BROADCAST.entries_since(
+            st.session_state.comment_index
         )
-        response = invoke_llm(new_events)
-
-        new_entry = {
-            "Time": timer_str,
-            "Commentary": response,
-        }
-        st.session_state.commentary_data.append(new_entry)
-        st.session_state.comment_index += 1
-        last_minutes, last_secondes = minutes, seconds
-
-    # Build custom HTML for commentary container (no sliding animation)
-    commentary_html = """<div class="commentary-container">"""
-    commentary_html_list = "".join(
-        [
-            f'<div class="commentary-entry"><span class="commentary-time">{entry["Time"]}'
-            f'</span> <span class="commentary-text">{entry["Commentary"]}</span></div>'
-            for entry in st.session_state.commentary_data
-        ]
-    )
-    commentary_html += f"{commentary_html_list}\n</div>"
+        st.session_state.commentary_data.extend(new_entries)
 
-    # Render the commentary container
-    commentary_placeholder.markdown(commentary_html, unsafe_allow_html=True)
+        # Render only the new entries, then the one being generated
+        partial_entry = BROADCAST.partial_entry
+        with METRICS.span("render", entries=len(new_entries)):
+            commentary_feed.append(new_entries)
+            commentary_history.update(st.session_state.commentary_data)
+            commentary_feed.show_partial(partial_entry)
+    tick_profile = nullcontext()
 
-    time.sleep(1)
+    # Refresh faster while a commentary is streamed
+    time.sleep(1 if partial_entry is None else 0.2)
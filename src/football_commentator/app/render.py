@@ -0,0 +1,206 @@
+"""Module to build the HTML of the interface."""
+
+from collections.abc import Sequence
+from typing import Protocol
+
+from football_commentator.match_state import MatchState
+
+
+class Placeholder(Protocol):
+    """Element of the interface whose content can be replaced (e.g. `st.empty()`)."""
+
+    def markdown(self, body: str, unsafe_allow_html: bool = False) -> object:
+        """Replace the content of the element."""
+        ...
+
+
+def render_timer(timer_str: str) -> str:
+    """Build the HTML of the timer, with a nice gradient.
+
+    Args:
+        timer_str (str): The timer (MM'SS).
+
+    Returns:
+        str: The HTML of the timer.
+    """
+    return f"""
+    <div style="text-align:center; font-size:36px; font-weight:bold;
+         background: linear-gradient(to right, #6a11cb, #2575fc); color:white;
+         padding:10px; border-radius:10px; margin-bottom:10px;">
+         {timer_str}
+    </div>
+    """
+
+
+def render_scoreboard(state: MatchState, home_team: str, away_team: str) -> str:
+    """Build the HTML of the score and the statistics of the game.
+
+    Args:
+        state (MatchState): The state of the game.
+        home_team (str): name of the home team, as in the events.
+        away_team (str): name of the away team, as in the events.
+
+    Returns:
+        str: The HTML of the scoreboard.
+    """
+    home, away = state.team(home_team), state.team(away_team)
+    rows = [
+        (
+            "Shots (on target)",
+            f"{home.shots} ({home.shots_on_target})",
+            f"{away.shots} ({away.shots_on_target})",
+        ),
+        ("xG", f"{home.xg:.2f}", f"{away.xg:.2f}"),
+        (
+            "Possession",
+            f"{state.possession_share(home_team):.0%}",
+            f"{state.possession_share(away_team):.0%}",
+        ),
+        ("Yellow cards", home.yellow_cards, away.yellow_cards),
+        ("Red cards", home.red_cards, away.red_cards),
+        ("Substitutions", home.substitutions, away.substitutions),
+    ]
+    stats_html = "".join(
+        f'<tr><td>{home_value}</td><td style="text-align:center;">{label}</td>'
+        f'<td style="text-align:right;">{away_value}</td></tr>'
+        for label, home_value, away_value in rows
+    )
+    return f"""
+    <div style="text-align:center; font-size:40px; font-weight:bold;">
+         {home.goals} - {away.goals}
+    </div>
+    <table style="width:100%; font-size:14px;">{stats_html}</table>
+    """
+
+
+def render_commentary_entry(entry: dict[str, str]) -> str:
+    """Build the HTML of a commentary entry.
+
+    Args:
+        entry (dict[str, str]): The entry, with its 'Time' and 'Commentary'.
+
+    Returns:
+        str: The HTML of the entry.
+    """
+    return (
+        f'<div class="commentary-entry"><span class="commentary-time">{entry["Time"]}'
+        f'</span> <span class="commentary-text">{entry["Commentary"]}</span></div>'
+    )
+
+
+def render_commentary_html(entries: Sequence[dict[str, str]]) -> str:
+    """Build the HTML of a commentary container with all its entries.
+
+    Args:
+        entries (Sequence[dict[str, str]]): The entries.
+
+    Returns:
+        str: The HTML of the container.
+    """
+    commentary_html_list = "".join(render_commentary_entry(entry) for entry in entries)
+    return f'<div class="commentary-container">{commentary_html_list}\n</div>'
+
+
+class CommentaryFeed:
+    """Class to render the latest commentary entries, one placeholder per entry.
+
+    Only new entries are sent to the interface, until `max_visible` entries are shown.
+    Then, the oldest entry leaves the feed, and the visible entries are shifted. The
+    cost of an update is bounded by `max_visible`, whatever the progress of the game.
+    An entry still being generated is rendered apart, below the visible entries.
+    """
+
+    def __init__(self, slots: Sequence[Placeholder], partial_slot: Placeholder | None = None):
+        """Initialize class.
+
+        Args:
+            slots (Sequence[Placeholder]): One placeholder per visible entry, in order.
+            partial_slot (Placeholder | None, optional): Placeholder of the entry being
+                generated. Defaults to None (not rendered).
+        """
+        self.slots = slots
+        self.partial_slot = partial_slot
+        self.visible: list[dict[str, str]] = []
+        self.partial: dict[str, str] | None = None
+
+    @property
+    def max_visible(self) -> int:
+        """Maximal number of visible entries."""
+        return len(self.slots)
+
+    def append(self, new_entries: Sequence[dict[str, str]]) -> int:
+        """Render new entries.
+
+        Args:
+            new_entries (Sequence[dict[str, str]]): The entries published since the last call.
+
+        Returns:
+            int: The number of placeholders updated.
+        """
+        if not new_entries:
+            return 0
+
+        first_new = len(self.visible)
+        self.visible = (self.visible + list(new_entries))[-self.max_visible :]
+        if first_new + len(new_entries) > self.max_visible:
+            first_new = 0  # Visible entries are shifted.
+        for slot, entry in zip(self.slots[first_new:], self.visible[first_new:], strict=False):
+            slot.markdown(render_commentary_entry(entry), unsafe_allow_html=True)
+        return len(self.visible) - first_new
+
+    def show_partial(self, entry: dict[str, str] | None) -> bool:
+        """Render the entry being generated, or clear it.
+
+        Args:
+            entry (dict[str, str] | None): The entry streamed so far, None once published.
+
+        Returns:
+            bool: The placeholder was updated.
+        """
+        if self.partial_slot is None or entry == self.partial:
+            return False
+        self.partial = entry
+        body = "" if entry is None else render_commentary_entry(entry)
+        self.partial_slot.markdown(body, unsafe_allow_html=True)
+        return True
+
+
+class CommentaryHistory:
+    """Class to render a page of the entries that left the feed.
+
+    Pages are counted back from the latest one, so the page shown keeps following the
+    entries leaving the feed. The page is only sent again when entries are added to
+    the history.
+    """
+
+    def __init__(self, slot: Placeholder, page_size: int, pages_back: int = 0):
+        """Initialize class.
+
+        Args:
+            slot (Placeholder): Placeholder of the page.
+            page_size (int): number of entries per page, also the entries of the feed.
+            pages_back (int, optional): page shown, 0 for the latest one. Defaults to 0.
+        """
+        self.slot = slot
+        self.page_size = page_size
+        self.pages_back = pages_back
+        self.size: int | None = None  # Number of entries in the history when rendered
+
+    def update(self, entries: Sequence[dict[str, str]]) -> bool:
+        """Render the page, if entries left the feed since the last call.
+
+        Args:
+            entries (Sequence[dict[str, str]]): All the entries published.
+
+        Returns:
+            bool: The placeholder was updated.
+        """
+        size = max(0, len(entries) - self.page_size)
+        if size == self.size:
+            return False
+        self.size = size
+        # The latest page is the partial one, at the end of the history
+        end = max(0, size - self.pages_back * self.page_size)
+        page = entries[max(0, end - self.page_size) : end]
+        self.slot.markdown(render_commentary_html(page), unsafe_allow_html=True)
+        return True
@@ -0,0 +1,25 @@
+"""Module with the backends providing LLMs."""
+
+from typing import Any
+
+from football_commentator.backends.base import LLMBackend
+from football_commentator.plugins import BACKENDS
+
+
+def get_backend(name: str, **options: Any) -> LLMBackend:
+    """Get a backend by its name.
+
+    Only the selected backend is imported, with its dependencies.
+
+    Args:
+        name (str): name of the backend, 'openai', 'fake', or one registered by another
+            package (entry point 'football_commentator.backends').
+        options (Any): parameters of the backend.
+
+    Raises:
+        ValueError: The backend is unknown.
+
+    Returns:
+        LLMBackend: The backend.
+    """
+    return BACKENDS.create(name, **options)
@@ -0,0 +1,56 @@
+"""Module to define the interface of LLM backends."""
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+class LLMBackend(ABC):
+    """Abstract class of the providers of chat models used to comment on events."""
+
+    name: str
+    # Errors of the provider worth retrying: rate limits (HTTP 429), timeouts,
+    # connection and server errors
+    retryable_errors: tuple[type[Exception], ...] = ()
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Check whether an error of the provider is worth retrying.
+
+        Args:
+            error (BaseException): The error of a call.
+
+        Returns:
+            bool: The error is one of `retryable_errors`.
+        """
+        return isinstance(error, self.retryable_errors)
+
+    @abstractmethod
+    def create_chat_model(self, model_name: str, temperature: float) -> "BaseChatModel":
+        """Create the chat model.
+
+        Args:
+            model_name (str): name of the model.
+            temperature (float): temperature of the model.
+
+        Returns:
+            BaseChatModel: The chat model, to use in a chain.
+        """
+        pass
+
+    def defer_retries(self, timeout: float | None = None) -> None:  # noqa: B027
+        """Leave the retries to a dispatcher, and bound each request by its timeout.
+
+        Called before creating the chat model. The options set explicitly are kept.
+
+        Args:
+            timeout (float | None, optional): maximal duration of a request (in s).
+                Defaults to None.
+        """
+
+    def close(self) -> None:  # noqa: B027
+        """Release the resources of the backend (connections ..)."""
+
+    async def aclose(self) -> None:  # noqa: B027
+        """Release the asynchronous resources of the backend."""
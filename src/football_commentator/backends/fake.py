@@ -0,0 +1,263 @@
+"""Module for a local and deterministic backend, to test and load-test the pipeline."""
+
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from football_commentator.backends.base import LLMBackend
+from football_commentator.encoding import COMPACT_COLUMNS, EVENT_ABBREVIATIONS
+from football_commentator.event import EventType
+from football_commentator.utils import estimate_tokens
+
+OPENINGS = [
+    "What a spell of play!",
+    "The tempo rises here.",
+    "Plenty happening on the pitch.",
+    "The crowd senses something.",
+]
+
+
+class FakeLLMError(RuntimeError):
+    """Simulated failure of the provider."""
+
+
+class FakeRateLimitError(FakeLLMError):
+    """Simulated rate limit of the provider (HTTP 429)."""
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that comments without network, deterministically.
+
+    The commentary only depends on the prompt and the seed. Latency, generation speed,
+    token-rate limit and errors are simulated from seeded random draws.
+    """
+
+    seed: int = 0
+    latency_distribution: str = "fixed"  # "fixed", "uniform" or "lognormal"
+    latency_mean: float = 0.0  # Seconds before the first token
+    latency_spread: float = 0.0  # Half-width (uniform) or sigma (lognormal)
+    tokens_per_second: float | None = None  # Generation speed, None for instant
+    tokens_per_minute: int | None = None  # Provider limit on prompt + completion tokens
+    error_rate: float = 0.0
+    timeout: float | None = None  # Seconds before a synchronous call times out, None for none
+    _random: random.Random = PrivateAttr(default_factory=random.Random)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _usage: deque = PrivateAttr(default_factory=deque)
+
+    def model_post_init(self, context: Any) -> None:
+        """Seed the random draws of the simulation."""
+        self._random.seed(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        """Type of the model."""
+        return "fake-commentator"
+
+    def _commentary(self, prompt: str) -> str:
+        """Comment on a prompt deterministically.
+
+        Args:
+            prompt (str): The prompt.
+
+        Returns:
+            str: The commentary.
+        """
+        digest = int(hashlib.sha256(f"{self.seed}:{prompt}".encode()).hexdigest(), 16)
+        # Events are rows of a table in the compact format, named in full otherwise
+        tokens = {event_type.value: event_type.value for event_type in EventType}
+        if COMPACT_COLUMNS in prompt:
+            tokens = {value: f"|{EVENT_ABBREVIATIONS[value]}|" for value in tokens}
+        counts = {value: prompt.count(token) for value, token in tokens.items() if token in prompt}
+        if not counts:
+            return f"{OPENINGS[digest % len(OPENINGS)]} A quiet moment in the game."
+        main_type = max(counts, key=lambda event_type: (counts[event_type], event_type))
+        return (
+            f"{OPENINGS[digest % len(OPENINGS)]} "
+            f"{sum(counts.values())} actions, mostly {main_type.lower()} "
+            f"(#{digest % 997})."
+        )
+
+    def _simulate(self, prompt: str) -> tuple[str, float, dict[str, int]]:
+        """Draw the outcome of a call.
+
+        Args:
+            prompt (str): The prompt.
+
+        Raises:
+            FakeRateLimitError: The tokens of the last minute exceed the limit.
+            FakeLLMError: The call fails.
+
+        Returns:
+            tuple[str, float, dict[str, int]]: The commentary, the latency (s) and the usage.
+        """
+        commentary = self._commentary(prompt)
+        usage = {
+            "input_tokens": estimate_tokens(prompt),
+            "output_tokens": estimate_tokens(commentary),
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        with self._lock:
+            now = time.monotonic()
+            if self.tokens_per_minute is not None:
+                while self._usage and self._usage[0][0] < now - 60:
+                    self._usage.popleft()
+                used = sum(tokens for _, tokens in self._usage)
+                if used + usage["total_tokens"] > self.tokens_per_minute:
+                    raise FakeRateLimitError("Rate limit reached for tokens per minute.")
+                self._usage.append((now, usage["total_tokens"]))
+
+            if self.latency_distribution == "uniform":
+                latency = self._random.uniform(
+                    self.latency_mean - self.latency_spread,
+                    self.latency_mean + self.latency_spread,
+                )
+            elif self.latency_distribution == "lognormal":
+                latency = self.latency_mean * self._random.lognormvariate(0, self.latency_spread)
+            else:
+                latency = self.latency_mean
+            failed = self._random.random() < self.error_rate
+
+        if self.tokens_per_second:
+            latency += usage["output_tokens"] / self.tokens_per_second
+        if failed:
+            raise FakeLLMError("Simulated provider error.")
+        return commentary, max(0.0, latency), usage
+
+    def _sleep(self, delay: float) -> None:
+        """Wait for a part of the commentary, timing out like an HTTP client.
+
+        Args:
+            delay (float): time before the part (in s).
+
+        Raises:
+            TimeoutError: The part takes longer than the timeout.
+        """
+        if self.timeout is not None and delay > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError("Simulated request timeout.")
+        time.sleep(delay)
+
+    @staticmethod
+    def _result(commentary: str, usage: dict[str, int]) -> ChatResult:
+        """Build the result of a call."""
+        message = AIMessage(content=commentary, usage_metadata=usage)  # type: ignore
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """Comment on the messages."""
+        prompt = "\n".join(str(message.content) for message in messages)
+        commentary, latency, usage = self._simulate(prompt)
+        self._sleep(latency)
+        return self._result(commentary, usage)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """Comment on the messages, without blocking the event loop."""
+        prompt = "\n".join(str(message.content) for message in messages)
+        commentary, latency, usage = self._simulate(prompt)
+        await asyncio.sleep(latency)
+        return self._result(commentary, usage)
+
+    def _chunks(self, messages: list[BaseMessage]) -> Iterator[tuple[float, ChatGenerationChunk]]:
+        """Draw the outcome of a call, as chunks of words with the time to wait before each.
+
+        The usage is carried by the last chunk, as providers do.
+        """
+        prompt = "\n".join(str(message.content) for message in messages)
+        commentary, latency, usage = self._simulate(prompt)
+        words = re.findall(r"\S+\s*", commentary)
+        generation = (
+            usage["output_tokens"] / self.tokens_per_second if self.tokens_per_second else 0
+        )
+        for position, word in enumerate(words):
+            delay = generation / len(words) + (latency - generation if position == 0 else 0)
+            last = position == len(words) - 1
+            message = AIMessageChunk(
+                content=word,
+                usage_metadata=usage if last else None,  # type: ignore
+            )
+            yield max(0.0, delay), ChatGenerationChunk(message=message)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """Comment on the messages, word by word."""
+        for delay, chunk in self._chunks(messages):
+            self._sleep(delay)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Comment on the messages word by word, without blocking the event loop."""
+        for delay, chunk in self._chunks(messages):
+            await asyncio.sleep(delay)
+            yield chunk
+
+
+class FakeBackend(LLMBackend):
+    """Class to comment locally, without network, for tests and load tests."""
+
+    name = "fake"
+    retryable_errors = (FakeRateLimitError,)
+
+    def __init__(self, **options: Any):
+        """Initialize class.
+
+        Args:
+            options (Any): parameters of the simulation, see `FakeChatModel`.
+        """
+        self.options = options
+
+    def defer_retries(self, timeout: float | None = None) -> None:
+        """Bound each synchronous call by the timeout of the dispatcher.
+
+        Args:
+            timeout (float | None, optional): maximal duration of a call (in s).
+                Defaults to None.
+        """
+        if timeout is not None:
+            self.options.setdefault("timeout", timeout)
+
+    def create_chat_model(self, model_name: str, temperature: float) -> BaseChatModel:
+        """Create the chat model.
+
+        Args:
+            model_name (str): name of the model (ignored).
+            temperature (float): temperature of the model (ignored).
+
+        Returns:
+            BaseChatModel: The chat model, to use in a chain.
+        """
+        return FakeChatModel(**self.options)
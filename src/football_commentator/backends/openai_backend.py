@@ -0,0 +1,123 @@
+"""Module for the OpenAI backend."""
+
+from typing import Any
+
+import httpx
+import openai
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+
+from football_commentator.backends.base import LLMBackend
+
+# Statuses retried by the OpenAI client, without an error type of their own
+RETRYABLE_STATUSES = frozenset({408, 409})
+
+
+class OpenAIBackend(LLMBackend):
+    """Class to comment with OpenAI models, through pooled HTTP clients.
+
+    The HTTP clients keep a pool of open connections to the provider, so successive
+    calls do not pay the client construction nor a new connection.
+    """
+
+    name = "openai"
+    # The errors retried by the client itself, APITimeoutError is an APIConnectionError
+    retryable_errors = (
+        openai.RateLimitError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+        openai.ConflictError,
+    )
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        timeout: float | None = None,
+        max_retries: int | None = None,
+    ):
+        """Initialize class.
+
+        Args:
+            max_connections (int, optional): size of the HTTP connections pool.
+                Defaults to 10.
+            base_url (str | None, optional): URL of an OpenAI compatible API.
+                Defaults to None (OPENAI_BASE_URL, or OpenAI).
+            api_key (str | None, optional): key of the API. Defaults to None
+                (OPENAI_API_KEY).
+            timeout (float | None, optional): maximal duration of a request (in s).
+                Defaults to None (the default of the client).
+            max_retries (int | None, optional): retries of the client itself, 0 to leave
+                them to the `LLMDispatcher`. Defaults to None (the default of the client,
+                or 0 with a dispatcher).
+        """
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self.http_client = httpx.Client(limits=limits)
+        self.http_async_client = httpx.AsyncClient(limits=limits)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Check whether an error of the provider is worth retrying, as the client does.
+
+        Args:
+            error (BaseException): The error of a call.
+
+        Returns:
+            bool: The error is one of `retryable_errors`, or a request timeout (HTTP 408).
+        """
+        return isinstance(error, self.retryable_errors) or (
+            isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUSES
+        )
+
+    def defer_retries(self, timeout: float | None = None) -> None:
+        """Leave the retries to a dispatcher, and bound each request by its timeout.
+
+        The client would otherwise retry twice each attempt of the dispatcher.
+
+        Args:
+            timeout (float | None, optional): maximal duration of a request (in s).
+                Defaults to None.
+        """
+        if self.max_retries is None:
+            self.max_retries = 0
+        if self.timeout is None:
+            self.timeout = timeout
+
+    def create_chat_model(self, model_name: str, temperature: float) -> BaseChatModel:
+        """Create the chat model.
+
+        Args:
+            model_name (str): name of the model.
+            temperature (float): temperature of the model.
+
+        Returns:
+            BaseChatModel: The chat model, to use in a chain.
+        """
+        options: dict[str, Any] = {
+            "base_url": self.base_url,
+            "api_key": self.api_key,
+            "timeout": self.timeout,
+            "max_retries": self.max_retries,
+        }
+        return ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+            stream_usage=True,
+            **{name: value for name, value in options.items() if value is not None},
+        )  # type: ignore
+
+    def close(self) -> None:
+        """Close the synchronous connections pool."""
+        self.http_client.close()
+
+    async def aclose(self) -> None:
+        """Close the asynchronous connections pool."""
+        await self.http_async_client.aclose()
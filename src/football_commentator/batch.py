@@ -0,0 +1,316 @@
+"""Module to generate the commentaries of archived games, without the interface."""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.event import FootballEvent
+from football_commentator.pipeline import CommentaryWindow
+from football_commentator.utils import load_match_info_from_config
+
+Commentate = Callable[[list[FootballEvent]], Awaitable[str]]
+
+
+@dataclass
+class BatchReport:
+    """Class to report the progress of a batch."""
+
+    matches: int = 0
+    windows: int = 0
+    skipped_windows: int = 0
+    failed_windows: int = 0
+    errors: dict[str, str] = field(default_factory=dict)
+    duration: float = 0.0
+    latencies: list[float] = field(default_factory=list)  # Seconds, per commented window
+
+    @property
+    def throughput(self) -> float:
+        """Commented windows per second."""
+        return self.windows / self.duration if self.duration else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Get a percentile of the latency of the LLM calls.
+
+        Args:
+            percentile (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The latency (in s), 0 without calls.
+        """
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(percentile / 100 * len(latencies)))]
+
+
+def split_match_in_windows(
+    events_path: Path, window_duration: int
+) -> list[tuple[CommentaryWindow, list[FootballEvent]]]:
+    """Split the events of a game in windows, as they are replayed by the interface.
+
+    Args:
+        events_path (Path): path to the events of the game.
+        window_duration (int): duration of a window (in ms).
+
+    Returns:
+        list[tuple[CommentaryWindow, list[FootballEvent]]]: The windows with their events.
+    """
+    store = JSONPreprocessor(source=events_path).event_store
+    windows = []
+    for index in range(store.duration // window_duration + 1):
+        window = CommentaryWindow(
+            index=index, start=index * window_duration, end=(index + 1) * window_duration
+        )
+        batch = store.load_batch_between(
+            start=store.elapsed_to_clock(window.start), end=store.elapsed_to_clock(window.end)
+        )
+        windows.append((window, batch.to_events()))
+    return windows
+
+
+def find_matches(events_dir: Path, metadata_dir: Path) -> dict[Path, Path | None]:
+    """Find the games to comment on, with their metadata file.
+
+    The metadata file of `<game>.json` is `<game>.yaml` (or `.yml`) in the metadata folder.
+
+    Args:
+        events_dir (Path): folder of the events' files.
+        metadata_dir (Path): folder of the metadata files.
+
+    Returns:
+        dict[Path, Path | None]: Metadata file of each events' file, None if missing.
+    """
+    matches: dict[Path, Path | None] = {}
+    for events_path in sorted(events_dir.glob("*.json")):
+        candidates = [metadata_dir / f"{events_path.stem}{suffix}" for suffix in (".yaml", ".yml")]
+        matches[events_path] = next((path for path in candidates if path.exists()), None)
+    return matches
+
+
+def load_done_windows(output_path: Path) -> set[int]:
+    """Load the windows already commented on, to resume an interrupted batch.
+
+    Args:
+        output_path (Path): path to the JSONL output of the game.
+
+    Returns:
+        set[int]: The indexes of the commented windows.
+    """
+    if not output_path.exists():
+        return set()
+    done = set()
+    with open(output_path) as file:
+        for line in file:
+            try:
+                done.add(json.loads(line)["window"])
+            except (json.JSONDecodeError, KeyError):
+                # Line cut by an interruption, the window is commented again.
+                continue
+    return done
+
+
+def truncate_partial_line(output_path: Path) -> None:
+    """Remove the last line of an output if it was cut by an interruption.
+
+    The new lines are then appended after a complete line, and not glued to the cut one.
+
+    Args:
+        output_path (Path): path to the JSONL output of the game.
+    """
+    if not output_path.exists():
+        return
+    with open(output_path, "rb+") as file:
+        size = file.seek(0, 2)
+        position = size
+        # Look for the last newline, backwards by blocks
+        while position > 0:
+            block_start = max(0, position - 4096)
+            file.seek(block_start)
+            newline = file.read(position - block_start).rfind(b"\n")
+            if newline >= 0:
+                position = block_start + newline + 1
+                break
+            position = block_start
+        if position < size:
+            file.truncate(position)
+
+
+async def comment_match(
+    windows: list[tuple[CommentaryWindow, list[FootballEvent]]],
+    output_path: Path,
+    header: dict[str, str],
+    commentate: Commentate,
+    semaphore: asyncio.Semaphore,
+    report: BatchReport,
+) -> None:
+    """Comment on the windows of a game not commented yet, and append them to its output.
+
+    Args:
+        windows (list[tuple[CommentaryWindow, list[FootballEvent]]]): windows of the game.
+        output_path (Path): path to the JSONL output of the game.
+        header (dict[str, str]): fields of the game added to each line.
+        commentate (Commentate): coroutine commenting on a list of events.
+        semaphore (asyncio.Semaphore): semaphore bounding the concurrent LLM calls.
+        report (BatchReport): report of the batch.
+    """
+    done = load_done_windows(output_path)
+    report.skipped_windows += len(done)
+    truncate_partial_line(output_path)
+
+    with open(output_path, "a") as output:
+
+        async def comment_window(window: CommentaryWindow, events: list[FootballEvent]):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    commentary = await commentate(events)
+                except Exception as error:
+                    report.failed_windows += 1
+                    report.errors[f"{output_path.stem}:{window.index}"] = repr(error)
+                    return
+                report.latencies.append(time.perf_counter() - start)
+            line = {
+                **header,
+                "window": window.index,
+                "start": window.start,
+                "end": window.end,
+                "time": window.timer,
+                "commentary": commentary,
+            }
+            output.write(json.dumps(line) + "\n")
+            output.flush()
+            report.windows += 1
+
+        await asyncio.gather(
+            *(
+                comment_window(window, events)
+                for window, events in windows
+                if window.index not in done
+            )
+        )
+
+
+async def run_batch(
+    events_dir: Path,
+    metadata_dir: Path,
+    output_dir: Path,
+    commentate: Commentate,
+    window_duration: int = 20_000,
+    max_concurrency: int = 8,
+    workers: int | None = None,
+    max_matches: int = 4,
+) -> BatchReport:
+    """Comment on all the games of a folder.
+
+    The games are split in windows by a pool of processes, while the windows are
+    commented on with at most `max_concurrency` concurrent LLM calls. At most
+    `max_matches` games are in progress at once, bounding the windows held in memory.
+
+    Args:
+        events_dir (Path): folder of the events' files.
+        metadata_dir (Path): folder of the metadata files.
+        output_dir (Path): folder of the JSONL outputs, one per game.
+        commentate (Commentate): coroutine commenting on a list of events.
+        window_duration (int, optional): duration of a window (in ms). Defaults to 20s.
+        max_concurrency (int, optional): maximal concurrent LLM calls. Defaults to 8.
+        workers (int | None, optional): number of processes. Defaults to the CPU count.
+        max_matches (int, optional): maximal games in progress. Defaults to 4.
+
+    Returns:
+        BatchReport: The report of the batch.
+    """
+    report = BatchReport()
+    start = time.perf_counter()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    match_semaphore = asyncio.Semaphore(max_matches)
+    loop = asyncio.get_running_loop()
+
+    async def process_match(events_path: Path, metadata_path: Path) -> None:
+        async with match_semaphore:
+            match_info = load_match_info_from_config(metadata_path)
+            windows = await loop.run_in_executor(
+                executor, split_match_in_windows, events_path, window_duration
+            )
+            header = {
+                "match": events_path.stem,
+                "home_team": match_info.home_team.name,
+                "away_team": match_info.away_team.name,
+            }
+            output_path = output_dir / f"{events_path.stem}.jsonl"
+            await comment_match(windows, output_path, header, commentate, semaphore, report)
+            report.matches += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tasks = {}
+        for events_path, metadata_path in find_matches(events_dir, metadata_dir).items():
+            if metadata_path is None:
+                report.errors[events_path.stem] = "Missing metadata file."
+                continue
+            tasks[events_path.stem] = asyncio.create_task(
+                process_match(events_path, metadata_path)
+            )
+        for name, task in tasks.items():
+            try:
+                await task
+            except Exception as error:
+                report.errors[name] = repr(error)
+
+    report.duration = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    """Command line entry point of the batch mode."""
+    parser = argparse.ArgumentParser(description="Comment on archived games.")
+    parser.add_argument("events_dir", type=Path, help="Folder of the events' JSON files.")
+    parser.add_argument("metadata_dir", type=Path, help="Folder of the metadata YAML files.")
+    parser.add_argument("output_dir", type=Path, help="Folder of the JSONL commentaries.")
+    parser.add_argument("--window-seconds", type=int, default=20, help="Duration of a window.")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Concurrent LLM calls.")
+    parser.add_argument("--workers", type=int, default=None, help="Preprocessing processes.")
+    parser.add_argument("--max-matches", type=int, default=4, help="Games in progress at once.")
+    parser.add_argument(
+        "--backend", default=None, help="LLM backend ('openai', 'fake'), LLM_BACKEND by default."
+    )
+    parser.add_argument(
+        "--backend-options", type=json.loads, default=None, help="Backend parameters (JSON)."
+    )
+    args = parser.parse_args()
+
+    from football_commentator.llm import build_commentator_engine
+
+    engine = build_commentator_engine(args.backend, args.backend_options)
+
+    report = asyncio.run(
+        run_batch(
+            events_dir=args.events_dir,
+            metadata_dir=args.metadata_dir,
+            output_dir=args.output_dir,
+            commentate=engine.ainvoke,
+            window_duration=1000 * args.window_seconds,
+            max_concurrency=args.max_concurrency,
+            workers=args.workers,
+            max_matches=args.max_matches,
+        )
+    )
+    print(
+        f"{report.matches} matches, {report.windows} windows commented "
+        f"({report.skipped_windows} already done, {report.failed_windows} failed) "
+        f"in {report.duration:.1f}s: {report.throughput:.2f} windows/s"
+    )
+    print(
+        "LLM latency: "
+        + ", ".join(
+            f"p{percentile}={report.latency_percentile(percentile):.2f}s"
+            for percentile in (50, 95, 99)
+        )
+    )
+    for name, error in report.errors.items():
+        print(f"{name}: {error}")
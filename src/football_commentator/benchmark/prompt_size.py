@@ -0,0 +1,144 @@
+"""Module to compare the size and latency of the prompt formats on a game."""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from football_commentator.batch import split_match_in_windows
+from football_commentator.encoding import PROMPT_FORMATS, get_prompt_format
+from football_commentator.event import FootballEvent
+from football_commentator.utils import estimate_tokens
+
+
+@dataclass
+class PromptSize:
+    """Class to represent the size of the prompts of a game in a format."""
+
+    format: str
+    windows: int
+    tokens: int
+    max_tokens: int
+    latency: float | None = None  # Mean duration of an LLM call (in s), if measured
+
+    @property
+    def mean_tokens(self) -> float:
+        """Mean number of tokens of the events of a window."""
+        return self.tokens / self.windows if self.windows else 0.0
+
+
+def tiktoken_counter(model_name: str) -> Callable[[str], int]:
+    """Count the tokens of a text with the tokenizer of an OpenAI model.
+
+    Args:
+        model_name (str): name of the model.
+
+    Returns:
+        Callable[[str], int]: The counter.
+    """
+    import tiktoken
+
+    try:
+        encoding = tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def compare_prompt_sizes(
+    windows: list[list[FootballEvent]],
+    formats: list[str] | None = None,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> list[PromptSize]:
+    """Measure the tokens of the events of each window, in each format.
+
+    Args:
+        windows (list[list[FootballEvent]]): The events of each window.
+        formats (list[str] | None, optional): names of the formats. Defaults to all of them.
+        count_tokens (Callable[[str], int], optional): counter of the tokens of a text.
+            Defaults to an estimation.
+
+    Returns:
+        list[PromptSize]: The size of the prompts, by format.
+    """
+    sizes = []
+    for name in formats or list(PROMPT_FORMATS):
+        prompt_format = get_prompt_format(name)
+        tokens = [count_tokens(prompt_format.format_events(events)) for events in windows]
+        sizes.append(PromptSize(name, len(tokens), sum(tokens), max(tokens, default=0)))
+    return sizes
+
+
+def measure_latency(
+    windows: list[list[FootballEvent]], prompt_format: str, backend: str, **options: object
+) -> float:
+    """Measure the mean duration of the LLM calls on windows, in a format.
+
+    The events are not pruned, and commentaries are not cached.
+
+    Args:
+        windows (list[list[FootballEvent]]): The events of each window.
+        prompt_format (str): name of the format.
+        backend (str): name of the LLM backend.
+        options (object): parameters of the backend.
+
+    Returns:
+        float: The mean duration of a call (in s).
+    """
+    from football_commentator.backends import get_backend
+    from football_commentator.llm import CommentatorEngine
+
+    engine = CommentatorEngine(
+        backend=get_backend(backend, **options), token_budget=0, prompt_format=prompt_format
+    )
+    start = time.perf_counter()
+    for events in windows:
+        engine.invoke(events)
+    engine.close()
+    return (time.perf_counter() - start) / max(len(windows), 1)
+
+
+def main() -> None:
+    """Command line entry point of the comparison of the prompt formats."""
+    parser = argparse.ArgumentParser(description="Compare the sizes of the prompt formats.")
+    parser.add_argument("events_path", type=Path, help="Events' JSON file of a game.")
+    parser.add_argument("--window-seconds", type=int, default=20, help="Duration of a window.")
+    parser.add_argument(
+        "--tokenizer", default=None, help="OpenAI model whose tokenizer counts the tokens."
+    )
+    parser.add_argument(
+        "--backend", default=None, help="LLM backend measuring the latency of each format."
+    )
+    parser.add_argument(
+        "--backend-options", type=json.loads, default=None, help="Backend parameters (JSON)."
+    )
+    parser.add_argument("--latency-windows", type=int, default=10, help="Windows to call.")
+    args = parser.parse_args()
+
+    windows = [
+        events
+        for _, events in split_match_in_windows(args.events_path, 1000 * args.window_seconds)
+        if events
+    ]
+    count_tokens = tiktoken_counter(args.tokenizer) if args.tokenizer else estimate_tokens
+    sizes = compare_prompt_sizes(windows, count_tokens=count_tokens)
+    if args.backend:
+        for size in sizes:
+            size.latency = measure_latency(
+                windows[: args.latency_windows],
+                size.format,
+                args.backend,
+                **(args.backend_options or {}),
+            )
+
+    reference = next(size for size in sizes if size.format == "verbose")
+    print(f"{'format':<10} {'tokens':>10} {'mean':>8} {'max':>6} {'saved':>7} {'latency':>8}")
+    for size in sizes:
+        saved = 1 - size.tokens / reference.tokens if reference.tokens else 0.0
+        latency = "-" if size.latency is None else f"{size.latency:.2f}s"
+        print(
+            f"{size.format:<10} {size.tokens:>10,} {size.mean_tokens:>8.1f} "
+            f"{size.max_tokens:>6} {saved:>7.1%} {latency:>8}"
+        )
@@ -0,0 +1,125 @@
+"""Module to benchmark the startup of the package: the import time of its modules."""
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+# Entry points of the processes: interface, batch workers, ingestion and LLM stack
+STARTUP_MODULES = [
+    "football_commentator.constants",
+    "football_commentator.data.preprocessor_json",
+    "football_commentator.pipeline",
+    "football_commentator.broadcast",
+    "football_commentator.batch",
+    "football_commentator.ingest",
+    "football_commentator.backends",
+    "football_commentator.llm",
+]
+
+
+@dataclass
+class ImportTime:
+    """Class to represent the import time of a module, in a new interpreter."""
+
+    module: str
+    seconds: float
+    # Cumulative import time (in s) of the slowest packages it imports
+    slowest: dict[str, float] = field(default_factory=dict)
+
+
+def parse_import_times(report: str) -> dict[str, float]:
+    """Read the cumulative import time of each module, from `python -X importtime`.
+
+    The modules imported by the startup of the interpreter (`site`) are left out.
+
+    Args:
+        report (str): The report, written on stderr by the interpreter.
+
+    Returns:
+        dict[str, float]: The cumulative import time (in s) of each module.
+    """
+    times: dict[str, float] = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        if module.strip() == "site":
+            times.clear()
+            continue
+        times[module.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def measure_import_time(module: str, repeat: int = 3, top: int = 5) -> ImportTime:
+    """Measure the import time of a module, the best of several new interpreters.
+
+    Args:
+        module (str): name of the module.
+        repeat (int, optional): number of interpreters. Defaults to 3.
+        top (int, optional): number of slowest imported packages kept. Defaults to 5.
+
+    Raises:
+        RuntimeError: The module cannot be imported.
+
+    Returns:
+        ImportTime: The measure.
+    """
+    best: dict[str, float] | None = None
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if process.returncode:
+            raise RuntimeError(f"The module '{module}' cannot be imported: {process.stderr}")
+        times = parse_import_times(process.stderr)
+        if best is None or times[module] < best[module]:
+            best = times
+    assert best is not None
+    # Only the top-level packages, their submodules are included in their time
+    package = module.partition(".")[0]
+    slowest = sorted(
+        (name for name in best if "." not in name and name != package),
+        key=best.__getitem__,
+        reverse=True,
+    )
+    return ImportTime(module, best[module], {name: best[name] for name in slowest[:top]})
+
+
+def main() -> None:
+    """Command line entry point of the startup benchmark."""
+    parser = argparse.ArgumentParser(description="Measure the import time of the modules.")
+    parser.add_argument("--modules", nargs="+", default=STARTUP_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", type=Path, default=None, help="Save the results as baseline.")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = [measure_import_time(module, repeat=args.repeat) for module in args.modules]
+    print(f"{'module':<45} {'import ms':>10}  slowest imports")
+    for result in results:
+        slowest = ", ".join(f"{name} {1000 * time:.0f}ms" for name, time in result.slowest.items())
+        print(f"{result.module:<45} {1000 * result.seconds:>10.1f}  {slowest}")
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps([asdict(result) for result in results], indent=2))
+    if args.compare:
+        baseline = {entry["module"]: entry for entry in json.loads(args.compare.read_text())}
+        regressions = [
+            f"{result.module}: {1000 * result.seconds:.0f}ms "
+            f"(baseline {1000 * baseline[result.module]['seconds']:.0f}ms)"
+            for result in results
+            if result.module in baseline
+            and result.seconds > (1 + args.threshold) * baseline[result.module]["seconds"]
+        ]
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
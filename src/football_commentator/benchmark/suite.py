@@ -0,0 +1,373 @@
+"""Module to benchmark the commentary pipeline on synthetic games."""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from football_commentator.app.render import CommentaryFeed, render_commentary_html
+from football_commentator.benchmark.synthetic import write_match_events
+from football_commentator.constants import PERIOD_CLOCK_OFFSET_MS
+from football_commentator.data.decoding import get_decoder
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.spatial import ZoneHeatmaps
+from football_commentator.utils import format_events_to_string
+
+# A benchmark prepares its data from the path to a game, and returns the function
+# to measure. This function returns the number of items it processed.
+Benchmark = Callable[[Path], Callable[[], int]]
+
+WINDOW_SECONDS = 20
+
+
+@dataclass
+class BenchmarkResult:
+    """Class to represent the measures of a benchmark."""
+
+    name: str
+    n_events: int
+    items: int
+    seconds: float
+    peak_memory: int  # Bytes allocated at the peak of a run
+
+    @property
+    def key(self) -> str:
+        """Key of the benchmark in a baseline."""
+        return f"{self.name}@{self.n_events}"
+
+    @property
+    def items_per_second(self) -> float:
+        """Throughput of the benchmark."""
+        return self.items / self.seconds if self.seconds else float("inf")
+
+
+def _windows_in_seconds(preprocessor: JSONPreprocessor) -> list[tuple[int, int]]:
+    """Split a game in windows, as (start, end) game clocks in seconds, both included."""
+    windows = []
+    for period, duration in preprocessor.event_store.period_durations.items():
+        offset = (period - 1) * PERIOD_CLOCK_OFFSET_MS // 1000
+        for start in range(0, duration // 1000 + 1, WINDOW_SECONDS):
+            windows.append((offset + start, offset + start + WINDOW_SECONDS - 1))
+    return windows
+
+
+def bench_json_load(path: Path, decoder: str = "json") -> Callable[[], int]:
+    """Load a game with JSONPreprocessor."""
+    return lambda: len(JSONPreprocessor(source=path, cache_dir=None, decoder=decoder).events)
+
+
+def bench_event_store(path: Path, decoder: str = "json") -> Callable[[], int]:
+    """Load a game and convert its events into the event store, without cache."""
+    return lambda: len(JSONPreprocessor(source=path, cache_dir=None, decoder=decoder).event_store)
+
+
+def bench_match_cache_load(path: Path) -> Callable[[], int]:
+    """Load the event store of a game from its binary cache."""
+    cache_dir = path.parent / "match_cache"
+    JSONPreprocessor(source=path, cache_dir=cache_dir).event_store  # noqa: B018
+
+    return lambda: len(JSONPreprocessor(source=path, cache_dir=cache_dir).event_store)
+
+
+def bench_process_football_event(path: Path) -> Callable[[], int]:
+    """Convert all the raw events of a game to FootballEvent."""
+    preprocessor = JSONPreprocessor(source=path, cache_dir=None, decoder="json")
+
+    def run() -> int:
+        for event in preprocessor.events:
+            preprocessor.process_football_event(event)
+        return len(preprocessor.events)
+
+    return run
+
+
+def bench_load_description(path: Path) -> Callable[[], int]:
+    """Extract the description of all the raw events of a game."""
+    preprocessor = JSONPreprocessor(source=path, cache_dir=None, decoder="json")
+
+    def run() -> int:
+        for event in preprocessor.events:
+            preprocessor.load_description(event)
+        return len(preprocessor.events)
+
+    return run
+
+
+def bench_load_all_events_in_intervall(path: Path) -> Callable[[], int]:
+    """Load the events of all the windows of a game, from its event store."""
+    preprocessor = JSONPreprocessor(source=path, cache_dir=None)
+    windows = _windows_in_seconds(preprocessor)
+
+    def run() -> int:
+        return sum(
+            len(preprocessor.load_all_events_in_intervall(start, end)) for start, end in windows
+        )
+
+    return run
+
+
+def bench_format_events_to_string(path: Path) -> Callable[[], int]:
+    """Format the events of all the windows of a game for the prompt."""
+    preprocessor = JSONPreprocessor(source=path, cache_dir=None)
+    windows = [
+        preprocessor.load_all_events_in_intervall(start, end)
+        for start, end in _windows_in_seconds(preprocessor)
+    ]
+
+    def run() -> int:
+        for events in windows:
+            format_events_to_string(events)
+        return sum(len(events) for events in windows)
+
+    return run
+
+
+def bench_zone_heatmaps(path: Path) -> Callable[[], int]:
+    """Count the zones of all the windows of a game, and summarize them for the prompt."""
+    preprocessor = JSONPreprocessor(source=path, cache_dir=None)
+    batches = [
+        preprocessor.event_store.load_batch_between(1000 * start, 1000 * (end + 1))
+        for start, end in _windows_in_seconds(preprocessor)
+    ]
+
+    def run() -> int:
+        heatmaps = ZoneHeatmaps()
+        for batch in batches:
+            heatmaps.summary(heatmaps.add_batch(batch))
+        return len(batches)
+
+    return run
+
+
+def _commentary_entries(path: Path) -> list[dict[str, str]]:
+    """One commentary entry per window of the game, with a typical length."""
+    windows = _windows_in_seconds(JSONPreprocessor(source=path, cache_dir=None))
+    return [
+        {"Time": f"{start // 60 % 60:02d}'{start % 60:02d}", "Commentary": "Commentary " * 30}
+        for start, _ in windows
+    ]
+
+
+def bench_commentary_html(path: Path) -> Callable[[], int]:
+    """Build the HTML of the whole commentary container after each new entry."""
+    entries = _commentary_entries(path)
+
+    def run() -> int:
+        for position in range(1, len(entries) + 1):
+            render_commentary_html(entries[:position])
+        return len(entries)
+
+    return run
+
+
+def bench_commentary_feed(path: Path) -> Callable[[], int]:
+    """Render each new entry of the commentary feed."""
+    entries = _commentary_entries(path)
+
+    class Placeholder:
+        def markdown(self, body: str, unsafe_allow_html: bool = False) -> None:
+            pass
+
+    def run() -> int:
+        feed = CommentaryFeed([Placeholder() for _ in range(20)])
+        for entry in entries:
+            feed.append([entry])
+        return len(entries)
+
+    return run
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "json_load": bench_json_load,
+    "json_load_orjson": partial(bench_json_load, decoder="orjson"),
+    "json_load_msgspec": partial(bench_json_load, decoder="msgspec"),
+    "event_store": bench_event_store,
+    "event_store_msgspec": partial(bench_event_store, decoder="msgspec"),
+    "match_cache_load": bench_match_cache_load,
+    "process_football_event": bench_process_football_event,
+    "load_description": bench_load_description,
+    "load_all_events_in_intervall": bench_load_all_events_in_intervall,
+    "format_events_to_string": bench_format_events_to_string,
+    "zone_heatmaps": bench_zone_heatmaps,
+    "commentary_html": bench_commentary_html,
+    "commentary_feed": bench_commentary_feed,
+}
+
+# Decoders of the 'fast' extra needed by some benchmarks
+REQUIRED_DECODERS = {
+    "json_load_orjson": "orjson",
+    "json_load_msgspec": "msgspec",
+    "event_store_msgspec": "msgspec",
+}
+
+
+def missing_decoder(name: str) -> str | None:
+    """Find the decoder a benchmark needs, when it is not installed.
+
+    Args:
+        name (str): name of the benchmark.
+
+    Returns:
+        str | None: The name of the decoder, None when the benchmark can run.
+    """
+    decoder = REQUIRED_DECODERS.get(name)
+    if decoder is None:
+        return None
+    try:
+        get_decoder(decoder)
+    except ImportError:
+        return decoder
+    return None
+
+
+def run_benchmark(name: str, path: Path, n_events: int, repeat: int = 3) -> BenchmarkResult:
+    """Measure a benchmark: best time of several runs, then peak memory of one run.
+
+    Args:
+        name (str): name of the benchmark.
+        path (Path): path to the game.
+        n_events (int): number of events of the game.
+        repeat (int, optional): number of timed runs. Defaults to 3.
+
+    Returns:
+        BenchmarkResult: The measures.
+    """
+    run = BENCHMARKS[name](path)
+    best, items = float("inf"), 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = run()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory is traced in a separate run, tracing slows the execution down.
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return BenchmarkResult(name, n_events, items, best, peak_memory)
+
+
+def run_suite(
+    sizes: list[int], names: list[str] | None = None, repeat: int = 3, seed: int = 0
+) -> list[BenchmarkResult]:
+    """Run the benchmarks on synthetic games of several sizes.
+
+    The benchmarks of the decoders that are not installed are skipped.
+
+    Args:
+        sizes (list[int]): numbers of events of the games.
+        names (list[str] | None, optional): benchmarks to run. Defaults to None (all).
+        repeat (int, optional): number of timed runs. Defaults to 3.
+        seed (int, optional): seed of the synthetic games. Defaults to 0.
+
+    Returns:
+        list[BenchmarkResult]: The measures.
+    """
+    names = [name for name in names or BENCHMARKS if missing_decoder(name) is None]
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for n_events in sizes:
+            path = write_match_events(Path(folder) / f"{n_events}.json", n_events, seed=seed)
+            for name in names:
+                results.append(run_benchmark(name, path, n_events, repeat=repeat))
+    return results
+
+
+def save_baseline(results: list[BenchmarkResult], path: Path) -> None:
+    """Save measures as a baseline, with the commit they were measured on.
+
+    Args:
+        results (list[BenchmarkResult]): The measures.
+        path (Path): path to the JSON baseline.
+    """
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=False
+    ).stdout.strip()
+    baseline = {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "results": {
+            result.key: {**asdict(result), "items_per_second": result.items_per_second}
+            for result in results
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2))
+
+
+def compare_to_baseline(
+    results: list[BenchmarkResult], baseline: dict[str, Any], threshold: float = 0.2
+) -> list[str]:
+    """Find the regressions of throughput and peak memory against a baseline.
+
+    Args:
+        results (list[BenchmarkResult]): The measures.
+        baseline (dict[str, Any]): The baseline, as saved by `save_baseline`.
+        threshold (float, optional): tolerated relative variation. Defaults to 0.2.
+
+    Returns:
+        list[str]: The description of each regression.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline["results"].get(result.key)
+        if reference is None:
+            continue
+        if result.items_per_second < (1 - threshold) * reference["items_per_second"]:
+            regressions.append(
+                f"{result.key}: {result.items_per_second:,.0f} items/s "
+                f"(baseline {reference['items_per_second']:,.0f})"
+            )
+        if result.peak_memory > (1 + threshold) * reference["peak_memory"]:
+            regressions.append(
+                f"{result.key}: {result.peak_memory / 2**20:.1f} MiB peak "
+                f"(baseline {reference['peak_memory'] / 2**20:.1f} MiB)"
+            )
+    return regressions
+
+
+def main() -> None:
+    """Command line entry point of the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark the commentary pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", type=Path, default=None, help="Save the results as baseline.")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    for name in args.only or BENCHMARKS:
+        decoder = missing_decoder(name)
+        if decoder is not None:
+            print(f"Skipped {name}: the '{decoder}' decoder is not installed (the 'fast' extra).")
+    results = run_suite(args.sizes, names=args.only, repeat=args.repeat, seed=args.seed)
+    print(f"{'benchmark':<40} {'items/s':>14} {'peak MiB':>10}")
+    for result in results:
+        print(
+            f"{result.key:<40} {result.items_per_second:>14,.0f} "
+            f"{result.peak_memory / 2**20:>10.2f}"
+        )
+
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        regressions = compare_to_baseline(
+            results, json.loads(args.compare.read_text()), threshold=args.threshold
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
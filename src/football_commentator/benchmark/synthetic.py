@@ -0,0 +1,140 @@
+"""Module to generate synthetic StatsBomb-like games."""
+
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+# Frequencies of the event types in a StatsBomb game, and the field of their details.
+EVENT_TYPES_FREQUENCIES: dict[str, tuple[float, str | None]] = {
+    "Pass": (0.32, "pass"),
+    "Ball Receipt*": (0.30, "ball_receipt"),
+    "Pressure": (0.13, None),
+    "Ball Recovery": (0.04, None),
+    "Duel": (0.03, "duel"),
+    "Clearance": (0.02, None),
+    "Dribble": (0.02, "dribble"),
+    "Interception": (0.02, "interception"),
+    "Block": (0.02, None),
+    "Goal Keeper": (0.02, "goalkeeper"),
+    "Miscontrol": (0.02, None),
+    "Dispossessed": (0.015, None),
+    "Dribbled Past": (0.015, None),
+    "Foul Committed": (0.01, None),
+    "Foul Won": (0.01, None),
+    "Shot": (0.01, "shot"),
+    "Bad Behaviour": (0.002, "bad_behaviour"),
+    "Substitution": (0.003, None),
+}
+
+DETAILS_VALUES: dict[str, dict[str, list[str]]] = {
+    "pass": {
+        "height": ["Ground Pass", "Low Pass", "High Pass"],
+        "body_part": ["Right Foot", "Left Foot", "Head"],
+        "type": ["Throw-in", "Corner", "Free Kick", "Goal Kick", "Kick Off"],
+        "outcome": ["Incomplete", "Out", "Pass Offside"],
+    },
+    "ball_receipt": {"outcome": ["Incomplete"]},
+    "duel": {"type": ["Tackle", "Aerial Lost"], "outcome": ["Won", "Lost In Play"]},
+    "dribble": {"outcome": ["Complete", "Incomplete"]},
+    "interception": {"outcome": ["Won", "Lost In Play", "Success In Play"]},
+    "goalkeeper": {"type": ["Shot Saved", "Collected", "Punch"], "outcome": ["Success"]},
+    "shot": {
+        "type": ["Open Play", "Free Kick", "Penalty"],
+        "body_part": ["Right Foot", "Left Foot", "Head"],
+        "technique": ["Normal", "Volley", "Half Volley"],
+        "outcome": ["Goal", "Saved", "Off T", "Blocked", "Wayward"],
+    },
+    "bad_behaviour": {"card": ["Yellow Card", "Red Card"]},
+}
+
+PERIOD_DURATION = 47 * 60  # Seconds, stoppage time included
+
+
+def generate_match_events(
+    n_events: int, seed: int = 0, teams: tuple[str, str] = ("Home FC", "Away FC")
+) -> list[dict[str, Any]]:
+    """Generate the events of a synthetic game, with the structure of StatsBomb events.
+
+    Args:
+        n_events (int): number of events of the game.
+        seed (int, optional): seed of the generator, a seed always gives the same game.
+            Defaults to 0.
+        teams (tuple[str, str], optional): names of the teams.
+            Defaults to ("Home FC", "Away FC").
+
+    Returns:
+        list[dict[str, Any]]: The events, in the order of the game.
+    """
+    generator = random.Random(seed)
+    event_types = list(EVENT_TYPES_FREQUENCIES)
+    weights = [frequency for frequency, _ in EVENT_TYPES_FREQUENCIES.values()]
+    players = {team: [f"{team} Player {number}" for number in range(1, 12)] for team in teams}
+
+    events: list[dict[str, Any]] = [
+        {
+            "id": f"{seed}-{index}",
+            "index": index + 1,
+            "period": 1,
+            "timestamp": "00:00:00.000",
+            "type": {"id": 35, "name": "Starting XI"},
+            "team": {"id": index, "name": team},
+        }
+        for index, team in enumerate(teams)
+    ]
+    n_game_events = max(0, n_events - len(events))
+    half = n_game_events // 2
+    for index in range(n_game_events):
+        period = 1 if index < half else 2
+        position_in_period = index if period == 1 else index - half
+        events_in_period = half if period == 1 else n_game_events - half
+        milliseconds = 1000 * PERIOD_DURATION * position_in_period // max(1, events_in_period)
+        minutes, milliseconds = divmod(milliseconds, 60_000)
+        seconds, milliseconds = divmod(milliseconds, 1000)
+
+        event_type = generator.choices(event_types, weights)[0]
+        team = teams[int(generator.random() < 0.5)]
+        event: dict[str, Any] = {
+            "id": f"{seed}-{len(events)}",
+            "index": len(events) + 1,
+            "period": period,
+            "timestamp": f"00:{minutes:02d}:{seconds:02d}.{milliseconds:03d}",
+            "minute": minutes + 45 * (period - 1),
+            "second": seconds,
+            "type": {"id": event_types.index(event_type), "name": event_type},
+            "possession_team": {"name": team},
+            "team": {"name": team},
+            "player": {"name": generator.choice(players[team])},
+            "location": [round(generator.uniform(0, 120), 1), round(generator.uniform(0, 80), 1)],
+        }
+        details_field = EVENT_TYPES_FREQUENCIES[event_type][1]
+        if details_field is not None:
+            details: dict[str, Any] = {
+                key: {"id": generator.randrange(100), "name": generator.choice(values)}
+                for key, values in DETAILS_VALUES.get(details_field, {}).items()
+                if generator.random() < 0.6
+            }
+            if event_type == "Pass":
+                details["length"] = round(generator.uniform(2, 60), 2)
+                details["recipient"] = {"name": generator.choice(players[team])}
+            if event_type == "Shot":
+                details["statsbomb_xg"] = round(generator.uniform(0.01, 0.8), 3)
+            event[details_field] = details
+        events.append(event)
+    return events
+
+
+def write_match_events(path: Path, n_events: int, seed: int = 0) -> Path:
+    """Write the events of a synthetic game in a JSON file.
+
+    Args:
+        path (Path): path to the JSON file.
+        n_events (int): number of events of the game.
+        seed (int, optional): seed of the generator. Defaults to 0.
+
+    Returns:
+        Path: The path to the JSON file.
+    """
+    with open(path, "w") as file:
+        json.dump(generate_match_events(n_events, seed=seed), file)
+    return path
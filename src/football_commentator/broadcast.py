@@ -0,0 +1,113 @@
+"""Module to share the commentaries of a game between all its viewers."""
+
+import logging
+import threading
+import time
+
+from football_commentator.pipeline import LookAheadCommentator
+
+logger = logging.getLogger(__name__)
+
+
+class CommentaryBroadcast:
+    """Class to generate the commentaries of a game once, and publish them to all viewers.
+
+    A single producer thread follows the game clock, measured on a monotonic clock, and
+    publishes each commentary when its window is over. Viewers only read the published
+    entries from their own cursor, so the LLM calls and the preprocessing do not grow
+    with the number of viewers.
+
+    When the commentaries are streamed, the entry being generated is shared as a
+    partial entry, until it is published. The producer stops once the last commentary
+    of a replayed game is published.
+    """
+
+    def __init__(self, commentator: LookAheadCommentator, tick_duration: float = 0.5):
+        """Initialize class.
+
+        Args:
+            commentator (LookAheadCommentator): generator of the game's commentaries.
+            tick_duration (float, optional): time between two ticks of the producer (in s).
+                Defaults to 0.5.
+        """
+        self.commentator = commentator
+        self.tick_duration = tick_duration
+        self.start_time = time.monotonic()
+        self.entries: list[dict[str, str]] = [{"Time": "00'00", "Commentary": "Kick Off"}]
+        self.partial_entry: dict[str, str] | None = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="commentary-broadcast", daemon=True)
+
+    @property
+    def elapsed(self) -> float:
+        """Time elapsed since the kick off (in s)."""
+        return time.monotonic() - self.start_time
+
+    def start(self) -> "CommentaryBroadcast":
+        """Start the producer thread, the game clock starts with it.
+
+        Returns:
+            CommentaryBroadcast: The started broadcast.
+        """
+        self.start_time = time.monotonic()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the producer thread."""
+        self._stop.set()
+        self._thread.join()
+        self.commentator.shutdown()
+
+    def _run(self) -> None:
+        """Loop of the producer thread, a failed tick is logged and the next one retried."""
+        while not self._stop.wait(self.tick_duration):
+            try:
+                self.tick(int(1000 * self.elapsed))
+            except Exception:
+                logger.exception("The tick of the commentary broadcast failed.")
+                continue
+            if self.commentator.finished:
+                logger.info("The game is over, the commentary broadcast stops.")
+                break
+
+    def tick(self, elapsed: int) -> None:
+        """Generate and publish the commentaries due at a time of the game.
+
+        Args:
+            elapsed (int): Time elapsed since the kick off (in ms).
+        """
+        self.commentator.schedule(elapsed)
+        ready = self.commentator.pop_ready(elapsed)
+        partial = self.commentator.partial(elapsed)
+        partial_entry = None
+        if partial is not None:
+            partial_entry = {"Time": partial[0].timer, "Commentary": partial[1]}
+        if ready or partial_entry != self.partial_entry:
+            with self._condition:
+                self.entries.extend(
+                    {"Time": window.timer, "Commentary": commentary}
+                    for window, commentary in ready
+                )
+                self.partial_entry = partial_entry
+                self._condition.notify_all()
+
+    def entries_since(
+        self, cursor: int, timeout: float | None = None
+    ) -> tuple[list[dict[str, str]], int]:
+        """Get the entries published after a cursor.
+
+        Args:
+            cursor (int): number of entries already read by the viewer.
+            timeout (float | None, optional): time to wait for a new entry (in s).
+                Defaults to None (no wait).
+
+        Returns:
+            tuple[list[dict[str, str]], int]: The new entries and the new cursor.
+        """
+        with self._condition:
+            if timeout is not None:
+                self._condition.wait_for(lambda: len(self.entries) > cursor, timeout=timeout)
+            new_entries = self.entries[cursor:]
+        return new_entries, cursor + len(new_entries)
@@ -0,0 +1,143 @@
+"""Module to cache the commentaries of the LLM."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class CommentaryCache:
+    """Class to store commentaries in SQLite, addressed by the content of their prompt.
+
+    Entries older than `max_age` are expired, and the least recently used entries are
+    evicted once the cache holds more than `max_entries`.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = ":memory:",
+        max_entries: int = 10_000,
+        max_age: float = 30 * 24 * 3600,
+    ):
+        """Initialize class.
+
+        Args:
+            path (Path | str, optional): path to the SQLite database. Defaults to ":memory:".
+            max_entries (int, optional): maximal number of entries. Defaults to 10 000.
+            max_age (float, optional): maximal age of an entry (in s). Defaults to 30 days.
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._connection:
+            if str(path) != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS commentaries ("
+                "key TEXT PRIMARY KEY, commentary TEXT NOT NULL, "
+                "created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS commentaries_used_at ON commentaries (used_at)"
+            )
+
+    @staticmethod
+    def make_key(
+        formatted_events: str,
+        model_name: str,
+        temperature: float,
+        prompt_version: str,
+        match_context: str = "",
+    ) -> str:
+        """Compute the key of a commentary.
+
+        Args:
+            formatted_events (str): events of the window, as formatted in the prompt.
+            model_name (str): name of the model.
+            temperature (float): temperature of the model.
+            prompt_version (str): version of the prompt templates.
+            match_context (str, optional): state of the game given in the prompt.
+                Defaults to "".
+
+        Returns:
+            str: The key of the commentary.
+        """
+        content = "\x1f".join(
+            (prompt_version, model_name, repr(temperature), match_context, formatted_events)
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def __len__(self) -> int:
+        """Number of entries in the cache."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM commentaries").fetchone()[0]
+
+    def get(self, key: str) -> str | None:
+        """Get a commentary.
+
+        Args:
+            key (str): The key of the commentary.
+
+        Returns:
+            str | None: The commentary, None if it is absent or expired.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT commentary FROM commentaries WHERE key = ? AND created_at >= ?",
+                (key, now - self.max_age),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE commentaries SET used_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, commentary: str) -> None:
+        """Store a commentary, evicting entries if needed.
+
+        Args:
+            key (str): The key of the commentary.
+            commentary (str): The commentary.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO commentaries VALUES (?, ?, ?, ?)",
+                (key, commentary, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Remove expired entries, then the least recently used ones above the size limit.
+
+        Args:
+            now (float): The current time.
+        """
+        self._connection.execute(
+            "DELETE FROM commentaries WHERE created_at < ?", (now - self.max_age,)
+        )
+        self._connection.execute(
+            "DELETE FROM commentaries WHERE key IN ("
+            "SELECT key FROM commentaries ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Get the counters of the cache.
+
+        Returns:
+            dict[str, int]: hits, misses and number of entries.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
@@ -1,28 +1,62 @@
 """Module to store constants."""
 
+import json
 import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
-OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME")
-if OPENAI_MODEL_NAME is None:
-    OPENAI_MODEL_NAME = "gpt-4o-mini"
+OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME") or "gpt-4o-mini"
+
+# Provider of the LLM: 'openai', or 'fake' to comment locally without network
+LLM_BACKEND = os.getenv("LLM_BACKEND") or "openai"
+# Parameters of the backend, as a JSON object (e.g. '{"latency_mean": 1.5}' for 'fake')
+LLM_BACKEND_OPTIONS = json.loads(os.getenv("LLM_BACKEND_OPTIONS") or "{}")
+# Budgets of the provider shared by all the calls of a process, per minute, 0 for unlimited
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE") or "0")
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE") or "0")
+# Retries of the rate limited or timed out calls, and time limit of an async call (s, 0: none)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES") or "3")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT") or "0")
+# Failures in a row shedding the calls for a time (s), the commentaries being degraded
+LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES") or "5")
+LLM_CIRCUIT_RESET = float(os.getenv("LLM_CIRCUIT_RESET") or "30")
 
 retrieved_temperature = os.getenv("MODEL_TEMPERATURE")
 MODEL_TEMPERATURE = 0.05 if retrieved_temperature is None else float(retrieved_temperature)
 
+# Encoding of the events in the prompt: 'compact' table, or 'verbose' pydantic representation
+PROMPT_FORMAT = os.getenv("PROMPT_FORMAT") or "compact"
+# Maximal number of tokens of the events of a window in the prompt, 0 to send all of them
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET") or "1500")
+
+# Cache of the commentaries, disabled if no path is specified
+COMMENTARY_CACHE_PATH = os.getenv("COMMENTARY_CACHE_PATH")
+COMMENTARY_CACHE_MAX_ENTRIES = int(os.getenv("COMMENTARY_CACHE_MAX_ENTRIES", "10000"))
+COMMENTARY_CACHE_MAX_AGE = float(os.getenv("COMMENTARY_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+
+# Metrics of the pipeline: Prometheus port, JSONL trace of the spans, and profile of a tick
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_TRACE_PATH = os.getenv("METRICS_TRACE_PATH")
+PROFILE_TICK_PATH = os.getenv("PROFILE_TICK_PATH")
+
 PATH_MATCH_INFO = os.getenv("MATCH_METADATA_PATH")
 SOURCE_EVENTS = os.getenv("SOURCE_EVENTS")
-SUPPORTED_EVENTS = {
-    "goalkeeper",
-    "pass",
-    "dribble",
-    "shot",
-    "bad_behaviour",
-    "interception",
-    "ball_receipt",
-    "duel",
-    "play_pattern",
-}
+# Format of the source of events: 'json' (StatsBomb), or one registered by another package
+EVENTS_SOURCE = os.getenv("EVENTS_SOURCE") or "json"
+# Follow the source of events while a live feed appends to it
+FOLLOW_SOURCE_EVENTS = os.getenv("FOLLOW_SOURCE_EVENTS", "false").lower() in ("1", "true", "yes")
+# Cache of the converted events of each game, disabled if no folder is specified
+MATCH_CACHE_DIR = Path(os.environ["MATCH_CACHE_DIR"]) if os.getenv("MATCH_CACHE_DIR") else None
+# Close windows after shots and merge quiet ones, instead of commenting every 20 seconds
+ADAPTIVE_WINDOWS = os.getenv("ADAPTIVE_WINDOWS", "false").lower() in ("1", "true", "yes")
+# Decoder of the JSON events: 'json', 'orjson', 'msgspec' (typed events) or 'auto'
+EVENTS_DECODER = os.getenv("EVENTS_DECODER") or "auto"
+# Start of the description of the events, followed by their details
+DESCRIPTION_PREFIX = "Additional Informations: "
+
+# Every period restarts its timestamps at 00:00:00.000, the game clock places
+# period N at (N - 1) hours so that clocks stay monotonic over the whole game.
+PERIOD_CLOCK_OFFSET_MS = 60 * 60 * 1000
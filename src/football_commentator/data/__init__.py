@@ -1 +1,25 @@
-"""Module."""
+"""Module with the sources of events."""
+
+from typing import Any
+
+from football_commentator.data.preprocessor import Preprocessor
+from football_commentator.plugins import SOURCES
+
+
+def get_source(name: str, **options: Any) -> Preprocessor:
+    """Get the preprocessor of a source of events by its name.
+
+    Only the selected source is imported, with its dependencies.
+
+    Args:
+        name (str): name of the source, 'json' (StatsBomb JSON files), or one registered
+            by another package (entry point 'football_commentator.sources').
+        options (Any): parameters of the preprocessor (path to the source ..).
+
+    Raises:
+        ValueError: The source is unknown.
+
+    Returns:
+        Preprocessor: The preprocessor of the source.
+    """
+    return SOURCES.create(name, **options)
@@ -0,0 +1,101 @@
+"""Module to decode the events of a JSON source, with the fastest library available."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from football_commentator.data.json_stream import iter_json_events
+
+
+class EventDecoder:
+    """Class to decode the events of a JSON array or JSON Lines file into dicts.
+
+    This decoder relies on the standard library. The fields of each event are then
+    extracted from its dict by the preprocessor.
+    """
+
+    name = "json"
+    typed = False  # Decodes into typed events, whose fields are given by `event_fields`
+
+    def decode(self, source: Path) -> list[Any]:
+        """Decode all the events of a file.
+
+        Args:
+            source (Path): path to the JSON array or JSON Lines file.
+
+        Returns:
+            list[Any]: The events.
+        """
+        if source.suffix == ".jsonl":
+            return list(iter_json_events(source))
+        with open(source) as file:
+            return json.load(file)
+
+    def event_fields(self, event: Any) -> dict[str, Any] | None:
+        """Extract the fields of a `FootballEvent` from a typed event.
+
+        Args:
+            event (Any): The decoded event.
+
+        Raises:
+            NotImplementedError: The decoder does not decode into typed events.
+
+        Returns:
+            dict[str, Any] | None: The fields, None for events that are not commented on.
+        """
+        raise NotImplementedError(f"The '{self.name}' decoder does not type the events.")
+
+
+class ORJSONDecoder(EventDecoder):
+    """Class to decode the events into dicts with orjson, parsing in native code."""
+
+    name = "orjson"
+
+    def decode(self, source: Path) -> list[Any]:
+        """Decode all the events of a file.
+
+        Args:
+            source (Path): path to the JSON array or JSON Lines file.
+
+        Returns:
+            list[Any]: The events.
+        """
+        import orjson
+
+        data = source.read_bytes()
+        if source.suffix == ".jsonl":
+            return [orjson.loads(line) for line in data.splitlines() if line.strip()]
+        return orjson.loads(data)
+
+
+def get_decoder(name: str = "auto") -> EventDecoder:
+    """Get a decoder of the events by name.
+
+    Args:
+        name (str, optional): 'msgspec' (typed events), 'orjson', 'json' (standard
+            library), or 'auto' for the fastest one installed. Defaults to 'auto'.
+
+    Raises:
+        ValueError: The decoder is unknown.
+
+    Returns:
+        EventDecoder: The decoder.
+    """
+    if name == "auto":
+        for candidate in ("msgspec", "orjson"):
+            try:
+                return get_decoder(candidate)
+            except ImportError:
+                continue
+        return EventDecoder()
+    if name == "msgspec":
+        from football_commentator.data.typed_decoding import TypedEventDecoder
+
+        return TypedEventDecoder()
+    if name == "orjson":
+        import orjson  # noqa: F401
+
+        return ORJSONDecoder()
+    if name == "json":
+        return EventDecoder()
+    raise ValueError(f"The events decoder '{name}' is not supported.")
@@ -0,0 +1,232 @@
+"""Module to represent football events as columns."""
+
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from football_commentator.event import EventType, FootballEvent
+from football_commentator.utils import clock_to_timestamp
+
+# Columns of a batch with their dtype, missing values are NaN for positions and xG, and -1
+# for codes.
+COLUMNS_DTYPES = {
+    "clocks": np.int64,
+    "periods": np.int8,
+    "positions_x": np.float64,
+    "positions_y": np.float64,
+    "xgs": np.float64,
+    "team_codes": np.int32,
+    "player_codes": np.int32,
+    "event_type_codes": np.int16,
+    "description_codes": np.int32,
+    "outcome_codes": np.int16,
+    "card_codes": np.int16,
+}
+
+
+class StringTable:
+    """Class to intern strings as integer codes."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        """Initialize class.
+
+        Args:
+            values (Iterable[str], optional): values known in advance. Defaults to ().
+        """
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self) -> int:
+        """Number of interned strings."""
+        return len(self.values)
+
+    def code(self, value: str | None) -> int:
+        """Get the code of a string, interning it if needed.
+
+        Args:
+            value (str | None): the string, None is coded as -1.
+
+        Returns:
+            int: The code of the string.
+        """
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def value(self, code: int) -> str | None:
+        """Get the string of a code.
+
+        Args:
+            code (int): The code of the string.
+
+        Returns:
+            str | None: The string, None for the code -1.
+        """
+        return None if code < 0 else self.values[code]
+
+
+class EventBatch:
+    """Class to store football events as a struct of arrays.
+
+    Clocks, positions and codes are NumPy columns. Teams, players, event types,
+    descriptions, outcomes and cards are interned in string tables shared by all the
+    slices of a batch.
+    `FootballEvent` objects are only built on demand, by `to_events`.
+    """
+
+    def __init__(
+        self,
+        tables: dict[str, StringTable] | None = None,
+        columns: dict[str, np.ndarray] | None = None,
+        size: int = 0,
+    ):
+        """Initialize class.
+
+        Args:
+            tables (dict[str, StringTable] | None, optional): string tables to share.
+                Defaults to None (new tables).
+            columns (dict[str, np.ndarray] | None, optional): columns to share.
+                Defaults to None (empty columns).
+            size (int, optional): number of events in the columns. Defaults to 0.
+        """
+        self.tables = tables or {
+            "teams": StringTable(),
+            "players": StringTable(),
+            "event_types": StringTable(event_type.value for event_type in EventType),
+            "descriptions": StringTable(),
+            "outcomes": StringTable(),
+            "cards": StringTable(),
+        }
+        self._columns = columns or {
+            name: np.empty(16, dtype=dtype) for name, dtype in COLUMNS_DTYPES.items()
+        }
+        self._size = size
+
+    def __len__(self) -> int:
+        """Number of events in the batch."""
+        return self._size
+
+    def __getitem__(self, index: slice) -> "EventBatch":
+        """Get a slice of the batch, sharing its columns and string tables.
+
+        Args:
+            index (slice): The slice of events.
+
+        Returns:
+            EventBatch: The events of the slice.
+        """
+        start, stop, step = index.indices(self._size)
+        columns = {name: column[start:stop:step] for name, column in self.columns.items()}
+        return EventBatch(tables=self.tables, columns=columns, size=len(range(start, stop, step)))
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+        """Columns of the batch, without the unused capacity."""
+        return {name: column[: self._size] for name, column in self._columns.items()}
+
+    @property
+    def clocks(self) -> np.ndarray:
+        """Game clocks of the events (in ms)."""
+        return self._columns["clocks"][: self._size]
+
+    def append(
+        self,
+        team: str,
+        event_type: str,
+        period: int,
+        clock: int,
+        player: str | None,
+        position_x: float | None,
+        position_y: float | None,
+        description: str,
+        xg: float | None = None,
+        outcome: str | None = None,
+        card: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Append an event to the batch, the capacity is doubled when needed (16 at least).
+
+        Args:
+            team (str): team of the event.
+            event_type (str): type of the event.
+            period (int): period of the event.
+            clock (int): game clock of the event (in ms).
+            player (str | None): player of the event.
+            position_x (float | None): X of the event's position.
+            position_y (float | None): Y of the event's position.
+            description (str): description of the event.
+            xg (float | None, optional): expected goals of a shot. Defaults to None.
+            outcome (str | None, optional): outcome of the event. Defaults to None.
+            card (str | None, optional): card given. Defaults to None.
+            kwargs (Any): other fields of `FootballEvent`, not stored (timestamp ..)
+        """
+        if self._size == len(self._columns["clocks"]):
+            for name, column in self._columns.items():
+                self._columns[name] = np.resize(column, max(16, 2 * len(column)))
+
+        row = self._size
+        self._columns["clocks"][row] = clock
+        self._columns["periods"][row] = period
+        self._columns["positions_x"][row] = np.nan if position_x is None else position_x
+        self._columns["positions_y"][row] = np.nan if position_y is None else position_y
+        self._columns["xgs"][row] = np.nan if xg is None else xg
+        self._columns["team_codes"][row] = self.tables["teams"].code(team)
+        self._columns["player_codes"][row] = self.tables["players"].code(player)
+        self._columns["event_type_codes"][row] = self.tables["event_types"].code(event_type)
+        self._columns["description_codes"][row] = self.tables["descriptions"].code(description)
+        self._columns["outcome_codes"][row] = self.tables["outcomes"].code(outcome)
+        self._columns["card_codes"][row] = self.tables["cards"].code(card)
+        self._size += 1
+
+    def sort(self) -> None:
+        """Sort the events by game clock, keeping the order of events with the same clock."""
+        order = np.argsort(self.clocks, kind="stable")
+        for name, column in self.columns.items():
+            self._columns[name][: self._size] = column[order]
+
+    def event(self, row: int) -> FootballEvent:
+        """Materialize one event.
+
+        Args:
+            row (int): The position of the event in the batch.
+
+        Returns:
+            FootballEvent: The event.
+        """
+        clock = int(self._columns["clocks"][row])
+        position_x = float(self._columns["positions_x"][row])
+        position_y = float(self._columns["positions_y"][row])
+        xg = float(self._columns["xgs"][row])
+        return FootballEvent(
+            team=str(self.tables["teams"].value(int(self._columns["team_codes"][row]))),
+            event_type=str(
+                self.tables["event_types"].value(int(self._columns["event_type_codes"][row]))
+            ),
+            timestamp=clock_to_timestamp(clock),
+            period=int(self._columns["periods"][row]),
+            clock=clock,
+            player=self.tables["players"].value(int(self._columns["player_codes"][row])),
+            position_x=None if np.isnan(position_x) else position_x,
+            position_y=None if np.isnan(position_y) else position_y,
+            description=str(
+                self.tables["descriptions"].value(int(self._columns["description_codes"][row]))
+            ),
+            xg=None if np.isnan(xg) else xg,
+            outcome=self.tables["outcomes"].value(int(self._columns["outcome_codes"][row])),
+            card=self.tables["cards"].value(int(self._columns["card_codes"][row])),
+        )
+
+    def to_events(self) -> list[FootballEvent]:
+        """Materialize all the events of the batch.
+
+        Returns:
+            list[FootballEvent]: The events.
+        """
+        return [self.event(row) for row in range(self._size)]
@@ -0,0 +1,198 @@
+"""Module to store the events of a game sorted by game clock."""
+
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from football_commentator.constants import PERIOD_CLOCK_OFFSET_MS
+from football_commentator.data.event_batch import EventBatch
+from football_commentator.data.preprocessor import Preprocessor
+from football_commentator.event import FootballEvent
+from football_commentator.metrics import METRICS
+
+
+class MatchEventStore:
+    """Class to store the events of a game, converted once and sorted by game clock.
+
+    Each raw event goes through the preprocessor only once, when it enters the store,
+    and is kept in a columnar `EventBatch`. Interval queries then use a binary search
+    over the sorted clocks, so a window costs O(log n + k) instead of a scan over the
+    whole game.
+
+    The store is safe to share between threads (e.g. Streamlit sessions), and follows
+    sources that keep receiving events through `refresh`. Events already converted in
+    a cache of the preprocessor are loaded as they are.
+    """
+
+    def __init__(self, preprocessor: Preprocessor):
+        """Initialize class.
+
+        Args:
+            preprocessor (Preprocessor): preprocessor used to convert the raw events.
+        """
+        self.preprocessor = preprocessor
+        self.batch = EventBatch()
+        # Duration (ms) of each period, known so far
+        self.period_durations: dict[int, int] = {}
+        self._lock = threading.RLock()
+        cached_batch = preprocessor.load_cached_batch()
+        if cached_batch is None:
+            self.extend(preprocessor.events)
+            preprocessor.cache_batch(self.batch)
+        else:
+            self.batch = cached_batch
+            self._update_period_durations(cached_batch.columns["periods"], cached_batch.clocks)
+        self.refresh()
+
+    def __len__(self) -> int:
+        """Number of events in the store."""
+        return len(self.batch)
+
+    @property
+    def duration(self) -> int:
+        """Time played from the kick off to the last known event (in ms)."""
+        with self._lock:
+            return sum(self.period_durations.values())
+
+    def refresh(self) -> int:
+        """Insert the events added to the source since the last refresh.
+
+        Returns:
+            int: Number of events added to the store.
+        """
+        return self.extend(self.preprocessor.read_new_events())
+
+    def extend(self, raw_events: Iterable[dict[str, Any]]) -> int:
+        """Convert and insert new raw events.
+
+        Args:
+            raw_events (Iterable[dict[str, Any]]): raw events, as loaded by the preprocessor.
+
+        Returns:
+            int: Number of events added to the store.
+        """
+        with self._lock, METRICS.span("event_conversion") as span:
+            span["events"] = self._extend(raw_events)
+            return span["events"]
+
+    def _extend(self, raw_events: Iterable[dict[str, Any]]) -> int:
+        """Convert and insert new raw events, the lock being held.
+
+        Args:
+            raw_events (Iterable[dict[str, Any]]): raw events, as loaded by the preprocessor.
+
+        Returns:
+            int: Number of events added to the store.
+        """
+        size = len(self.batch)
+        last_clock = int(self.batch.clocks[-1]) if size else -1
+        is_sorted = True
+        for raw_event in raw_events:
+            fields = self.preprocessor.load_event_fields(raw_event)
+            if fields is None:
+                continue
+            self.batch.append(**fields)
+
+            clock, period = fields["clock"], fields["period"]
+            period_clock = clock - (period - 1) * PERIOD_CLOCK_OFFSET_MS
+            if period_clock > self.period_durations.get(period, -1):
+                self.period_durations[period] = period_clock
+            # Feeds are almost always ordered, sorting is only needed otherwise.
+            if clock < last_clock:
+                is_sorted = False
+            last_clock = clock
+
+        if not is_sorted:
+            self.batch.sort()
+        return len(self.batch) - size
+
+    def _update_period_durations(self, periods: np.ndarray, clocks: np.ndarray) -> None:
+        """Extend the duration of the periods to the clocks of new events.
+
+        Args:
+            periods (np.ndarray): periods of the events.
+            clocks (np.ndarray): game clocks of the events (in ms).
+        """
+        period_clocks = clocks - (periods.astype(np.int64) - 1) * PERIOD_CLOCK_OFFSET_MS
+        for period in np.unique(periods):
+            duration = int(period_clocks[periods == period].max())
+            if duration > self.period_durations.get(int(period), -1):
+                self.period_durations[int(period)] = duration
+
+    def elapsed_to_clock(self, elapsed: int) -> int:
+        """Convert the time elapsed since the kick off to a game clock.
+
+        Periods are played back to back, with the duration observed in the events.
+        The last known period is open ended.
+
+        Args:
+            elapsed (int): Time played since the kick off (in ms).
+
+        Returns:
+            int: The corresponding game clock (in ms).
+        """
+        with self._lock:
+            period_durations = dict(self.period_durations)
+        periods = sorted(period_durations)
+        for period in periods[:-1]:
+            if elapsed <= period_durations[period]:
+                return (period - 1) * PERIOD_CLOCK_OFFSET_MS + elapsed
+            elapsed -= period_durations[period]
+        last_period = periods[-1] if periods else 1
+        return (last_period - 1) * PERIOD_CLOCK_OFFSET_MS + elapsed
+
+    def clock_to_elapsed(self, clock: int) -> int:
+        """Convert a game clock to the time elapsed since the kick off.
+
+        Args:
+            clock (int): The game clock (in ms).
+
+        Returns:
+            int: The corresponding time played since the kick off (in ms).
+        """
+        period = clock // PERIOD_CLOCK_OFFSET_MS + 1
+        with self._lock:
+            played = sum(
+                duration for other, duration in self.period_durations.items() if other < period
+            )
+        return played + clock - (period - 1) * PERIOD_CLOCK_OFFSET_MS
+
+    def load_batch_between(self, start: int, end: int) -> EventBatch:
+        """Load the columns of all events between two game clocks, without copy.
+
+        Args:
+            start (int): start of the interval (game clock, in ms).
+            end (int): end of the interval (game clock, in ms), excluded.
+
+        Returns:
+            EventBatch: The events that are within the interval.
+        """
+        with self._lock:
+            low, high = np.searchsorted(self.batch.clocks, [start, end], side="left")
+            return self.batch[int(low) : int(high)]
+
+    def load_events_between(self, start: int, end: int) -> list[FootballEvent]:
+        """Load all events between two game clocks.
+
+        Args:
+            start (int): start of the interval (game clock, in ms).
+            end (int): end of the interval (game clock, in ms), excluded.
+
+        Returns:
+            list[FootballEvent]: The list of events that are within the interval.
+        """
+        return self.load_batch_between(start=start, end=end).to_events()
+
+    def load_all_events_in_intervall(self, start: int, end: int) -> list[FootballEvent]:
+        """Load all events with a time interval.
+
+        Args:
+            start (int): start of the interval (game clock, in seconds).
+            end (int): end of the interval (game clock, in seconds), included.
+
+        Returns:
+            list[FootballEvent]: The list of events that are within the interval.
+        """
+        return self.load_events_between(start=1000 * start, end=1000 * (end + 1))
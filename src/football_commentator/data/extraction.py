@@ -0,0 +1,289 @@
+"""Module to extract the fields of raw events, from a declarative spec of their provider."""
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any
+
+from football_commentator.constants import DESCRIPTION_PREFIX
+from football_commentator.event import EventType
+from football_commentator.utils import compute_match_clock
+
+# Path to a value in a raw event: the keys (or list indexes) to follow from its root
+FieldPath = tuple[str | int, ...]
+# Path to the name of a detail in a raw event: its section, its key in the section, and
+# the key of its name, e.g. ('shot', 'outcome', 'name')
+DetailPath = tuple[str, str, str]
+# Function reading a value in a raw event
+Reader = Callable[[dict[str, Any]], Any]
+# Function extracting the fields of a `FootballEvent`, None for the skipped events
+Extractor = Callable[[dict[str, Any]], dict[str, Any] | None]
+
+# Named details of the StatsBomb events giving their outcome and the card given
+OUTCOME_DETAIL = "outcome"
+CARD_DETAIL = "card"
+
+
+def format_description(named_details: Mapping[str, Any]) -> str:
+    """Build the description of an event from its named details.
+
+    Args:
+        named_details (Mapping[str, Any]): name of each detail (outcome, body part ..).
+
+    Returns:
+        str: The description, e.g. 'Additional Informations: (outcome: Goal)'.
+    """
+    return DESCRIPTION_PREFIX + ", ".join(f"({key}: {val})" for key, val in named_details.items())
+
+
+@dataclass(frozen=True)
+class ExtractionSpec:
+    """Class to describe where the fields of a `FootballEvent` are, in the raw events.
+
+    The event type, team and timestamp are required. The other fields are optional, an
+    event without them gets the default value of `FootballEvent`.
+
+    The description lists the named details of the event, declared per event type in
+    `detail_paths`, grouped by section. An event type without paths is not described.
+    The outcome and the card are read from the same details, as structured fields.
+    """
+
+    name: str
+    event_type: FieldPath
+    team: FieldPath
+    timestamp: FieldPath
+    period: FieldPath | None = None
+    player: FieldPath | None = None
+    position_x: FieldPath | None = None
+    position_y: FieldPath | None = None
+    xg: FieldPath | None = None
+    # Event types that are not commented on, such as the lineups
+    skipped_event_types: frozenset[str] = frozenset()
+    # Named details of each event type, in the order they are described: the name of
+    # each detail, and the path to it
+    detail_paths: Mapping[str, Mapping[str, DetailPath]] = field(default_factory=dict)
+    # Named details giving the outcome of the events and the cards
+    outcome_detail: str | None = None
+    card_detail: str | None = None
+
+
+def _required(path: FieldPath) -> Reader:
+    """Reader of a path that every event has."""
+    if not path:
+        raise ValueError("A field path needs at least one key.")
+    if len(path) == 1:
+        return itemgetter(path[0])
+
+    def read(event: dict[str, Any]) -> Any:
+        value: Any = event
+        for key in path:
+            value = value[key]
+        return value
+
+    return read
+
+
+def _optional(path: FieldPath | None, default: Any) -> Reader:
+    """Reader of a path that some events miss, they get the default value."""
+    if path is None:
+        return lambda event: default
+    if not path:
+        raise ValueError("A field path needs at least one key.")
+    if len(path) == 1:
+        key: Any = path[0]
+        return lambda event: event.get(key, default)
+
+    def read(event: dict[str, Any]) -> Any:
+        value: Any = event
+        try:
+            for key in path:
+                value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return value
+
+    return read
+
+
+def _details(paths: Mapping[str, DetailPath]) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """Reader of the named details of an event type, the missing ones are left out.
+
+    The details are grouped by section, looked up once. Most details are missing from
+    most events, so they are looked up without raising errors.
+    """
+    sections: dict[str, list[tuple[str, str, str]]] = {}
+    for name, path in paths.items():
+        if len(path) != 3:
+            raise ValueError("A detail path needs a section, a detail and the key of its name.")
+        section, key, name_key = path
+        sections.setdefault(section, []).append((name, key, name_key))
+    groups = tuple((section, tuple(details)) for section, details in sections.items())
+
+    def read(event: dict[str, Any]) -> dict[str, Any]:
+        named = {}
+        for section, details in groups:
+            values = event.get(section)
+            if type(values) is not dict:
+                continue
+            for name, key, name_key in details:
+                detail = values.get(key)
+                if type(detail) is dict:
+                    value = detail.get(name_key)
+                    if value is not None:
+                        named[name] = value
+        return named
+
+    return read
+
+
+def _no_details(event: dict[str, Any]) -> dict[str, Any]:
+    """Reader of the details of the event types without any."""
+    return {}
+
+
+@dataclass(frozen=True)
+class FieldReaders:
+    """Class to gather the readers of each field of a `FootballEvent`, built from a spec."""
+
+    event_type: Reader
+    team: Reader
+    timestamp: Reader
+    period: Reader
+    player: Reader
+    position_x: Reader
+    position_y: Reader
+    xg: Reader
+    details: Reader
+    # Reader of the details of each event type, for the callers knowing the type
+    details_by_type: Mapping[str, Callable[[dict[str, Any]], dict[str, Any]]]
+    description: Reader
+    outcome: Reader
+    card: Reader
+
+
+def build_field_readers(spec: ExtractionSpec) -> FieldReaders:
+    """Build the readers of the fields, from the paths of a spec.
+
+    Args:
+        spec (ExtractionSpec): The spec of the provider.
+
+    Raises:
+        ValueError: A path of the spec is empty.
+
+    Returns:
+        FieldReaders: The readers.
+    """
+    event_type = _required(spec.event_type)
+    details_by_type = {
+        event_type_name: _details(paths) for event_type_name, paths in spec.detail_paths.items()
+    }
+
+    def details(event: dict[str, Any]) -> dict[str, Any]:
+        return details_by_type.get(event_type(event), _no_details)(event)
+
+    def detail(key: str | None) -> Reader:
+        if key is None:
+            return lambda event: None
+        return lambda event: details(event).get(key)
+
+    return FieldReaders(
+        event_type=event_type,
+        team=_required(spec.team),
+        timestamp=_required(spec.timestamp),
+        period=_optional(spec.period, 1),
+        player=_optional(spec.player, None),
+        position_x=_optional(spec.position_x, None),
+        position_y=_optional(spec.position_y, None),
+        xg=_optional(spec.xg, None),
+        details=details,
+        details_by_type=details_by_type,
+        description=lambda event: format_description(details(event)),
+        outcome=detail(spec.outcome_detail),
+        card=detail(spec.card_detail),
+    )
+
+
+def compile_extraction_spec(spec: ExtractionSpec) -> Extractor:
+    """Compile a spec into a function extracting the fields of the raw events.
+
+    The readers of the paths are built once, so the extraction of an event is a
+    sequence of lookups, without walking the spec.
+
+    Args:
+        spec (ExtractionSpec): The spec of the provider.
+
+    Raises:
+        ValueError: A path of the spec is empty.
+
+    Returns:
+        Extractor: The function, taking a raw event and returning the fields of its
+            `FootballEvent`, or None for the skipped events.
+    """
+    readers = build_field_readers(spec)
+    skipped_event_types = spec.skipped_event_types
+    details_by_type = readers.details_by_type
+    outcome_detail, card_detail = spec.outcome_detail, spec.card_detail
+
+    def extract(event: dict[str, Any]) -> dict[str, Any] | None:
+        event_type = readers.event_type(event)
+        if event_type in skipped_event_types:
+            return None
+        timestamp = readers.timestamp(event)
+        period = readers.period(event)
+        # The details are collected once, for the description, the outcome and the card
+        named = details_by_type.get(event_type, _no_details)(event)
+        return {
+            "timestamp": timestamp,
+            "period": period,
+            "clock": compute_match_clock(period, timestamp),
+            "event_type": event_type,
+            "team": readers.team(event),
+            "player": readers.player(event),
+            "position_x": readers.position_x(event),
+            "position_y": readers.position_y(event),
+            "description": format_description(named),
+            "xg": readers.xg(event),
+            "outcome": named.get(outcome_detail) if outcome_detail else None,
+            "card": named.get(card_detail) if card_detail else None,
+        }
+
+    return extract
+
+
+def _section_details(section: str, *names: str) -> dict[str, DetailPath]:
+    """Paths to the named details of a section of the StatsBomb events."""
+    return {name: (section, name, "name") for name in names}
+
+
+# Named details of the StatsBomb events, in the section of their type
+STATSBOMB_DETAIL_PATHS: dict[str, dict[str, DetailPath]] = {
+    EventType.PASS.value: _section_details(
+        "pass", "recipient", "height", "body_part", "type", "outcome", "technique"
+    ),
+    EventType.BALL_RECEIPT.value: _section_details("ball_receipt", "outcome"),
+    EventType.DUEL.value: _section_details("duel", "type", "outcome"),
+    EventType.DRIBBLE.value: _section_details("dribble", "outcome"),
+    EventType.INTERCEPTION.value: _section_details("interception", "outcome"),
+    EventType.GOAL_KEEPER.value: _section_details(
+        "goalkeeper", "position", "technique", "body_part", "type", "outcome"
+    ),
+    EventType.SHOT.value: _section_details("shot", "type", "body_part", "technique", "outcome"),
+    EventType.FOUL_COMMITTED.value: _section_details("foul_committed", "type", "card"),
+    EventType.BAD_BEHAVIOUR.value: _section_details("bad_behaviour", "card"),
+}
+
+STATSBOMB_SPEC = ExtractionSpec(
+    name="statsbomb",
+    event_type=("type", "name"),
+    team=("team", "name"),
+    timestamp=("timestamp",),
+    period=("period",),
+    player=("player", "name"),
+    position_x=("location", 0),
+    position_y=("location", 1),
+    xg=("shot", "statsbomb_xg"),
+    skipped_event_types=frozenset({EventType.STARTING_XI.value}),
+    detail_paths=STATSBOMB_DETAIL_PATHS,
+    outcome_detail=OUTCOME_DETAIL,
+    card_detail=CARD_DETAIL,
+)
@@ -0,0 +1,172 @@
+"""Module to read JSON events incrementally."""
+
+import codecs
+import json
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Separators of the events in a JSON array, or in a stream of JSON objects.
+SEPARATORS = " \t\n\r,[]"
+
+
+def find_value_end(text: str, position: int) -> int | None:
+    """Find the end of a JSON value, without decoding it.
+
+    The value ends with the bracket closing its first one, or before the first comma
+    or line break outside of brackets and strings.
+
+    Args:
+        text (str): The text.
+        position (int): The start of the value.
+
+    Returns:
+        int | None: The position after the value, None when the text ends before it.
+    """
+    depth, in_string, escaped = 0, False, False
+    for index in range(position, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth <= 0:
+                return index + 1
+        elif depth == 0 and char in ",\n":
+            return index
+    return None
+
+
+class JSONEventsDecoder:
+    """Class to decode JSON events one at a time, from successive chunks of text.
+
+    The text can either be a JSON array of events, which may not be closed yet, or
+    a stream of concatenated JSON objects (JSON Lines). An event split between two
+    chunks is kept until the next chunk completes it. A malformed event is logged and
+    skipped, once complete.
+    """
+
+    def __init__(self):
+        """Initialize class."""
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+
+    @property
+    def pending(self) -> str:
+        """Text received but not decoded yet."""
+        return self._buffer
+
+    def feed(self, text: str) -> Iterator[dict[str, Any]]:
+        """Decode all the complete events of the received text.
+
+        Args:
+            text (str): The next chunk of text.
+
+        Yields:
+            dict[str, Any]: The decoded events.
+        """
+        buffer = self._buffer + text
+        position, size = 0, len(buffer)
+        while True:
+            while position < size and buffer[position] in SEPARATORS:
+                position += 1
+            if position == size:
+                break
+            try:
+                event, position = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                end = find_value_end(buffer, position)
+                if end is None:
+                    # Incomplete event, it is decoded with the next chunk.
+                    break
+                logger.warning(
+                    "Skipped a malformed JSON event (%s): %.100s", error.msg, buffer[position:end]
+                )
+                position = end
+                continue
+            yield event
+        self._buffer = buffer[position:]
+
+    def close(self) -> None:
+        """Check that all the received text has been decoded.
+
+        Raises:
+            ValueError: The text ends with an incomplete or malformed event.
+        """
+        if self._buffer.strip(SEPARATORS):
+            raise ValueError(f"Invalid JSON event: '{self._buffer[:100]}'")
+
+
+def iter_json_events(source: Path, chunk_size: int = 1 << 16) -> Iterator[dict[str, Any]]:
+    """Read the events of a JSON file one at a time, with a bounded memory.
+
+    Args:
+        source (Path): path to the JSON file.
+        chunk_size (int, optional): Size of the chunks read (in bytes). Defaults to 64 KiB.
+
+    Yields:
+        dict[str, Any]: The events of the file.
+    """
+    decoder = JSONEventsDecoder()
+    with open(source, encoding="utf-8") as file:
+        while chunk := file.read(chunk_size):
+            yield from decoder.feed(chunk)
+    decoder.close()
+
+
+class JSONEventsTail:
+    """Class to follow a JSON file, to which a live feed appends events.
+
+    Only the bytes written after the last read offset are read and decoded, so each
+    read costs the size of the new data instead of the size of the file.
+    """
+
+    def __init__(self, source: Path, chunk_size: int = 1 << 16):
+        """Initialize class.
+
+        Args:
+            source (Path): path to the JSON file.
+            chunk_size (int, optional): Size of the chunks read (in bytes). Defaults to 64 KiB.
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        """Restart from the beginning of the file."""
+        self.offset = 0
+        self._decoder = JSONEventsDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def read_new_events(self) -> Iterator[dict[str, Any]]:
+        """Read the events appended since the last read.
+
+        If the file has been truncated or replaced by a shorter one, it is read again
+        from the beginning.
+
+        Yields:
+            dict[str, Any]: The new events.
+        """
+        if not self.source.exists():
+            return
+        if self.source.stat().st_size < self.offset:
+            self._reset()
+
+        with open(self.source, "rb") as file:
+            file.seek(self.offset)
+            while chunk := file.read(self.chunk_size):
+                self.offset += len(chunk)
+                yield from self._decoder.feed(self._text_decoder.decode(chunk))
@@ -0,0 +1,126 @@
+"""Module to cache the converted events of a game as memory-mapped NumPy columns."""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from football_commentator.data.event_batch import COLUMNS_DTYPES, EventBatch, StringTable
+
+# Version of the layout and of the conversion of the events, to change with them (it
+# invalidates the cached games)
+MATCH_CACHE_VERSION = 5
+
+
+def file_sha256(path: Path) -> str:
+    """Hash the content of a file.
+
+    Args:
+        path (Path): path to the file.
+
+    Returns:
+        str: The SHA-256 of the file, in hexadecimal.
+    """
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+class MatchCache:
+    """Class to store the converted events of a source, for an instant loading.
+
+    The events are kept sorted by game clock, one `.npy` file per column of the
+    `EventBatch`, with the string tables (teams, players, descriptions ...) in JSON.
+    Columns are memory-mapped when loaded: only the pages of the windows read are
+    loaded from disk.
+
+    The cache follows its source: it is valid while the source keeps its size and
+    modification time, or, if the source was touched, its content hash.
+    """
+
+    def __init__(self, source: Path, cache_dir: Path):
+        """Initialize class.
+
+        Args:
+            source (Path): path to the source of the events.
+            cache_dir (Path): folder of the cached games.
+        """
+        self.source = source
+        source_key = hashlib.sha256(str(source.resolve()).encode()).hexdigest()[:12]
+        self.path = cache_dir / f"{source.stem}-{source_key}"
+
+    def _read_meta(self) -> dict | None:
+        """Read the description of the cached game, None if there is none."""
+        try:
+            return json.loads((self.path / "meta.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def is_valid(self) -> bool:
+        """Check that the cached game matches its source.
+
+        Returns:
+            bool: The cache can be loaded.
+        """
+        meta = self._read_meta()
+        if meta is None or meta.get("version") != MATCH_CACHE_VERSION:
+            return False
+        stat = self.source.stat()
+        if stat.st_size != meta["size"]:
+            return False
+        if stat.st_mtime_ns == meta["mtime_ns"]:
+            return True
+        if file_sha256(self.source) != meta["sha256"]:
+            return False
+        # Same content, the new modification time saves the hash next time.
+        meta["mtime_ns"] = stat.st_mtime_ns
+        (self.path / "meta.json").write_text(json.dumps(meta))
+        return True
+
+    def load(self) -> EventBatch:
+        """Load the cached game, its columns being memory-mapped.
+
+        Returns:
+            EventBatch: The events, sorted by game clock.
+        """
+        meta = self._read_meta() or {}
+        tables = json.loads((self.path / "tables.json").read_text())
+        columns = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in COLUMNS_DTYPES
+        }
+        return EventBatch(
+            tables={name: StringTable(values) for name, values in tables.items()},
+            columns=columns,
+            size=meta.get("events", len(columns["clocks"])),
+        )
+
+    def save(self, batch: EventBatch) -> None:
+        """Cache the events of the source.
+
+        The files are written in a temporary folder, then moved at once, so a reader
+        never sees a partial cache.
+
+        Args:
+            batch (EventBatch): The events, sorted by game clock.
+        """
+        stat = self.source.stat()
+        meta = {
+            "version": MATCH_CACHE_VERSION,
+            "source": str(self.source),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(self.source),
+            "events": len(batch),
+        }
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        shutil.rmtree(temporary, ignore_errors=True)
+        temporary.mkdir(parents=True)
+        for name, column in batch.columns.items():
+            np.save(temporary / f"{name}.npy", np.ascontiguousarray(column))
+        tables = {name: table.values for name, table in batch.tables.items()}
+        (temporary / "tables.json").write_text(json.dumps(tables))
+        (temporary / "meta.json").write_text(json.dumps(meta))
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(temporary, self.path)
@@ -1,18 +1,93 @@
 """Module for preprocessing data."""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, ClassVar
 
+from football_commentator.data.extraction import (
+    ExtractionSpec,
+    Extractor,
+    FieldReaders,
+    build_field_readers,
+    compile_extraction_spec,
+)
 from football_commentator.event import FootballEvent
-from football_commentator.utils import filter_timestamp_event
+from football_commentator.utils import compute_match_clock
+
+if TYPE_CHECKING:
+    from football_commentator.data.event_batch import EventBatch
+    from football_commentator.data.event_store import MatchEventStore
 
 
 class Preprocessor(ABC):
-    """Abstract class to organize preprocessing."""
+    """Abstract class to organize preprocessing.
+
+    Sources whose events are dicts can declare where their fields are, in an
+    `extraction_spec`. The spec is compiled once per class into the readers of the
+    fields (`_readers`, for their `load_*` methods) and into the function converting
+    the events, so both read the fields the same way.
+    """
+
+    extraction_spec: ClassVar[ExtractionSpec | None] = None
+    _readers: ClassVar[FieldReaders | None] = None
+    _extract: Extractor | None = None
+
+    def __init_subclass__(cls, **kwargs: Any):
+        """Compile the extraction spec of a source."""
+        super().__init_subclass__(**kwargs)
+        if "extraction_spec" in cls.__dict__:
+            spec = cls.extraction_spec
+            cls._readers = None if spec is None else build_field_readers(spec)
+            cls._extract = None if spec is None else staticmethod(compile_extraction_spec(spec))
 
     def __init__(self):
         """Class Initializer."""
         self.events = []
+        self._event_store: MatchEventStore | None = None
+
+    @property
+    def event_store(self) -> "MatchEventStore":
+        """Store of the processed events, sorted by game clock.
+
+        The store is built on first access, so each event is converted only once.
+
+        Returns:
+            MatchEventStore: The store of the events.
+        """
+        if self._event_store is None:
+            from football_commentator.data.event_store import MatchEventStore
+
+            self._event_store = MatchEventStore(self)
+        return self._event_store
+
+    def read_new_events(self) -> Iterator[dict[str, Any]]:
+        """Read the events added to the source since the last read.
+
+        Sources loaded at once have no new events.
+
+        Yields:
+            dict[str, Any]: The new raw events.
+        """
+        yield from ()
+
+    def load_cached_batch(self) -> "EventBatch | None":
+        """Load the events already converted, instead of converting the raw events.
+
+        Sources without cache have to convert their raw events.
+
+        Returns:
+            EventBatch | None: The events sorted by game clock, None without cache.
+        """
+        return None
+
+    def cache_batch(self, batch: "EventBatch") -> None:  # noqa: B027
+        """Keep the converted events, for the next loadings of the source.
+
+        Sources without cache keep nothing.
+
+        Args:
+            batch (EventBatch): The events, sorted by game clock.
+        """
 
     @abstractmethod
     def load_player(self, event: dict[str, Any]) -> str | None:
@@ -62,6 +137,58 @@ class Preprocessor(ABC):
         """
         pass
 
+    def load_period(self, event: dict[str, Any]) -> int:
+        """Extract the period of the event.
+
+        Sources without periods are considered as a single period game.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            int: The period of the game (1 for the first half, 2 for the second ..)
+        """
+        return 1
+
+    def load_xg(self, event: dict[str, Any]) -> float | None:
+        """Extract the expected goals of a shot.
+
+        Sources without expected goals have None for all their events.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            float | None: The expected goals, None for the other events.
+        """
+        return None
+
+    def load_outcome(self, event: dict[str, Any]) -> str | None:
+        """Extract the outcome of the event (Goal, Saved, Incomplete ..).
+
+        Sources without outcomes have None for all their events.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            str | None: The outcome, None if the event has none.
+        """
+        return None
+
+    def load_card(self, event: dict[str, Any]) -> str | None:
+        """Extract the card given with the event (Yellow Card, Second Yellow, Red Card).
+
+        Sources without cards have None for all their events.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            str | None: The card, None if no card is given.
+        """
+        return None
+
     @abstractmethod
     def load_event_type(self, event: dict[str, Any]) -> str:
         """Get event type.
@@ -86,44 +213,61 @@ class Preprocessor(ABC):
         """
         pass
 
-    def process_football_event(self, event: dict[str, Any]) -> FootballEvent | None:
-        """Process one event and generate appropriate representation.
+    def load_event_fields(self, event: dict[str, Any]) -> dict[str, Any] | None:
+        """Extract the fields of the event's representation.
 
         Args:
             event (dict[str, Any]): The event to process.
 
         Returns:
-            FootballEvent | None: The representation of the event.
+            dict[str, Any] | None: The fields of a `FootballEvent`.
         """
+        if self._extract is not None:
+            return self._extract(event)
         event_type = self.load_event_type(event)
         if event_type != "Starting XI":
             position = self.load_loaction(event)
+            timestamp = self.load_timestamp(event)
+            period = self.load_period(event)
+
+            return {
+                "timestamp": timestamp,
+                "period": period,
+                "clock": compute_match_clock(period, timestamp),
+                "event_type": event_type,
+                "team": self.load_team(event),
+                "player": self.load_player(event),
+                "position_x": position[0],
+                "position_y": position[1],
+                "description": self.load_description(event),
+                "xg": self.load_xg(event),
+                "outcome": self.load_outcome(event),
+                "card": self.load_card(event),
+            }
+        return None
 
-            event_object = FootballEvent(
-                timestamp=self.load_timestamp(event),
-                event_type=event_type,
-                team=self.load_team(event),
-                player=self.load_player(event),
-                position_x=position[0],
-                position_y=position[1],
-                description=self.load_description(event),
-            )
-            return event_object
+    def process_football_event(self, event: dict[str, Any]) -> FootballEvent | None:
+        """Process one event and generate appropriate representation.
+
+        Args:
+            event (dict[str, Any]): The event to process.
+
+        Returns:
+            FootballEvent | None: The representation of the event.
+        """
+        fields = self.load_event_fields(event)
+        if fields is not None:
+            return FootballEvent(**fields)
         return None
 
     def load_all_events_in_intervall(self, start: int, end: int) -> list[FootballEvent]:
         """Load all events with a time interval.
 
         Args:
-            start (int): start of the event (game's seconds).
-            end (int): start of the event (game's seconds).
+            start (int): start of the event (game clock, in seconds).
+            end (int): end of the event (game clock, in seconds), included.
 
         Returns:
             list[FootballEvent]: The list of events that are within the interval.
         """
-        events = []
-        for event in self.events:
-            event_object = self.process_football_event(event)
-            if event_object and filter_timestamp_event(event=event_object, start=start, end=end):
-                events.append(event_object)
-        return events
+        return self.event_store.load_all_events_in_intervall(start=start, end=end)
@@ -1,30 +1,112 @@
 """Module to preprocess JSON-based data."""
 
-import json
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any
-
-from football_commentator.constants import SUPPORTED_EVENTS
+from typing import Any, cast
+
+from football_commentator.constants import EVENTS_DECODER, MATCH_CACHE_DIR
+from football_commentator.data.decoding import EventDecoder, get_decoder
+from football_commentator.data.event_batch import EventBatch
+from football_commentator.data.extraction import STATSBOMB_SPEC, FieldReaders
+from football_commentator.data.json_stream import JSONEventsTail
+from football_commentator.data.match_cache import MatchCache
 from football_commentator.data.preprocessor import Preprocessor
+from football_commentator.metrics import METRICS
 
 
 class JSONPreprocessor(Preprocessor):
-    """Class to preprocess JSON data."""
+    """Class to preprocess JSON data, following the StatsBomb format."""
+
+    extraction_spec = STATSBOMB_SPEC
 
-    def __init__(self, source: Path):
+    def __init__(
+        self,
+        source: Path,
+        streaming: bool = False,
+        cache_dir: Path | None = MATCH_CACHE_DIR,
+        decoder: str | EventDecoder = EVENTS_DECODER,
+    ):
         """Initialize class.
 
         Args:
-            source (Path): path to JSON source data.
+            source (Path): path to JSON source data, a JSON array or JSON Lines.
+            streaming (bool, optional): Read the events one at a time, instead of loading
+                the whole file. The file is then followed for the events appended by a
+                live feed. Defaults to False.
+            cache_dir (Path | None, optional): folder where the converted events are
+                cached, the JSON is then only parsed when it changes. Ignored when
+                streaming. Defaults to MATCH_CACHE_DIR.
+            decoder (str | EventDecoder, optional): decoder of the file, or its name (see
+                `get_decoder`). Typed decoders skip the dicts of the events and their
+                unused fields. Ignored when streaming. Defaults to EVENTS_DECODER.
 
         Raises:
             ValueError: The file is not of JSON format.
         """
         super().__init__()
-        if source.suffix != ".json":
+        self.source = source
+        if source.suffix not in (".json", ".jsonl"):
             raise ValueError(f"The '{source.suffix}' is not yet supported to store events.")
-        with open(source) as file:
-            self.events: list[dict[str, Any]] = json.load(file)
+        self.tail: JSONEventsTail | None = None
+        self.cache: MatchCache | None = None
+        self.cached = False  # The cache matches the source, the JSON is not loaded
+        self.decoder = get_decoder(decoder) if isinstance(decoder, str) else decoder
+        if not streaming and cache_dir is not None:
+            self.cache = MatchCache(source, cache_dir)
+            self.cached = self.cache.is_valid()
+        if streaming:
+            self.tail = JSONEventsTail(source)
+        elif not self.cached:
+            with METRICS.span("json_load", source=str(source), decoder=self.decoder.name):
+                self.events = self.decoder.decode(source)
+
+    def read_new_events(self) -> Iterator[dict[str, Any]]:
+        """Read the events added to the source since the last read.
+
+        Yields:
+            dict[str, Any]: The new raw events.
+        """
+        if self.tail is not None:
+            yield from self.tail.read_new_events()
+
+    def load_cached_batch(self) -> EventBatch | None:
+        """Load the events already converted, instead of converting the raw events.
+
+        Returns:
+            EventBatch | None: The events sorted by game clock, None without valid cache.
+        """
+        if self.cache is None or not self.cached:
+            return None
+        with METRICS.span("match_cache_load", source=str(self.source)):
+            return self.cache.load()
+
+    def cache_batch(self, batch: EventBatch) -> None:
+        """Cache the converted events, for the next loadings of the source.
+
+        Args:
+            batch (EventBatch): The events, sorted by game clock.
+        """
+        if self.cache is not None and not self.cached:
+            self.cache.save(batch)
+            self.cached = True
+
+    def load_event_fields(self, event: Any) -> dict[str, Any] | None:
+        """Extract the fields of the event's representation.
+
+        Args:
+            event (Any): The event to process, a dict or an event typed by the decoder.
+
+        Returns:
+            dict[str, Any] | None: The fields of a `FootballEvent`.
+        """
+        if isinstance(event, dict):
+            return super().load_event_fields(event)
+        return self.decoder.event_fields(event)
+
+    @property
+    def readers(self) -> FieldReaders:
+        """Readers of the fields of the raw events, built from `STATSBOMB_SPEC`."""
+        return cast(FieldReaders, self._readers)
 
     def load_player(self, event: dict[str, Any]) -> str | None:
         """Extract player name.
@@ -35,14 +117,10 @@ class JSONPreprocessor(Preprocessor):
         Returns:
             str: Name of the player associated to the event.
         """
-        if "player" in event and ("name" in event["player"]):
-            player = event["player"]["name"]
-        else:
-            player = None
-        return player
+        return self.readers.player(event)
 
     def load_description(self, event: dict[str, Any]) -> str:
-        """Extract a description.
+        """Extract a description, from the named details of the event's sections.
 
         Args:
             event (dict[str, Any]): event to process
@@ -50,22 +128,7 @@ class JSONPreprocessor(Preprocessor):
         Returns:
             str: description of the event.
         """
-        # The structure of file introduce some fields provindin description
-        # Those fields have dict as value
-        # A field 'name' contains description of this field
-        description: dict[str, str] = {}
-
-        for event_detail in SUPPORTED_EVENTS.intersection(event.keys()):
-            details: dict[str, Any] = event[event_detail]
-            for key, val in details.items():  # Check if name is in the field.
-                if (isinstance(val, dict)) and ("name" in val):
-                    description[key] = val["name"]
-
-        # Generate textual description
-        text_description = "Additional Informations: " + ", ".join(
-            f"({key}: {val})" for key, val in description.items()
-        )
-        return text_description
+        return self.readers.description(event)
 
     def load_loaction(self, event: dict[str, Any]) -> tuple[float | None, float | None]:
         """Extract the position in the field.
@@ -76,13 +139,7 @@ class JSONPreprocessor(Preprocessor):
         Returns:
             tuple[float | None, float | None]: (X, Y) of the player's position.
         """
-        if "location" in event:
-            position_x = event["location"][0]
-            position_y = event["location"][1]
-        else:
-            position_x = None
-            position_y = None
-        return position_x, position_y
+        return self.readers.position_x(event), self.readers.position_y(event)
 
     def load_timestamp(self, event: dict[str, Any]) -> str:
         """Extract timestamp of the event.
@@ -93,7 +150,51 @@ class JSONPreprocessor(Preprocessor):
         Returns:
             str: The timestap of the event.
         """
-        return event["timestamp"]
+        return self.readers.timestamp(event)
+
+    def load_xg(self, event: dict[str, Any]) -> float | None:
+        """Extract the expected goals of a shot.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            float | None: The StatsBomb xG of the shot, None for the other events.
+        """
+        return self.readers.xg(event)
+
+    def load_outcome(self, event: dict[str, Any]) -> str | None:
+        """Extract the outcome of the event, from its named details.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            str | None: The outcome, None if the event has none.
+        """
+        return self.readers.outcome(event)
+
+    def load_card(self, event: dict[str, Any]) -> str | None:
+        """Extract the card given with the event, from its named details.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            str | None: The card, None if no card is given.
+        """
+        return self.readers.card(event)
+
+    def load_period(self, event: dict[str, Any]) -> int:
+        """Extract the period of the event.
+
+        Args:
+            event (dict[str, Any]): event to process
+
+        Returns:
+            int: The period of the game (1 for the first half, 2 for the second ..)
+        """
+        return self.readers.period(event)
 
     def load_event_type(self, event: dict[str, Any]) -> str:
         """Get event type.
@@ -104,7 +205,7 @@ class JSONPreprocessor(Preprocessor):
         Returns:
             str: The vent type.
         """
-        return event["type"]["name"]
+        return self.readers.event_type(event)
 
     def load_team(self, event: dict[str, Any]) -> str:
         """Get team name.
@@ -115,4 +216,4 @@ class JSONPreprocessor(Preprocessor):
         Returns:
             str: The team associated to the event.
         """
-        return event["team"]["name"]
+        return self.readers.team(event)
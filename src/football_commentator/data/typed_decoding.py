@@ -0,0 +1,144 @@
+"""Module to decode StatsBomb events straight into typed structs, with msgspec."""
+
+from pathlib import Path
+from typing import Any
+
+import msgspec
+
+from football_commentator.data.decoding import EventDecoder
+from football_commentator.data.extraction import (
+    CARD_DETAIL,
+    OUTCOME_DETAIL,
+    STATSBOMB_SPEC,
+    format_description,
+)
+from football_commentator.utils import compute_match_clock
+
+
+class Named(msgspec.Struct):
+    """Reference to a named object of StatsBomb (type, team, player ..)."""
+
+    name: Any = None
+
+
+class Detail(msgspec.Struct):
+    """Detail of an event, described by its name (outcome, body part, technique ..)."""
+
+    name: Any = msgspec.UNSET
+
+
+# Value of a detail: only objects are described, through their name
+DetailValue = Detail | list[Any] | str | int | float | bool | None
+
+
+# Named details of each event type, as described by `STATSBOMB_SPEC`: the name of each
+# detail, the attribute of its section and its key in the section
+_DETAILS: dict[str, tuple[tuple[str, str, str], ...]] = {
+    event_type: tuple((name, f"{section}_", key) for name, (section, key, _) in paths.items())
+    for event_type, paths in STATSBOMB_SPEC.detail_paths.items()
+}
+# Sections detailing the events
+DETAIL_SECTIONS = sorted(
+    {section for paths in STATSBOMB_SPEC.detail_paths.values() for section, _, _ in paths.values()}
+)
+
+# Only the fields used by the commentary are decoded, the others (tactics, related
+# events, freeze frames ..) are skipped by the parser without building any object.
+StatsBombEvent = msgspec.defstruct(
+    "StatsBombEvent",
+    [
+        ("type", Named),
+        ("team", Named),
+        ("timestamp", str),
+        ("period", int, 1),
+        ("player", Named | None, None),
+        ("location", list[float] | None, None),
+        *((f"{key}_", dict[str, DetailValue] | None, None) for key in DETAIL_SECTIONS),
+    ],
+    rename={f"{key}_": key for key in DETAIL_SECTIONS},
+)
+
+
+class TypedEventDecoder(EventDecoder):
+    """Class to decode the events into typed structs, following the StatsBomb schema."""
+
+    name = "msgspec"
+    typed = True
+
+    def __init__(self):
+        """Initialize class."""
+        self._decoder = msgspec.json.Decoder(list[StatsBombEvent])
+        self._line_decoder = msgspec.json.Decoder(StatsBombEvent)
+
+    def decode(self, source: Path) -> list[Any]:
+        """Decode all the events of a file.
+
+        Args:
+            source (Path): path to the JSON array or JSON Lines file.
+
+        Returns:
+            list[Any]: The typed events.
+        """
+        data = source.read_bytes()
+        if source.suffix == ".jsonl":
+            return self._line_decoder.decode_lines(data)
+        return self._decoder.decode(data)
+
+    @staticmethod
+    def named_details(event: Any) -> dict[str, Any]:
+        """Collect the named details of a typed event, as `STATSBOMB_SPEC` on its dict.
+
+        Args:
+            event (Any): The typed event.
+
+        Returns:
+            dict[str, Any]: The name of each detail.
+        """
+        named: dict[str, Any] = {}
+        for name, section, key in _DETAILS.get(event.type.name, ()):
+            details = getattr(event, section)
+            if details:
+                val = details.get(key)
+                if type(val) is Detail and val.name is not msgspec.UNSET and val.name is not None:
+                    named[name] = val.name
+        return named
+
+    @classmethod
+    def describe(cls, event: Any) -> str:
+        """Build the description of a typed event.
+
+        Args:
+            event (Any): The typed event.
+
+        Returns:
+            str: description of the event.
+        """
+        return format_description(cls.named_details(event))
+
+    def event_fields(self, event: Any) -> dict[str, Any] | None:
+        """Extract the fields of a `FootballEvent` from a typed event.
+
+        Args:
+            event (Any): The typed event.
+
+        Returns:
+            dict[str, Any] | None: The fields, None for the starting lineups.
+        """
+        if event.type.name == "Starting XI":
+            return None
+        location = event.location
+        named = self.named_details(event)
+        return {
+            "timestamp": event.timestamp,
+            "period": event.period,
+            "clock": compute_match_clock(event.period, event.timestamp),
+            "event_type": event.type.name,
+            "team": event.team.name,
+            "player": None if event.player is None else event.player.name,
+            "position_x": None if location is None else location[0],
+            "position_y": None if location is None else location[1],
+            "description": format_description(named),
+            "xg": None if event.shot_ is None else event.shot_.get("statsbomb_xg"),
+            "outcome": named.get(OUTCOME_DETAIL),
+            "card": named.get(CARD_DETAIL),
+        }
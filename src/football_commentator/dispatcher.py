@@ -0,0 +1,496 @@
+"""Module to dispatch the LLM calls within the limits of the provider."""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from dataclasses import dataclass
+from typing import TypeVar
+
+from football_commentator.metrics import METRICS
+
+T = TypeVar("T")
+
+# Errors retried whatever the backend
+RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (TimeoutError, ConnectionError)
+# Errors of a backend worth retrying: their types, or a function checking an error
+Retryable = tuple[type[BaseException], ...] | Callable[[BaseException], bool]
+
+
+class CircuitOpenError(RuntimeError):
+    """The calls are shed, the provider failed too many times in a row."""
+
+
+def is_retryable(error: BaseException, retryable: Retryable = ()) -> bool:
+    """Check whether the error of a call is worth retrying.
+
+    Args:
+        error (BaseException): The error.
+        retryable (Retryable, optional): errors of the backend to retry. Defaults to ().
+
+    Returns:
+        bool: The error is a timeout, a connection error, or one of the backend.
+    """
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return retryable(error) if callable(retryable) else isinstance(error, retryable)
+
+
+class TokenBucket:
+    """Class to spread a budget per minute (requests, tokens ..) over time.
+
+    The bucket refills continuously at `rate_per_minute`, up to `capacity`. An amount is
+    reserved at once, the level may go below zero: the caller then waits until the
+    debt is refilled. Reservations are served in order, without holding the lock while
+    waiting, so the bucket can be shared by threads and event loops.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize class.
+
+        Args:
+            rate_per_minute (float): budget refilled per minute.
+            capacity (float | None, optional): maximal budget available at once.
+                Defaults to None (the budget of a minute).
+            clock (Callable[[], float], optional): clock of the refills (in s).
+                Defaults to time.monotonic.
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("The rate of a token bucket must be positive.")
+        self.rate = rate_per_minute / 60
+        self.capacity = rate_per_minute if capacity is None else capacity
+        self.clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Refill the bucket since its last update, the lock being held."""
+        now = self.clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def level(self) -> float:
+        """Budget available now, negative while reservations wait."""
+        with self._lock:
+            self._refill()
+            return self._level
+
+    def reserve(self, amount: float) -> float:
+        """Reserve an amount of the budget.
+
+        Args:
+            amount (float): The amount, e.g. 1 request or the tokens of a prompt.
+
+        Returns:
+            float: The time to wait before using it (in s).
+        """
+        with self._lock:
+            self._refill()
+            self._level -= amount
+            return max(0.0, -self._level / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Take (or give back, if negative) a part of the budget already used.
+
+        Args:
+            amount (float): The amount, e.g. the tokens used beyond the estimation.
+        """
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level - amount)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Class to describe the retries of the failed calls, with exponential backoff.
+
+    The delay before a retry is drawn uniformly up to the exponential backoff ("full
+    jitter"), so the callers throttled at the same time do not retry together.
+    """
+
+    max_retries: int = 3
+    base_delay: float = 0.5  # Seconds
+    max_delay: float = 20.0  # Seconds
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Draw the delay before a retry.
+
+        Args:
+            attempt (int): number of the failed attempt, from 0.
+            rng (random.Random): source of the jitter.
+
+        Returns:
+            float: The delay (in s).
+        """
+        return rng.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """Class to stop calling a provider that keeps failing.
+
+    After `failure_threshold` failures in a row, the circuit opens: the calls fail at
+    once for `reset_timeout` seconds. Then a single call probes the provider: the
+    circuit closes if it succeeds, and opens again otherwise. A probe interrupted
+    without outcome (cancelled ..) is released, for the next call to probe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize class.
+
+        Args:
+            failure_threshold (int, optional): failures in a row opening the circuit.
+                Defaults to 5.
+            reset_timeout (float, optional): time before probing the provider again
+                (in s). Defaults to 30.
+            clock (Callable[[], float], optional): clock of the timeout (in s).
+                Defaults to time.monotonic.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"  # "closed", "open" or "half_open"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check whether a call can be made, a probe is let through once the timeout is over.
+
+        Returns:
+            bool: The call can be made.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.clock() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def release(self) -> None:
+        """Let the next call probe the provider, after a probe without outcome."""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self._opened_at = self.clock() - self.reset_timeout
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit after too many."""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = self.clock()
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Read the delay requested by the provider in a rate limit error.
+
+    Args:
+        error (BaseException): The error, with the HTTP response for the HTTP clients.
+
+    Returns:
+        float | None: The delay of the 'Retry-After' header (in s), None without it.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers["retry-after"]) if headers is not None else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class LLMDispatcher:
+    """Class to send the LLM calls within the budgets of the provider, and retry them.
+
+    Each attempt takes one request and the estimated tokens of the call from shared
+    token buckets, waiting when a budget is spent, so concurrent windows and games stay
+    under the requests (RPM) and tokens (TPM) per minute of the provider. Rate limits
+    (HTTP 429), timeouts, connection and server errors are retried with jittered
+    exponential backoff, at least for the delay requested by the provider. Repeated
+    failures of these kinds open a circuit breaker: calls are then shed at once with
+    `CircuitOpenError`, for the caller to degrade. Other errors (an invalid request ..)
+    are raised at once, the provider having answered.
+
+    A streamed call is only retried before its first part: parts already yielded cannot
+    be taken back.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        timeout: float | None = None,
+        seed: int | None = None,
+    ):
+        """Initialize class.
+
+        Args:
+            requests_per_minute (float | None, optional): requests budget.
+                Defaults to None (unlimited).
+            tokens_per_minute (float | None, optional): tokens budget.
+                Defaults to None (unlimited).
+            retry (RetryPolicy | None, optional): retries of the failed calls.
+                Defaults to None (3 retries).
+            breaker (CircuitBreaker | None, optional): breaker of the calls.
+                Defaults to None (opens after 5 failures in a row, for 30s).
+            timeout (float | None, optional): maximal duration of an asynchronous attempt
+                (in s). The synchronous ones rely on the timeout of the backend, which
+                `CommentatorEngine` sets to this one. Defaults to None.
+            seed (int | None, optional): seed of the jitter. Defaults to None.
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = timeout
+        self._random = random.Random(seed)
+
+    def _admit(self, tokens: int) -> float:
+        """Let a call through the breaker and reserve its budgets.
+
+        Args:
+            tokens (int): estimated tokens of the call.
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+
+        Returns:
+            float: The time to wait before the call (in s).
+        """
+        if not self.breaker.allow():
+            METRICS.count("llm_shed_total")
+            raise CircuitOpenError("The LLM calls are shed after repeated failures.")
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait:
+            METRICS.observe("llm_throttle", wait)
+        return wait
+
+    def _record_error(self, error: Exception, retryable: Retryable) -> bool:
+        """Record the error of an attempt in the breaker.
+
+        Only the retryable errors count as failures of the provider. The other ones mean
+        that the provider answered, they close the circuit.
+
+        Args:
+            error (Exception): The error of the attempt.
+            retryable (Retryable): errors of the backend to retry.
+
+        Returns:
+            bool: The error is retryable.
+        """
+        if is_retryable(error, retryable):
+            self.breaker.record_failure()
+            return True
+        self.breaker.record_success()
+        return False
+
+    def _backoff(self, error: Exception, attempt: int, retryable: Retryable) -> float:
+        """Record a failed attempt, and get the delay before retrying it.
+
+        Args:
+            error (Exception): The error of the attempt.
+            attempt (int): number of the attempt, from 0.
+            retryable (Retryable): errors of the backend to retry.
+
+        Raises:
+            Exception: The error, when it is not retried.
+
+        Returns:
+            float: The delay before the next attempt (in s).
+        """
+        if not self._record_error(error, retryable) or attempt >= self.retry.max_retries:
+            raise error
+        METRICS.count("llm_retries_total", label=type(error).__name__)
+        delay = self.retry.delay(attempt, self._random)
+        return min(self.retry.max_delay, max(delay, retry_after(error) or 0.0))
+
+    def record_usage(self, estimated: int, used: int) -> None:
+        """Correct the tokens budget with the tokens actually used by a call.
+
+        Args:
+            estimated (int): tokens reserved for the call.
+            used (int): tokens used by the call (prompt and completion).
+        """
+        if self.tokens is not None and used:
+            self.tokens.adjust(used - estimated)
+
+    def call(
+        self,
+        function: Callable[[], T],
+        tokens: int = 0,
+        retryable: Retryable = (),
+    ) -> T:
+        """Make a call within the budgets, retrying it on rate limits and timeouts.
+
+        Args:
+            function (Callable[[], T]): The call.
+            tokens (int, optional): estimated tokens of the call. Defaults to 0.
+            retryable (Retryable, optional): errors of the backend to retry (rate
+                limits, server errors ..). Defaults to ().
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+
+        Returns:
+            T: The result of the call.
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._admit(tokens))
+            try:
+                result = function()
+            except Exception as error:
+                time.sleep(self._backoff(error, attempt, retryable))
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def acall(
+        self,
+        function: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        retryable: Retryable = (),
+    ) -> T:
+        """Make an asynchronous call within the budgets, retrying it on errors and timeouts.
+
+        An attempt longer than `timeout` is cancelled and retried.
+
+        Args:
+            function (Callable[[], Awaitable[T]]): The call.
+            tokens (int, optional): estimated tokens of the call. Defaults to 0.
+            retryable (Retryable, optional): errors of the backend to retry (rate
+                limits, server errors ..). Defaults to ().
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+
+        Returns:
+            T: The result of the call.
+        """
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admit(tokens))
+            try:
+                result = await asyncio.wait_for(function(), self.timeout)
+            except Exception as error:
+                await asyncio.sleep(self._backoff(error, attempt, retryable))
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def stream(
+        self,
+        function: Callable[[], Iterator[T]],
+        tokens: int = 0,
+        retryable: Retryable = (),
+    ) -> Iterator[T]:
+        """Make a streamed call within the budgets, retrying it until its first part.
+
+        Args:
+            function (Callable[[], Iterator[T]]): The call.
+            tokens (int, optional): estimated tokens of the call. Defaults to 0.
+            retryable (Retryable, optional): errors of the backend to retry (rate
+                limits, server errors ..). Defaults to ().
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+
+        Yields:
+            T: The parts of the result.
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._admit(tokens))
+            started = False
+            try:
+                for part in function():
+                    started = True
+                    yield part
+            except Exception as error:
+                if started:
+                    self._record_error(error, retryable)
+                    raise
+                time.sleep(self._backoff(error, attempt, retryable))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled, or closed by the consumer (GeneratorExit)
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return
+
+    async def astream(
+        self,
+        function: Callable[[], AsyncIterator[T]],
+        tokens: int = 0,
+        retryable: Retryable = (),
+    ) -> AsyncIterator[T]:
+        """Make an asynchronous streamed call, retrying it until its first part.
+
+        Args:
+            function (Callable[[], AsyncIterator[T]]): The call.
+            tokens (int, optional): estimated tokens of the call. Defaults to 0.
+            retryable (Retryable, optional): errors of the backend to retry (rate
+                limits, server errors ..). Defaults to ().
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+
+        Yields:
+            T: The parts of the result.
+        """
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admit(tokens))
+            started = False
+            try:
+                async for part in function():
+                    started = True
+                    yield part
+            except Exception as error:
+                if started:
+                    self._record_error(error, retryable)
+                    raise
+                await asyncio.sleep(self._backoff(error, attempt, retryable))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled, or closed by the consumer (GeneratorExit)
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return
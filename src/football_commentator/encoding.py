@@ -0,0 +1,167 @@
+"""Module to encode the events of a window in the prompt."""
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from football_commentator.constants import DESCRIPTION_PREFIX
+from football_commentator.event import EventType, FootballEvent
+from football_commentator.pruning import PASS_SEQUENCE
+from football_commentator.utils import format_events_to_string
+
+# Short codes of the event types, explained in the header of each window
+EVENT_ABBREVIATIONS: dict[str, str] = {
+    EventType.DUEL.value: "DUE",
+    EventType.GOAL_KEEPER.value: "GK",
+    EventType.PASS.value: "PAS",
+    EventType.CAMERA_OFF.value: "COF",
+    EventType.DISPOSSESSED.value: "DIS",
+    EventType.SUBSTITUTION.value: "SUB",
+    EventType.CLEARANCE.value: "CLR",
+    EventType.PLAYER_ON.value: "PON",
+    EventType.FOUL_COMMITTED.value: "FC",
+    EventType.DRIBBLED_PAST.value: "DRP",
+    EventType.FOUL_WON.value: "FW",
+    EventType.TACTICAL_SHIFT.value: "TAC",
+    EventType.INJURY_STOPPAGE.value: "INJ",
+    EventType.SHOT.value: "SHO",
+    EventType.PRESSURE.value: "PRE",
+    EventType.ERROR.value: "ERR",
+    EventType.PLAYER_OFF.value: "POF",
+    EventType.BAD_BEHAVIOUR.value: "BB",
+    EventType.INTERCEPTION.value: "INT",
+    EventType.MISCONTROL.value: "MIS",
+    EventType.SHIELD.value: "SHI",
+    EventType.HALF_START.value: "HS",
+    EventType.CAMERA_ON.value: "CON",
+    EventType.OFFSIDE.value: "OFF",
+    EventType.STARTING_XI.value: "XI",
+    EventType.BALL_RECEIPT.value: "REC",
+    EventType.DRIBBLE.value: "DRB",
+    EventType.BLOCK.value: "BLK",
+    EventType.HALF_END.value: "HE",
+    EventType.BALL_RECOVERY.value: "BR",
+    PASS_SEQUENCE: "SEQ",
+}
+
+COMPACT_COLUMNS = "time|team|player|event|x,y|details"
+# Match minute at the start of each period: halves, extra time, penalty shoot-out
+PERIOD_START_MINUTES = {1: 0, 2: 45, 3: 90, 4: 105, 5: 120}
+DETAIL_PATTERN = re.compile(r"\(([^:()]+): ([^()]*)\)")
+
+
+def compact_description(description: str) -> str:
+    """Shorten a description, from '(key: value), ...' to 'key=value;...'.
+
+    Args:
+        description (str): The description of the event.
+
+    Returns:
+        str: The compact description.
+    """
+    description = description.removeprefix(DESCRIPTION_PREFIX)
+    details = DETAIL_PATTERN.findall(description)
+    if not details:
+        return description.strip()
+    return ";".join(f"{key.strip()}={value.strip()}" for key, value in details)
+
+
+def compact_timestamp(timestamp: str, period: int = 1) -> str:
+    """Shorten a timestamp, from 'HH:MM:SS.fff' within its period to the match time 'MM:SS'.
+
+    Args:
+        timestamp (str): The timestamp of the event, within its period.
+        period (int, optional): The period of the event. Defaults to 1.
+
+    Returns:
+        str: The match time, e.g. '50:01' five minutes into the second half.
+    """
+    hours, minutes, seconds = timestamp.split(":")
+    match_minutes = PERIOD_START_MINUTES.get(period, 0) + 60 * int(hours) + int(minutes)
+    return f"{match_minutes:02d}:{int(float(seconds)):02d}"
+
+
+def format_event_compact(event: FootballEvent, previous: FootballEvent | None = None) -> str:
+    """Format an event as a row, without the team and player already given before.
+
+    Args:
+        event (FootballEvent): The event.
+        previous (FootballEvent | None, optional): The previous event of the window.
+            Defaults to None.
+
+    Returns:
+        str: The row of the event.
+    """
+    team = "" if previous is not None and previous.team == event.team else event.team
+    player = event.player or "-"
+    if previous is not None and previous.player == event.player and not team:
+        player = ""
+    position = ""
+    if event.position_x is not None and event.position_y is not None:
+        position = f"{event.position_x:.0f},{event.position_y:.0f}"
+    return "|".join(
+        (
+            compact_timestamp(event.timestamp, event.period),
+            team,
+            player,
+            EVENT_ABBREVIATIONS.get(event.event_type, event.event_type),
+            position,
+            compact_description(event.description),
+        )
+    )
+
+
+def format_events_compact(list_events: list[FootballEvent]) -> str:
+    """Format the events as a table, with a header giving the columns and the codes.
+
+    Team and player are empty when they are the ones of the previous row.
+
+    Args:
+        list_events (list[FootballEvent]): events' list
+
+    Returns:
+        str: Formatted events.
+    """
+    codes = dict.fromkeys(
+        f"{EVENT_ABBREVIATIONS[event.event_type]}={event.event_type}"
+        for event in list_events
+        if event.event_type in EVENT_ABBREVIATIONS
+    )
+    lines = [f"{COMPACT_COLUMNS} (empty team/player: same as above)", ", ".join(codes)]
+    previous = None
+    for event in list_events:
+        lines.append(format_event_compact(event, previous))
+        previous = event
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class PromptFormat:
+    """Class to represent a way to encode the events of a window in the prompt."""
+
+    name: str
+    format_events: Callable[[list[FootballEvent]], str]
+    format_event: Callable[[FootballEvent], str]  # An event alone, to weigh it when pruning
+
+
+PROMPT_FORMATS: dict[str, PromptFormat] = {
+    "verbose": PromptFormat("verbose", format_events_to_string, str),
+    "compact": PromptFormat("compact", format_events_compact, format_event_compact),
+}
+
+
+def get_prompt_format(name: str) -> PromptFormat:
+    """Get a format of the events by name.
+
+    Args:
+        name (str): name of the format, 'compact' or 'verbose'.
+
+    Raises:
+        ValueError: The format is not supported.
+
+    Returns:
+        PromptFormat: The format.
+    """
+    if name not in PROMPT_FORMATS:
+        raise ValueError(f"The prompt format '{name}' is not supported.")
+    return PROMPT_FORMATS[name]
@@ -2,7 +2,7 @@
 
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class EventType(Enum):
@@ -46,7 +46,14 @@ class FootballEvent(BaseModel):
     team: str
     event_type: str
     timestamp: str
+    period: int = 1
+    clock: int = Field(default=0, repr=False)
     player: str | None
     position_x: float | None
     position_y: float | None
     description: str
+    # Expected goals of a shot, None for the other events
+    xg: float | None = Field(default=None, repr=False)
+    # Outcome of the event (Goal, Saved, Incomplete ..), and card given, if any
+    outcome: str | None = Field(default=None, repr=False)
+    card: str | None = Field(default=None, repr=False)
@@ -0,0 +1,320 @@
+"""Module to convert a corpus of games once, into an indexed collection."""
+
+import argparse
+import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from football_commentator.data.match_cache import MatchCache
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+
+EVENTS_PATTERNS = ("*.json", "*.jsonl")
+
+
+@dataclass
+class IngestReport:
+    """Class to report the progress of an ingestion."""
+
+    converted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: dict[str, str] = field(default_factory=dict)  # Error of each failed file
+    duration: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Converted files per second."""
+        return self.converted / self.duration if self.duration else 0.0
+
+
+class CorpusIndex:
+    """Class to index the converted games in SQLite, by match, team and competition.
+
+    The index is also the checkpoint of an ingestion: each file is recorded as soon as
+    it is converted, or failed, so an interrupted ingestion resumes where it stopped.
+    """
+
+    def __init__(self, path: Path | str = ":memory:"):
+        """Initialize class.
+
+        Args:
+            path (Path | str, optional): path to the SQLite database. Defaults to ":memory:".
+        """
+        self._connection = sqlite3.connect(str(path))
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            if str(path) != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                "source TEXT PRIMARY KEY, match_id TEXT NOT NULL, competition TEXT, "
+                "season TEXT, match_date TEXT, status TEXT NOT NULL, events INTEGER, "
+                "cache_path TEXT, error TEXT, size INTEGER, mtime_ns INTEGER, "
+                "converted_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS match_teams ("
+                "source TEXT NOT NULL, team TEXT NOT NULL, PRIMARY KEY (source, team))"
+            )
+            for table, column in (
+                ("matches", "match_id"),
+                ("matches", "competition"),
+                ("match_teams", "team"),
+            ):
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})"
+                )
+
+    def is_converted(self, source: Path) -> bool:
+        """Check that a file was converted, and has not changed since.
+
+        Args:
+            source (Path): path to the events' file.
+
+        Returns:
+            bool: The file is converted.
+        """
+        row = self._connection.execute(
+            "SELECT size, mtime_ns FROM matches WHERE source = ? AND status = 'done'",
+            (str(source),),
+        ).fetchone()
+        if row is None:
+            return False
+        stat = source.stat()
+        return (row["size"], row["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns)
+
+    def record(
+        self,
+        source: Path,
+        match_info: dict[str, Any],
+        events: int | None = None,
+        teams: list[str] | None = None,
+        cache_path: Path | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record the conversion of a file.
+
+        Args:
+            source (Path): path to the events' file.
+            match_info (dict[str, Any]): competition, season, date and teams of the game.
+            events (int | None, optional): number of converted events. Defaults to None.
+            teams (list[str] | None, optional): teams found in the events. Defaults to None.
+            cache_path (Path | None, optional): folder of the converted game.
+                Defaults to None.
+            error (str | None, optional): error of a failed conversion. Defaults to None.
+        """
+        stat = source.stat()
+        all_teams = {*(teams or []), *match_info.get("teams", [])} - {None}
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(source),
+                    source.stem,
+                    match_info.get("competition"),
+                    match_info.get("season"),
+                    match_info.get("match_date"),
+                    "failed" if error else "done",
+                    events,
+                    None if cache_path is None else str(cache_path),
+                    error,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    time.time(),
+                ),
+            )
+            self._connection.execute("DELETE FROM match_teams WHERE source = ?", (str(source),))
+            self._connection.executemany(
+                "INSERT INTO match_teams VALUES (?, ?)",
+                [(str(source), team) for team in sorted(all_teams)],
+            )
+
+    def find(
+        self,
+        match_id: str | None = None,
+        team: str | None = None,
+        competition: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Find the converted games.
+
+        Args:
+            match_id (str | None, optional): id of the game (stem of its file).
+                Defaults to None.
+            team (str | None, optional): team playing the game. Defaults to None.
+            competition (str | None, optional): competition of the game. Defaults to None.
+
+        Returns:
+            list[dict[str, Any]]: The games, with their teams and the folder of their events.
+        """
+        query = "SELECT * FROM matches WHERE status = 'done'"
+        parameters: list[str] = []
+        if match_id is not None:
+            query += " AND match_id = ?"
+            parameters.append(match_id)
+        if competition is not None:
+            query += " AND competition = ?"
+            parameters.append(competition)
+        if team is not None:
+            query += " AND source IN (SELECT source FROM match_teams WHERE team = ?)"
+            parameters.append(team)
+        matches = []
+        for row in self._connection.execute(query + " ORDER BY match_id", parameters):
+            teams = self._connection.execute(
+                "SELECT team FROM match_teams WHERE source = ? ORDER BY team", (row["source"],)
+            )
+            matches.append({**dict(row), "teams": [team_row["team"] for team_row in teams]})
+        return matches
+
+    def errors(self) -> dict[str, str]:
+        """Get the error of each file whose conversion failed.
+
+        Returns:
+            dict[str, str]: The error of each file.
+        """
+        rows = self._connection.execute(
+            "SELECT source, error FROM matches WHERE status = 'failed' ORDER BY source"
+        )
+        return {row["source"]: row["error"] for row in rows}
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+
+def load_statsbomb_matches(matches_dir: Path) -> dict[str, dict[str, Any]]:
+    """Load the competition, season, date and teams of the games, from StatsBomb matches.
+
+    StatsBomb lists the games of a season in `matches/<competition_id>/<season_id>.json`.
+
+    Args:
+        matches_dir (Path): folder of the matches' files.
+
+    Returns:
+        dict[str, dict[str, Any]]: The information of each game, by id.
+    """
+    matches = {}
+    for path in sorted(matches_dir.rglob("*.json")):
+        for match in json.loads(path.read_text()):
+            matches[str(match["match_id"])] = {
+                "competition": match.get("competition", {}).get("competition_name"),
+                "season": match.get("season", {}).get("season_name"),
+                "match_date": match.get("match_date"),
+                "teams": [
+                    match.get("home_team", {}).get("home_team_name"),
+                    match.get("away_team", {}).get("away_team_name"),
+                ],
+            }
+    return matches
+
+
+def convert_events_file(source: Path, cache_dir: Path) -> dict[str, Any]:
+    """Convert the events of a game, in a worker process.
+
+    Args:
+        source (Path): path to the events' file.
+        cache_dir (Path): folder of the converted games.
+
+    Returns:
+        dict[str, Any]: The number of events, the teams and the folder of the converted game.
+    """
+    preprocessor = JSONPreprocessor(source=source, cache_dir=cache_dir)
+    store = preprocessor.event_store
+    return {
+        "events": len(store),
+        "teams": list(store.batch.tables["teams"].values),
+        "cache_path": MatchCache(source, cache_dir).path,
+    }
+
+
+def run_ingestion(
+    events_dir: Path,
+    output_dir: Path,
+    matches_dir: Path | None = None,
+    workers: int | None = None,
+) -> IngestReport:
+    """Convert all the events' files of a folder tree, with a pool of processes.
+
+    The converted games are memory-mapped columns (see `MatchCache`), in
+    `<output_dir>/matches`, indexed in `<output_dir>/index.sqlite`. Files already
+    converted, and unchanged since, are skipped.
+
+    Args:
+        events_dir (Path): root folder of the events' files.
+        output_dir (Path): folder of the collection.
+        matches_dir (Path | None, optional): folder of the StatsBomb matches' files, to
+            index the competitions. Defaults to None.
+        workers (int | None, optional): number of processes. Defaults to the CPU count.
+
+    Returns:
+        IngestReport: The report of the ingestion.
+    """
+    report = IngestReport()
+    start = time.perf_counter()
+    cache_dir = output_dir / "matches"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    index = CorpusIndex(output_dir / "index.sqlite")
+    match_infos = load_statsbomb_matches(matches_dir) if matches_dir else {}
+
+    sources = sorted({path for pattern in EVENTS_PATTERNS for path in events_dir.rglob(pattern)})
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for source in sources:
+            if index.is_converted(source) and MatchCache(source, cache_dir).is_valid():
+                report.skipped += 1
+                continue
+            futures[executor.submit(convert_events_file, source, cache_dir)] = source
+
+        for future in as_completed(futures):
+            source = futures[future]
+            match_info = match_infos.get(source.stem, {})
+            try:
+                result = future.result()
+            except Exception as error:
+                report.failed += 1
+                report.errors[str(source)] = repr(error)
+                index.record(source, match_info, error=repr(error))
+                continue
+            index.record(source, match_info, **result)
+            report.converted += 1
+
+    index.close()
+    report.duration = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    """Command line entry point of the ingestion."""
+    parser = argparse.ArgumentParser(description="Convert and index a corpus of games.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="Convert the events' files of a folder tree.")
+    convert.add_argument("events_dir", type=Path, help="Root folder of the events' files.")
+    convert.add_argument("output_dir", type=Path, help="Folder of the indexed collection.")
+    convert.add_argument(
+        "--matches-dir", type=Path, default=None, help="StatsBomb matches' folder."
+    )
+    convert.add_argument("--workers", type=int, default=None, help="Conversion processes.")
+    query = commands.add_parser("query", help="Find converted games.")
+    query.add_argument("output_dir", type=Path, help="Folder of the indexed collection.")
+    query.add_argument("--match", default=None, help="Id of the game.")
+    query.add_argument("--team", default=None, help="Team playing the game.")
+    query.add_argument("--competition", default=None, help="Competition of the game.")
+    args = parser.parse_args()
+
+    if args.command == "query":
+        index = CorpusIndex(args.output_dir / "index.sqlite")
+        for match in index.find(args.match, args.team, args.competition):
+            print(json.dumps(match))
+        index.close()
+        return
+
+    report = run_ingestion(args.events_dir, args.output_dir, args.matches_dir, args.workers)
+    print(
+        f"{report.converted} files converted ({report.skipped} already done, "
+        f"{report.failed} failed) in {report.duration:.1f}s: {report.throughput:.2f} files/s"
+    )
+    for source, error in report.errors.items():
+        print(f"ERROR {source}: {error}")
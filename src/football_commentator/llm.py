@@ -1,46 +1,534 @@
 """Module to handle LLM calls."""
 
-from operator import itemgetter
+import time
+from collections.abc import AsyncIterator, Iterator
+from functools import cache
+from typing import Any, cast
 
-from langchain.schema.runnable import RunnableLambda
+from langchain_core.messages import BaseMessage, BaseMessageChunk
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 
-from football_commentator.constants import OPENAI_MODEL_NAME
+from football_commentator.backends import LLMBackend, get_backend
+from football_commentator.cache import CommentaryCache
+from football_commentator.constants import (
+    COMMENTARY_CACHE_MAX_AGE,
+    COMMENTARY_CACHE_MAX_ENTRIES,
+    COMMENTARY_CACHE_PATH,
+    LLM_BACKEND,
+    LLM_BACKEND_OPTIONS,
+    LLM_CIRCUIT_FAILURES,
+    LLM_CIRCUIT_RESET,
+    LLM_MAX_RETRIES,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TIMEOUT,
+    LLM_TOKENS_PER_MINUTE,
+    MODEL_TEMPERATURE,
+    OPENAI_MODEL_NAME,
+    PROMPT_FORMAT,
+    PROMPT_TOKEN_BUDGET,
+)
+from football_commentator.dispatcher import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMDispatcher,
+    RetryPolicy,
+    is_retryable,
+)
+from football_commentator.encoding import get_prompt_format
 from football_commentator.event import FootballEvent
-from football_commentator.prompt import SYSTEM_PROMPT_TEMPLATE, USER_PROMPT_TEMPLATE
-from football_commentator.utils import format_events_to_string
+from football_commentator.metrics import METRICS
+from football_commentator.prompt import (
+    PROMPT_TEMPLATE_VERSION,
+    SYSTEM_PROMPT_TEMPLATE,
+    USER_PROMPT_TEMPLATE,
+)
+from football_commentator.pruning import prune_events, score_event
+from football_commentator.utils import estimate_tokens
 
+# Expected tokens of a commentary (two sentences), reserved with the prompt
+COMPLETION_TOKENS_ESTIMATE = 100
 
-def invoke_llm(list_events: list[FootballEvent]) -> str:
-    """Invoke an LLM to comment on events.
+
+def degraded_commentary(list_events: list[FootballEvent]) -> str:
+    """Comment on events without LLM, when the calls are shed or keep failing.
 
     Args:
         list_events (list[FootballEvent]): list of events to comment.
 
     Returns:
-        str: LLM's commentary on successive events
+        str: A short commentary naming the most important event, and its outcome.
     """
-    # Template for the prompt
-    prompt = ChatPromptTemplate.from_messages(
-        messages=[("system", SYSTEM_PROMPT_TEMPLATE), ("human", USER_PROMPT_TEMPLATE)],
-        template_format="f-string",
+    if not list_events:
+        return "The game goes on."
+    event = max(list_events, key=score_event)
+    commentary = f"{event.event_type} for {event.team}"
+    if event.player:
+        commentary += f" by {event.player}"
+    if event.outcome:
+        commentary += f", {event.outcome.lower()}"
+    return commentary + "."
+
+
+class CommentatorEngine:
+    """Class to comment on events, with a chain and a model built once.
+
+    The model comes from a backend (OpenAI by default), which keeps its clients for
+    all the calls. With a cache, a window already commented on with the same model and
+    prompt is not sent again. With a token budget, only the most important events of a
+    window are sent, encoded in the prompt format (a compact table by default).
+
+    With a dispatcher, the calls are made within the budgets of the provider and retried
+    on rate limits, timeouts and connection errors, by the dispatcher alone: the backend
+    does not retry on its own, and its requests are bounded by the timeout of the
+    dispatcher. A window is then commented without LLM (see `degraded_commentary`) when
+    the retries are exhausted or the calls are shed, rather than being lost.
+    """
+
+    def __init__(
+        self,
+        model_name: str = OPENAI_MODEL_NAME,
+        temperature: float = MODEL_TEMPERATURE,
+        backend: LLMBackend | None = None,
+        cache: CommentaryCache | None = None,
+        token_budget: int = PROMPT_TOKEN_BUDGET,
+        prompt_format: str = PROMPT_FORMAT,
+        dispatcher: LLMDispatcher | None = None,
+    ):
+        """Initialize class.
+
+        Args:
+            model_name (str, optional): name of the model. Defaults to OPENAI_MODEL_NAME.
+            temperature (float, optional): temperature of the model.
+                Defaults to MODEL_TEMPERATURE.
+            backend (LLMBackend | None, optional): provider of the model.
+                Defaults to None (OpenAI).
+            cache (CommentaryCache | None, optional): cache of the commentaries.
+                Defaults to None.
+            token_budget (int, optional): maximal number of tokens of the events of a
+                window, 0 to send all of them. Defaults to PROMPT_TOKEN_BUDGET.
+            prompt_format (str, optional): encoding of the events, 'compact' or 'verbose'.
+                Defaults to PROMPT_FORMAT.
+            dispatcher (LLMDispatcher | None, optional): dispatcher of the calls, may be
+                shared by several engines. Defaults to None (direct calls).
+        """
+        self.model_name = model_name
+        self.token_budget = token_budget
+        self.prompt_format = get_prompt_format(prompt_format)
+        self.temperature = temperature
+        self.cache = cache
+        self.backend = backend or get_backend("openai")
+        self.dispatcher = dispatcher
+        if dispatcher is not None:
+            self.backend.defer_retries(dispatcher.timeout)
+
+        # Template for the prompt
+        prompt = ChatPromptTemplate.from_messages(
+            messages=[("system", SYSTEM_PROMPT_TEMPLATE), ("human", USER_PROMPT_TEMPLATE)],
+            template_format="f-string",
+        )
+        self.llm = self.backend.create_chat_model(model_name, temperature)
+
+        # Chain of calling the llm, formatted events -> Inject in prompt -> Comment
+        # The message is parsed after the chain, to record its tokens
+        self.chain = prompt | self.llm
+        self.parser = StrOutputParser()
+        self._template_tokens = estimate_tokens(SYSTEM_PROMPT_TEMPLATE + USER_PROMPT_TEMPLATE)
+
+    def cache_key(self, formatted_events: str, match_context: str = "") -> str:
+        """Compute the key of a window in the cache.
+
+        Args:
+            formatted_events (str): events of the window, as formatted in the prompt.
+            match_context (str, optional): state of the game before the window.
+                Defaults to "".
+
+        Returns:
+            str: The key of the commentary.
+        """
+        return CommentaryCache.make_key(
+            formatted_events,
+            model_name=f"{self.backend.name}/{self.model_name}",
+            temperature=self.temperature,
+            prompt_version=PROMPT_TEMPLATE_VERSION,
+            match_context=match_context,
+        )
+
+    def _lookup(
+        self, list_events: list[FootballEvent], match_context: str = ""
+    ) -> tuple[str, str | None, str | None]:
+        """Prune and format the events of a window, and look for its commentary in the cache.
+
+        Args:
+            list_events (list[FootballEvent]): list of events to comment.
+            match_context (str, optional): state of the game before the window.
+                Defaults to "".
+
+        Returns:
+            tuple[str, str | None, str | None]: The formatted events, the key of the window
+                in the cache and the cached commentary (None without cache or on a miss).
+        """
+        if self.token_budget > 0:
+            with METRICS.span("pruning", events=len(list_events)) as attributes:
+                list_events = prune_events(
+                    list_events,
+                    self.token_budget,
+                    count_tokens=lambda event: estimate_tokens(
+                        self.prompt_format.format_event(event)
+                    ),
+                )
+                attributes["kept"] = len(list_events)
+        with METRICS.span(
+            "prompt_format", events=len(list_events), format=self.prompt_format.name
+        ):
+            formatted_events = self.prompt_format.format_events(list_events)
+        if self.cache is None:
+            return formatted_events, None, None
+
+        key = self.cache_key(formatted_events, match_context)
+        response = self.cache.get(key)
+        METRICS.count("cache_lookups_total", label="miss" if response is None else "hit")
+        return formatted_events, key, response
+
+    def _estimate_tokens(self, inputs: dict[str, str]) -> int:
+        """Estimate the tokens of a call, reserved in the budget of the dispatcher.
+
+        Args:
+            inputs (dict[str, str]): The inputs of the prompt.
+
+        Returns:
+            int: The tokens of the prompt and of the expected commentary.
+        """
+        return (
+            self._template_tokens
+            + sum(estimate_tokens(value) for value in inputs.values())
+            + COMPLETION_TOKENS_ESTIMATE
+        )
+
+    def _degrades(self, error: Exception) -> bool:
+        """Check whether a failed call is commented without LLM, only with a dispatcher.
+
+        Args:
+            error (Exception): The error of the call.
+
+        Returns:
+            bool: The calls are shed, or the retries of the error are exhausted.
+        """
+        return self.dispatcher is not None and (
+            isinstance(error, CircuitOpenError) or is_retryable(error, self.backend.is_retryable)
+        )
+
+    def _call(self, inputs: dict[str, str], tokens: int) -> BaseMessage:
+        """Call the chain, through the dispatcher if any."""
+        if self.dispatcher is None:
+            return self.chain.invoke(input=inputs)
+        return self.dispatcher.call(
+            lambda: self.chain.invoke(input=inputs), tokens, self.backend.is_retryable
+        )
+
+    async def _acall(self, inputs: dict[str, str], tokens: int) -> BaseMessage:
+        """Call the chain asynchronously, through the dispatcher if any."""
+        if self.dispatcher is None:
+            return await self.chain.ainvoke(input=inputs)
+        return await self.dispatcher.acall(
+            lambda: self.chain.ainvoke(input=inputs), tokens, self.backend.is_retryable
+        )
+
+    def _stream_chunks(self, inputs: dict[str, str], tokens: int) -> Iterator[BaseMessage]:
+        """Stream the chunks of the chain, through the dispatcher if any."""
+        if self.dispatcher is None:
+            return self.chain.stream(input=inputs)
+        return self.dispatcher.stream(
+            lambda: self.chain.stream(input=inputs), tokens, self.backend.is_retryable
+        )
+
+    def _astream_chunks(self, inputs: dict[str, str], tokens: int) -> AsyncIterator[BaseMessage]:
+        """Stream the chunks of the chain asynchronously, through the dispatcher if any."""
+        if self.dispatcher is None:
+            return self.chain.astream(input=inputs)
+        return self.dispatcher.astream(
+            lambda: self.chain.astream(input=inputs), tokens, self.backend.is_retryable
+        )
+
+    def _degrade(self, list_events: list[FootballEvent]) -> str:
+        """Comment on events without LLM, the commentary is not cached.
+
+        Args:
+            list_events (list[FootballEvent]): list of events to comment.
+
+        Returns:
+            str: The degraded commentary.
+        """
+        METRICS.count("llm_degraded_total", label=self.backend.name)
+        return degraded_commentary(list_events)
+
+    def _finish(
+        self,
+        message: BaseMessage,
+        key: str | None,
+        tokens: int = 0,
+        span: dict[str, Any] | None = None,
+    ) -> str:
+        """Record the tokens of a call, and cache its commentary.
+
+        Args:
+            message (BaseMessage): The message of the LLM.
+            key (str | None): The key of the window in the cache.
+            tokens (int, optional): tokens reserved for the call. Defaults to 0.
+            span (dict[str, Any] | None, optional): attributes of the span of the call,
+                completed with its tokens. Defaults to None.
+
+        Returns:
+            str: LLM's commentary on successive events
+        """
+        usage = getattr(message, "usage_metadata", None) or {}
+        if self.dispatcher is not None:
+            self.dispatcher.record_usage(tokens, usage.get("total_tokens", 0))
+        METRICS.count("llm_calls_total", label=self.backend.name)
+        METRICS.count("llm_tokens_total", usage.get("input_tokens", 0), label="prompt")
+        METRICS.count("llm_tokens_total", usage.get("output_tokens", 0), label="completion")
+        if span is not None:
+            span["input_tokens"] = usage.get("input_tokens", 0)
+            span["output_tokens"] = usage.get("output_tokens", 0)
+        response = self.parser.invoke(message)
+        if self.cache is not None and key is not None:
+            self.cache.set(key, response)
+        return response
+
+    def invoke(self, list_events: list[FootballEvent], match_context: str = "") -> str:
+        """Invoke the LLM to comment on events.
+
+        Args:
+            list_events (list[FootballEvent]): list of events to comment.
+            match_context (str, optional): state of the game before the events (score,
+                shots ..). Defaults to "".
+
+        Returns:
+            str: LLM's commentary on successive events
+        """
+        formatted_events, key, response = self._lookup(list_events, match_context)
+        if response is not None:
+            return response
+        inputs = {"list_events": formatted_events, "match_context": match_context}
+        tokens = self._estimate_tokens(inputs)
+        with METRICS.span("llm", backend=self.backend.name, model=self.model_name) as span:
+            try:
+                message = self._call(inputs, tokens)
+            except Exception as error:
+                if not self._degrades(error):
+                    raise
+                return self._degrade(list_events)
+            return self._finish(message, key, tokens, span)
+
+    async def ainvoke(self, list_events: list[FootballEvent], match_context: str = "") -> str:
+        """Invoke the LLM asynchronously to comment on events.
+
+        The asynchronous clients of a backend may be bound to the event loop that uses
+        them first, so the engine should be shared by the calls of one long-lived loop.
+
+        Args:
+            list_events (list[FootballEvent]): list of events to comment.
+            match_context (str, optional): state of the game before the events (score,
+                shots ..). Defaults to "".
+
+        Returns:
+            str: LLM's commentary on successive events
+        """
+        formatted_events, key, response = self._lookup(list_events, match_context)
+        if response is not None:
+            return response
+        inputs = {"list_events": formatted_events, "match_context": match_context}
+        tokens = self._estimate_tokens(inputs)
+        with METRICS.span("llm", backend=self.backend.name, model=self.model_name) as span:
+            try:
+                message = await self._acall(inputs, tokens)
+            except Exception as error:
+                if not self._degrades(error):
+                    raise
+                return self._degrade(list_events)
+            return self._finish(message, key, tokens, span)
+
+    def _record_first_token(self, start: float) -> None:
+        """Record the time to the first token of a streamed call.
+
+        Args:
+            start (float): start of the call (`time.perf_counter()`).
+        """
+        METRICS.observe(
+            "llm_first_token",
+            time.perf_counter() - start,
+            backend=self.backend.name,
+            model=self.model_name,
+        )
+
+    def stream(self, list_events: list[FootballEvent], match_context: str = "") -> Iterator[str]:
+        """Invoke the LLM to comment on events, yielding the tokens as they arrive.
+
+        The time to the first token and the total latency of the call are recorded. A
+        cached commentary is yielded at once.
+
+        Args:
+            list_events (list[FootballEvent]): list of events to comment.
+            match_context (str, optional): state of the game before the events (score,
+                shots ..). Defaults to "".
+
+        Yields:
+            str: The successive parts of the commentary.
+        """
+        formatted_events, key, response = self._lookup(list_events, match_context)
+        if response is not None:
+            yield response
+            return
+        inputs = {"list_events": formatted_events, "match_context": match_context}
+        tokens = self._estimate_tokens(inputs)
+        message: BaseMessage | None = None
+        with METRICS.span(
+            "llm", backend=self.backend.name, model=self.model_name, stream=True
+        ) as span:
+            start = time.perf_counter()
+            try:
+                for chunk in self._stream_chunks(inputs, tokens):
+                    text = self.parser.invoke(chunk)
+                    if text and (message is None or not message.content):
+                        self._record_first_token(start)
+                    message = chunk if message is None else cast(BaseMessageChunk, message) + chunk
+                    if text:
+                        yield text
+            except Exception as error:
+                # Only a call failing before its first part is degraded
+                if message is not None or not self._degrades(error):
+                    raise
+                yield self._degrade(list_events)
+                return
+            if message is not None:
+                self._finish(message, key, tokens, span)
+
+    async def astream(
+        self, list_events: list[FootballEvent], match_context: str = ""
+    ) -> AsyncIterator[str]:
+        """Invoke the LLM asynchronously, yielding the tokens as they arrive.
+
+        Args:
+            list_events (list[FootballEvent]): list of events to comment.
+            match_context (str, optional): state of the game before the events (score,
+                shots ..). Defaults to "".
+
+        Yields:
+            str: The successive parts of the commentary.
+        """
+        formatted_events, key, response = self._lookup(list_events, match_context)
+        if response is not None:
+            yield response
+            return
+        inputs = {"list_events": formatted_events, "match_context": match_context}
+        tokens = self._estimate_tokens(inputs)
+        message: BaseMessage | None = None
+        with METRICS.span(
+            "llm", backend=self.backend.name, model=self.model_name, stream=True
+        ) as span:
+            start = time.perf_counter()
+            try:
+                async for chunk in self._astream_chunks(inputs, tokens):
+                    text = self.parser.invoke(chunk)
+                    if text and (message is None or not message.content):
+                        self._record_first_token(start)
+                    message = chunk if message is None else cast(BaseMessageChunk, message) + chunk
+                    if text:
+                        yield text
+            except Exception as error:
+                # Only a call failing before its first part is degraded
+                if message is not None or not self._degrades(error):
+                    raise
+                yield self._degrade(list_events)
+                return
+            if message is not None:
+                self._finish(message, key, tokens, span)
+
+    def close(self) -> None:
+        """Release the resources of the backend."""
+        self.backend.close()
+
+    async def aclose(self) -> None:
+        """Release the asynchronous resources of the backend."""
+        await self.backend.aclose()
+
+
+def build_commentator_engine(
+    backend: str | None = None, backend_options: dict[str, Any] | None = None
+) -> CommentatorEngine:
+    """Build an engine from the env variables.
+
+    The model must be set through env variables, otherwise the default one is
+    gpt-4o-mini. Same for the temperature, default is 0.05 (small variability), and the
+    backend, default is OpenAI. Commentaries are cached if COMMENTARY_CACHE_PATH is specified.
+    The calls are dispatched within the LLM_REQUESTS_PER_MINUTE and LLM_TOKENS_PER_MINUTE
+    budgets of the provider, and retried up to LLM_MAX_RETRIES times.
+
+    Args:
+        backend (str | None, optional): name of the backend. Defaults to None
+            (LLM_BACKEND).
+        backend_options (dict[str, Any] | None, optional): parameters of the backend.
+            Defaults to None (LLM_BACKEND_OPTIONS, or none for another backend).
+
+    Returns:
+        CommentatorEngine: The engine.
+    """
+    if backend_options is None:
+        backend_options = LLM_BACKEND_OPTIONS if backend in (None, LLM_BACKEND) else {}
+    cache = None
+    if COMMENTARY_CACHE_PATH:
+        cache = CommentaryCache(
+            path=COMMENTARY_CACHE_PATH,
+            max_entries=COMMENTARY_CACHE_MAX_ENTRIES,
+            max_age=COMMENTARY_CACHE_MAX_AGE,
+        )
+    dispatcher = LLMDispatcher(
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE or None,
+        tokens_per_minute=LLM_TOKENS_PER_MINUTE or None,
+        retry=RetryPolicy(max_retries=LLM_MAX_RETRIES),
+        breaker=CircuitBreaker(LLM_CIRCUIT_FAILURES, LLM_CIRCUIT_RESET),
+        timeout=LLM_TIMEOUT or None,
     )
-    # The model must be set through env variables,
-    # Otherwise the default one is gpt-4o-mini
-    # Same for the temperature, default is 0.05 (small variability)
-    llm = ChatOpenAI(model=OPENAI_MODEL_NAME)  # type: ignore
-
-    # Chain of calling the llm, format events -> Inject in prompt -> Comment
-    rag_chain = (  # type: ignore
-        {  # type: ignore
-            "list_events": itemgetter("list_events") | RunnableLambda(format_events_to_string),
-        }
-        | prompt
-        | llm
-        | StrOutputParser()
+    return CommentatorEngine(
+        backend=get_backend(backend or LLM_BACKEND, **backend_options),
+        cache=cache,
+        dispatcher=dispatcher,
     )
 
-    response = rag_chain.invoke(input={"list_events": list_events})
-    return response
+
+@cache
+def get_commentator_engine() -> CommentatorEngine:
+    """Get the engine shared by the whole process, see `build_commentator_engine`.
+
+    Returns:
+        CommentatorEngine: The engine.
+    """
+    return build_commentator_engine()
+
+
+def invoke_llm(list_events: list[FootballEvent], match_context: str = "") -> str:
+    """Invoke an LLM to comment on events.
+
+    Args:
+        list_events (list[FootballEvent]): list of events to comment.
+        match_context (str, optional): state of the game before the events.
+            Defaults to "".
+
+    Returns:
+        str: LLM's commentary on successive events
+    """
+    return get_commentator_engine().invoke(list_events, match_context)
+
+
+def stream_llm(list_events: list[FootballEvent], match_context: str = "") -> Iterator[str]:
+    """Invoke an LLM to comment on events, yielding the tokens as they arrive.
+
+    Args:
+        list_events (list[FootballEvent]): list of events to comment.
+        match_context (str, optional): state of the game before the events.
+            Defaults to "".
+
+    Returns:
+        Iterator[str]: The successive parts of the commentary.
+    """
+    return get_commentator_engine().stream(list_events, match_context)
@@ -3,8 +3,7 @@
 import datetime
 from dataclasses import dataclass
 
-from openai import BaseModel
-from pydantic import field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 @dataclass
@@ -26,6 +25,8 @@ class Competition:
 class Team(BaseModel):
     """Class to represnet a team."""
 
+    model_config = ConfigDict(extra="allow")
+
     name: str
     logo: str
     lineup: list[Player]
@@ -55,6 +56,8 @@ class Team(BaseModel):
 class MatchInfo(BaseModel):
     """Class to represent a game."""
 
+    model_config = ConfigDict(extra="allow")
+
     competition: Competition
     home_team: Team
     away_team: Team
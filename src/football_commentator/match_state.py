@@ -0,0 +1,236 @@
+"""Module to follow the state of a game (score, shots, possession ..) as its events arrive."""
+
+import copy
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from football_commentator.event import EventType, FootballEvent
+
+# Outcomes of the shots on target
+GOAL_OUTCOME = "Goal"
+ON_TARGET_OUTCOMES = (GOAL_OUTCOME, "Saved", "Saved To Post")
+# Own goals are recorded twice, for the team scoring and for the team of the player
+OWN_GOAL_FOR = "Own Goal For"
+# Cards, given for a foul or a bad behaviour
+YELLOW_CARDS = ("Yellow Card",)
+RED_CARDS = ("Second Yellow", "Red Card")
+# Events of the team having the ball, the time until the next event is its possession
+POSSESSION_EVENT_TYPES = {
+    EventType.PASS.value,
+    EventType.BALL_RECEIPT.value,
+    "Carry",
+    EventType.DRIBBLE.value,
+    EventType.SHOT.value,
+    EventType.BALL_RECOVERY.value,
+    EventType.MISCONTROL.value,
+}
+# The penalty shoot-out does not count in the score
+SHOOTOUT_PERIOD = 5
+
+
+@dataclass(slots=True)
+class TeamStats:
+    """Class to represent the running totals of a team."""
+
+    goals: int = 0
+    shots: int = 0
+    shots_on_target: int = 0
+    xg: float = 0.0
+    possession_ms: int = 0
+    yellow_cards: int = 0
+    red_cards: int = 0
+    substitutions: int = 0
+
+
+@dataclass
+class MatchState:
+    """Class to represent the state of a game after some of its events.
+
+    The state is updated in constant time per event, events being added in game clock
+    order. Possession is the time between an event of a team having the ball and the
+    next event of the same period.
+    """
+
+    teams: dict[str, TeamStats] = field(default_factory=dict)
+    clock: int = 0  # Game clock of the last event (in ms)
+    period: int = 1
+    possession_team: str | None = None
+
+    def team(self, name: str) -> TeamStats:
+        """Get the totals of a team.
+
+        Args:
+            name (str): name of the team.
+
+        Returns:
+            TeamStats: The totals, zero for a team without event yet.
+        """
+        return self.teams.get(name) or TeamStats()
+
+    def possession_share(self, name: str) -> float:
+        """Share of the possession of a team.
+
+        Args:
+            name (str): name of the team.
+
+        Returns:
+            float: The share, between 0 and 1 (0 before any possession).
+        """
+        total = sum(stats.possession_ms for stats in self.teams.values())
+        return self.team(name).possession_ms / total if total else 0.0
+
+    def update(self, event: FootballEvent) -> None:
+        """Add an event to the totals.
+
+        Args:
+            event (FootballEvent): The event, after all the events already added.
+        """
+        if self.possession_team is not None and event.period == self.period:
+            self.teams[self.possession_team].possession_ms += max(0, event.clock - self.clock)
+        if event.period != self.period:
+            self.possession_team = None
+        self.clock = event.clock
+        self.period = event.period
+
+        stats = self.teams.get(event.team)
+        if stats is None:
+            stats = self.teams[event.team] = TeamStats()
+        if event.event_type in POSSESSION_EVENT_TYPES:
+            self.possession_team = event.team
+
+        if event.event_type == EventType.SHOT.value:
+            stats.shots += 1
+            stats.xg += event.xg or 0.0
+            if event.outcome in ON_TARGET_OUTCOMES:
+                stats.shots_on_target += 1
+            if event.outcome == GOAL_OUTCOME and event.period < SHOOTOUT_PERIOD:
+                stats.goals += 1
+        elif event.event_type == OWN_GOAL_FOR:
+            stats.goals += 1
+        elif event.event_type == EventType.SUBSTITUTION.value:
+            stats.substitutions += 1
+        elif event.card is not None:
+            stats.yellow_cards += event.card in YELLOW_CARDS
+            stats.red_cards += event.card in RED_CARDS
+
+    def summary(self, team_names: Iterable[str] | None = None) -> str:
+        """Summarize the state for the prompt.
+
+        Args:
+            team_names (Iterable[str] | None, optional): order of the teams. Defaults to
+                None (order of their first event).
+
+        Returns:
+            str: The summary, one line per statistic, empty before any event.
+        """
+        names = list(self.teams if team_names is None else team_names)
+        if not names:
+            return ""
+        teams = [self.team(name) for name in names]
+        rows = {
+            "Score": [f"{name} {team.goals}" for name, team in zip(names, teams, strict=True)],
+            "Shots (on target)": [f"{team.shots} ({team.shots_on_target})" for team in teams],
+            "xG": [f"{team.xg:.2f}" for team in teams],
+            "Possession": [f"{self.possession_share(name):.0%}" for name in names],
+            "Cards (yellow/red)": [f"{team.yellow_cards}/{team.red_cards}" for team in teams],
+            "Substitutions": [str(team.substitutions) for team in teams],
+        }
+        return "\n".join(f"{label}: {' - '.join(values)}" for label, values in rows.items())
+
+
+class MatchStateAggregator:
+    """Class to follow the state of a game, and replay it at any game clock.
+
+    The current state is updated in constant time per event. The events are kept, with
+    a copy of the state every `checkpoint_interval` events: the state at any clock is
+    the closest checkpoint before it, updated with the few events that follow. An event
+    arriving late (before the last one) is inserted in order, and the state is replayed
+    from the checkpoint before it.
+
+    The aggregator is shared by the thread adding the events and the viewers.
+    """
+
+    def __init__(self, checkpoint_interval: int = 256):
+        """Initialize class.
+
+        Args:
+            checkpoint_interval (int, optional): number of events between two copies of
+                the state. Defaults to 256.
+        """
+        self.checkpoint_interval = checkpoint_interval
+        self._events: list[FootballEvent] = []
+        self._clocks: list[int] = []
+        # State before the events k * checkpoint_interval
+        self._checkpoints: list[MatchState] = [MatchState()]
+        self._state = MatchState()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of events added."""
+        return len(self._events)
+
+    def _replay(self, checkpoint: int, end: int) -> MatchState:
+        """Build the state before an event, from a checkpoint."""
+        state = copy.deepcopy(self._checkpoints[checkpoint])
+        for event in self._events[checkpoint * self.checkpoint_interval : end]:
+            state.update(event)
+        return state
+
+    def _add(self, event: FootballEvent) -> None:
+        """Add an event, the lock being held."""
+        if self._clocks and event.clock < self._clocks[-1]:
+            position = bisect_right(self._clocks, event.clock)
+            self._events.insert(position, event)
+            self._clocks.insert(position, event.clock)
+            # The checkpoints after the event are rebuilt
+            del self._checkpoints[position // self.checkpoint_interval + 1 :]
+            checkpoint = len(self._checkpoints) - 1
+            self._state = copy.deepcopy(self._checkpoints[checkpoint])
+            start = checkpoint * self.checkpoint_interval
+        else:
+            self._events.append(event)
+            self._clocks.append(event.clock)
+            start = len(self._events) - 1
+
+        for position in range(start, len(self._events)):
+            if position == len(self._checkpoints) * self.checkpoint_interval:
+                self._checkpoints.append(copy.deepcopy(self._state))
+            self._state.update(self._events[position])
+
+    def update(self, event: FootballEvent) -> None:
+        """Add an event to the game.
+
+        Args:
+            event (FootballEvent): The event.
+        """
+        with self._lock:
+            self._add(event)
+
+    def extend(self, events: Iterable[FootballEvent]) -> None:
+        """Add events to the game.
+
+        Args:
+            events (Iterable[FootballEvent]): The events, in game clock order.
+        """
+        with self._lock:
+            for event in events:
+                self._add(event)
+
+    def snapshot(self, clock: int | None = None) -> MatchState:
+        """Get the state of the game at a game clock.
+
+        Args:
+            clock (int | None, optional): The game clock (in ms), the events at this clock
+                are not counted. Defaults to None (all the events added).
+
+        Returns:
+            MatchState: A copy of the state.
+        """
+        with self._lock:
+            if clock is None or (self._clocks and clock > self._clocks[-1]):
+                return copy.deepcopy(self._state)
+            end = bisect_left(self._clocks, clock)
+            checkpoint = min(end // self.checkpoint_interval, len(self._checkpoints) - 1)
+            return self._replay(checkpoint, end)
@@ -0,0 +1,182 @@
+"""Module to measure the stages of the commentary pipeline."""
+
+import bisect
+import cProfile
+import json
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from football_commentator.constants import METRICS_TRACE_PATH
+
+# Upper bounds of the duration histograms (in s)
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PREFIX = "football_commentator"
+
+
+class PipelineMetrics:
+    """Class to collect the durations of the pipeline stages and the LLM tokens.
+
+    Durations are aggregated in histograms, exported in the Prometheus text format.
+    Each span can also be written to a JSONL trace.
+    """
+
+    def __init__(self, trace_path: Path | str | None = None):
+        """Initialize class.
+
+        Args:
+            trace_path (Path | str | None, optional): path to the JSONL trace of the spans.
+                Defaults to None (no trace).
+        """
+        self.trace_path = Path(trace_path) if trace_path else None
+        self._lock = threading.Lock()
+        self._buckets: dict[str, list[int]] = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self._sums: dict[str, float] = defaultdict(float)
+        self._counters: dict[tuple[str, str], float] = defaultdict(float)
+
+    @contextmanager
+    def span(self, stage: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+        """Measure the duration of a stage.
+
+        Args:
+            stage (str): name of the stage.
+            attributes (Any): attributes added to the trace of the span.
+
+        Yields:
+            dict[str, Any]: The attributes, that can be completed during the span.
+        """
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.observe(stage, time.perf_counter() - start, **attributes)
+
+    def observe(self, stage: str, seconds: float, **attributes: Any) -> None:
+        """Record the duration of a stage.
+
+        Args:
+            stage (str): name of the stage.
+            seconds (float): duration of the stage.
+            attributes (Any): attributes added to the trace of the span.
+        """
+        with self._lock:
+            self._buckets[stage][bisect.bisect_left(BUCKETS, seconds)] += 1
+            self._sums[stage] += seconds
+            if self.trace_path is not None:
+                span = {"stage": stage, "time": time.time(), "duration": seconds, **attributes}
+                with open(self.trace_path, "a") as trace:
+                    trace.write(json.dumps(span, default=str) + "\n")
+
+    def count(self, name: str, value: float = 1, label: str = "") -> None:
+        """Increment a counter.
+
+        Args:
+            name (str): name of the counter.
+            value (float, optional): increment. Defaults to 1.
+            label (str, optional): value of the 'kind' label. Defaults to "".
+        """
+        with self._lock:
+            self._counters[(name, label)] += value
+
+    def stage_count(self, stage: str) -> int:
+        """Number of spans recorded for a stage."""
+        with self._lock:
+            return sum(self._buckets[stage]) if stage in self._buckets else 0
+
+    def counter(self, name: str, label: str = "") -> float:
+        """Value of a counter."""
+        with self._lock:
+            return self._counters.get((name, label), 0)
+
+    def to_prometheus(self) -> str:
+        """Export the metrics in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+        name = f"{PREFIX}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Duration of the commentary pipeline stages.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for stage, buckets in sorted(self._buckets.items()):
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), buckets, strict=True):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {self._sums[stage]}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+
+            for counter in sorted({counter for counter, _ in self._counters}):
+                lines.append(f"# TYPE {PREFIX}_{counter} counter")
+                for (other, label), value in sorted(self._counters.items()):
+                    if other == counter:
+                        labels = f'{{kind="{label}"}}' if label else ""
+                        lines.append(f"{PREFIX}_{counter}{labels} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Forget all the measures."""
+        with self._lock:
+            self._buckets.clear()
+            self._sums.clear()
+            self._counters.clear()
+
+
+METRICS = PipelineMetrics(trace_path=METRICS_TRACE_PATH)
+
+
+def start_metrics_server(port: int, metrics: PipelineMetrics = METRICS) -> ThreadingHTTPServer:
+    """Serve the metrics on '/metrics', for Prometheus to scrape them.
+
+    Args:
+        port (int): port of the server.
+        metrics (PipelineMetrics, optional): metrics to serve. Defaults to METRICS.
+
+    Returns:
+        ThreadingHTTPServer: The server, running in a background thread.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+@contextmanager
+def profile(path: Path | str) -> Iterator[cProfile.Profile]:
+    """Profile a block of code, e.g. a single tick of the interface.
+
+    Args:
+        path (Path | str): path to the stats of the profile (see `pstats`).
+
+    Yields:
+        cProfile.Profile: The profiler.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
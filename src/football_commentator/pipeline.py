@@ -0,0 +1,401 @@
+"""Module to generate commentaries ahead of the game clock."""
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from football_commentator.data.event_batch import EventBatch
+from football_commentator.data.event_store import MatchEventStore
+from football_commentator.event import FootballEvent
+from football_commentator.match_state import MatchStateAggregator
+from football_commentator.metrics import METRICS
+from football_commentator.pruning import score_event
+from football_commentator.spatial import ZoneHeatmaps
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CommentaryWindow:
+    """Class to represent a window of the game to comment on."""
+
+    index: int
+    start: int  # Time elapsed since the kick off (in ms)
+    end: int  # Time elapsed since the kick off (in ms), excluded
+
+    @property
+    def timer(self) -> str:
+        """Timer at the end of the window, when its commentary is published."""
+        minutes, seconds = divmod(self.end // 1000, 60)
+        return f"{minutes:02d}'{seconds:02d}"
+
+
+class WindowScheduler:
+    """Class to cut the game in windows to comment on, along the game clock.
+
+    Each window starts exactly at the end of the previous one, so no event is lost or
+    commented twice, whatever the delays of the caller. By default all windows last
+    `window_duration`. Optionally, a window closes shortly after an important event (e.g.
+    a shot), and a quiet window is merged with the next one, up to `max_duration`, so
+    the commentaries follow the action.
+    """
+
+    def __init__(
+        self,
+        store: MatchEventStore,
+        window_duration: int = 20_000,
+        close_on_score: float | None = None,
+        close_delay: int = 3_000,
+        min_duration: int = 5_000,
+        quiet_events: int = 0,
+        max_duration: int = 60_000,
+    ):
+        """Initialize class.
+
+        Args:
+            store (MatchEventStore): store of the game's events.
+            window_duration (int, optional): nominal duration of a window (in ms).
+                Defaults to 20s.
+            close_on_score (float | None, optional): importance score (see `score_event`)
+                of an event closing its window early. Defaults to None (never).
+            close_delay (int, optional): time kept after an important event, for its
+                outcome (in ms). Defaults to 3s.
+            min_duration (int, optional): minimal duration of a window closed early (in ms).
+                Defaults to 5s.
+            quiet_events (int, optional): a window with fewer events is merged with the
+                next one. Defaults to 0 (never).
+            max_duration (int, optional): maximal duration of merged windows (in ms).
+                Defaults to 60s.
+        """
+        self.store = store
+        self.window_duration = window_duration
+        self.close_on_score = close_on_score
+        self.close_delay = close_delay
+        self.min_duration = min_duration
+        self.quiet_events = quiet_events
+        self.max_duration = max_duration
+
+    def _early_end(self, start: int, end: int, events: list[FootballEvent]) -> int | None:
+        """Find the end of a window closed by an important event.
+
+        Args:
+            start (int): start of the window (in ms since the kick off).
+            end (int): nominal end of the window (in ms since the kick off).
+            events (list[FootballEvent]): events of the window known so far, in order.
+
+        Returns:
+            int | None: The end of the window, None without important event.
+        """
+        if self.close_on_score is None:
+            return None
+        for event in events:
+            if score_event(event) >= self.close_on_score:
+                closed = self.store.clock_to_elapsed(event.clock) + self.close_delay
+                return min(end, max(start + self.min_duration, closed))
+        return None
+
+    def next_window(self, index: int, start: int, horizon: int) -> CommentaryWindow | None:
+        """Cut the next window, if the events known up to a time are enough to close it.
+
+        Args:
+            index (int): position of the window since the kick off.
+            start (int): start of the window, end of the previous one (in ms).
+            horizon (int): time up to which the events are known (in ms since the kick off).
+
+        Returns:
+            CommentaryWindow | None: The window, None if it is not closed at the horizon.
+        """
+        end = start + self.window_duration
+        while True:
+            events = self.store.load_events_between(
+                start=self.store.elapsed_to_clock(start),
+                end=self.store.elapsed_to_clock(min(end, horizon)),
+            )
+            early_end = self._early_end(start, end, events)
+            if early_end is not None and early_end <= horizon:
+                return CommentaryWindow(index=index, start=start, end=early_end)
+            if end > horizon:
+                return None
+            if (
+                len(events) >= self.quiet_events
+                or end - start + self.window_duration > self.max_duration
+            ):
+                return CommentaryWindow(index=index, start=start, end=end)
+            end += self.window_duration
+
+
+class LookAheadCommentator:
+    """Class to generate the commentaries of the windows in background threads.
+
+    For replayed games, all the events are known in advance: the commentaries of the
+    next windows are generated before their end, so they are ready to be published
+    without waiting for the LLM. For live games, a window is commented as soon as it
+    is closed, while the next one is being played.
+
+    Windows are cut by a `WindowScheduler`, on the time elapsed since the kick off: after
+    a stall, all the windows closed in the meantime are submitted at once. For replayed
+    games, no window starts after the last event: the commentator is then finished.
+
+    For live games, the windows also follow the events received: a window closes once
+    the feed is `live_grace` past its end, so the breaks between periods (not in the game
+    clock) do not run the windows ahead of the feed, and the events received slightly out
+    of order are still commented. Events received after their window closed are logged.
+
+    The commentator may stream its commentary: the parts received so far are then
+    available from the end of the window, before the generation is over.
+
+    With a `MatchStateAggregator`, the events of each window are added to the state of
+    the game when the window is submitted, and the state at its start (score, shots ..)
+    is given to the commentator as `match_context`. With `ZoneHeatmaps`, the context
+    also tells where the teams play, in the window and since the kick off.
+    """
+
+    def __init__(
+        self,
+        store: MatchEventStore,
+        commentate: Callable[..., str | Iterable[str]] | None = None,
+        window_duration: int = 20_000,
+        lookahead: int = 3,
+        live: bool = False,
+        live_grace: int = 5_000,
+        scheduler: WindowScheduler | None = None,
+        match_state: MatchStateAggregator | None = None,
+        heatmaps: ZoneHeatmaps | None = None,
+    ):
+        """Initialize class.
+
+        Args:
+            store (MatchEventStore): store of the game's events.
+            commentate (Callable[..., str | Iterable[str]] | None, optional): function that
+                comments on a list of events, or streams the parts of its commentary (e.g.
+                stream_llm). Defaults to None (invoke_llm).
+            window_duration (int, optional): duration of a window (in ms). Defaults to 20s.
+            lookahead (int, optional): number of windows generated in advance, also the
+                number of concurrent generations. Defaults to 3.
+            live (bool, optional): the events are received during the game. Defaults to False.
+            live_grace (int, optional): time the feed must run past the end of a window
+                before it closes, in live games (in ms). Defaults to 5s.
+            scheduler (WindowScheduler | None, optional): cuts the windows. Defaults to None
+                (windows of `window_duration`).
+            match_state (MatchStateAggregator | None, optional): state of the game, fed
+                with the events of the windows. Defaults to None (no match context).
+            heatmaps (ZoneHeatmaps | None, optional): zones where the teams play, fed
+                with the events of the windows. Defaults to None (no field context).
+        """
+        if commentate is None:
+            # The LLM stack is only imported when it comments
+            from football_commentator.llm import invoke_llm
+
+            commentate = invoke_llm
+        self.store = store
+        self.commentate = commentate
+        self.window_duration = window_duration
+        self.lookahead = lookahead
+        self.live = live
+        self.live_grace = live_grace
+        self.scheduler = scheduler or WindowScheduler(store, window_duration=window_duration)
+        self.match_state = match_state
+        self.heatmaps = heatmaps
+        self._windows: list[CommentaryWindow] = []  # Windows submitted, in order
+        self._executor = ThreadPoolExecutor(max_workers=lookahead)
+        self._futures: dict[CommentaryWindow, Future[str]] = {}
+        self._partials: dict[CommentaryWindow, list[str]] = {}  # Streamed parts
+        self._next_published = 0  # Next window to publish
+
+    def window(self, index: int) -> CommentaryWindow:
+        """Get a window of the game, already submitted.
+
+        Args:
+            index (int): position of the window since the kick off.
+
+        Returns:
+            CommentaryWindow: The window.
+        """
+        return self._windows[index]
+
+    @property
+    def finished(self) -> bool:
+        """The last window of a replayed game is published, live games never finish."""
+        if self.live or not self._windows:
+            return False
+        return self._windows[-1].end > self.store.duration and self._next_published >= len(
+            self._windows
+        )
+
+    def _load(self, window: CommentaryWindow) -> tuple[EventBatch, list[FootballEvent]]:
+        """Load the events of a window.
+
+        Args:
+            window (CommentaryWindow): The window.
+
+        Returns:
+            tuple[EventBatch, list[FootballEvent]]: The events of the window, in order,
+                as columns and as objects.
+        """
+        with METRICS.span("window_load", window=window.index) as span:
+            batch = self.store.load_batch_between(
+                start=self.store.elapsed_to_clock(window.start),
+                end=self.store.elapsed_to_clock(window.end),
+            )
+            events = batch.to_events()
+            span["events"] = len(events)
+        return batch, events
+
+    def _match_context(self, batch: EventBatch, events: list[FootballEvent]) -> str:
+        """Describe the game for the commentary of the next window, and add its events.
+
+        Windows are submitted in order: the state of the game is the one at the start of
+        the window.
+
+        Args:
+            batch (EventBatch): The events of the window, as columns.
+            events (list[FootballEvent]): The events of the window.
+
+        Returns:
+            str: The context of the window.
+        """
+        sections = []
+        if self.match_state is not None:
+            sections.append(self.match_state.snapshot().summary())
+            self.match_state.extend(events)
+        if self.heatmaps is not None:
+            window_counts = self.heatmaps.add_batch(batch)
+            for title, summary in (
+                ("Field in this window", self.heatmaps.summary(window_counts)),
+                ("Field since the kick off", self.heatmaps.summary()),
+            ):
+                if summary:
+                    sections.append(f"{title}:\n{summary}")
+        return "\n\n".join(section for section in sections if section)
+
+    def _generate(
+        self,
+        window: CommentaryWindow,
+        events: list[FootballEvent] | None = None,
+        match_context: str | None = None,
+    ) -> str:
+        """Comment on the events of a window.
+
+        Args:
+            window (CommentaryWindow): The window to comment on.
+            events (list[FootballEvent] | None, optional): events of the window.
+                Defaults to None (loaded from the store).
+            match_context (str | None, optional): state of the game at the start of the
+                window. Defaults to None (not given to the commentator).
+
+        Returns:
+            str: The commentary.
+        """
+        if events is None:
+            _, events = self._load(window)
+        with METRICS.span("commentary", window=window.index):
+            start = time.perf_counter()
+            if match_context is None:
+                commentary = self.commentate(events)
+            else:
+                commentary = self.commentate(events, match_context=match_context)
+            if isinstance(commentary, str):
+                return commentary
+            parts = self._partials.setdefault(window, [])
+            for part in commentary:
+                if not parts:
+                    METRICS.observe(
+                        "commentary_first_token", time.perf_counter() - start, window=window.index
+                    )
+                parts.append(part)
+            return "".join(parts)
+
+    def _refresh(self) -> None:
+        """Read the new events of a live game, and log those of the windows already closed."""
+        closed = self.store.elapsed_to_clock(self._windows[-1].end) if self._windows else 0
+        known = len(self.store.load_batch_between(start=0, end=closed))
+        self.store.refresh()
+        late = len(self.store.load_batch_between(start=0, end=closed)) - known
+        if late:
+            logger.warning(
+                "Skipped %d events received after their window closed (commented up to %s).",
+                late,
+                self._windows[-1].timer,
+            )
+
+    def schedule(self, elapsed: int) -> None:
+        """Submit the generation of the windows that can be commented on.
+
+        Args:
+            elapsed (int): Time elapsed since the kick off (in ms).
+        """
+        if self.live:
+            # Only closed windows are complete, their events are read from the source.
+            self._refresh()
+            horizon = min(elapsed, self.store.duration - self.live_grace)
+        else:
+            horizon = (elapsed // self.window_duration + self.lookahead) * self.window_duration
+
+        while True:
+            start = self._windows[-1].end if self._windows else 0
+            if not self.live and start > self.store.duration:
+                # The game is over, the last window holds its last event
+                break
+            window = self.scheduler.next_window(len(self._windows), start, horizon)
+            if window is None:
+                break
+            self._windows.append(window)
+            if self.match_state is None and self.heatmaps is None:
+                self._futures[window] = self._executor.submit(self._generate, window)
+                continue
+            batch, events = self._load(window)
+            match_context = self._match_context(batch, events)
+            self._futures[window] = self._executor.submit(
+                self._generate, window, events, match_context
+            )
+
+    def pop_ready(self, elapsed: int) -> list[tuple[CommentaryWindow, str]]:
+        """Get the commentaries ready to be published, in the order of the windows.
+
+        A commentary is published once its window is over and its generation is done.
+        A window whose generation failed is skipped.
+
+        Args:
+            elapsed (int): Time elapsed since the kick off (in ms).
+
+        Returns:
+            list[tuple[CommentaryWindow, str]]: The windows with their commentary.
+        """
+        ready = []
+        while self._next_published < len(self._windows):
+            window = self._windows[self._next_published]
+            future = self._futures[window]
+            if window.end > elapsed or not future.done():
+                break
+            del self._futures[window]
+            self._partials.pop(window, None)
+            self._next_published += 1
+            try:
+                ready.append((window, future.result()))
+            except Exception:
+                logger.exception("The commentary of the window %s failed.", window.timer)
+        return ready
+
+    def partial(self, elapsed: int) -> tuple[CommentaryWindow, str] | None:
+        """Get the commentary streamed so far of the next window to publish.
+
+        Args:
+            elapsed (int): Time elapsed since the kick off (in ms).
+
+        Returns:
+            tuple[CommentaryWindow, str] | None: The window with the parts of its commentary
+                received so far, None if it is not over or nothing was received yet.
+        """
+        if self._next_published >= len(self._windows):
+            return None
+        window = self._windows[self._next_published]
+        parts = self._partials.get(window)
+        if window.end > elapsed or not parts:
+            return None
+        return window, "".join(parts)
+
+    def shutdown(self) -> None:
+        """Stop the background generations."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,105 @@
+"""Module to register the plugins of the package: sources of events and LLM backends."""
+
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Any
+
+
+class PluginRegistry:
+    """Class to find plugins by name, and import them only once they are selected.
+
+    A plugin is registered by its import path ('module:attribute'), so registering
+    imports nothing: the heavy dependencies of a backend (langchain, the OpenAI SDK ..)
+    are only imported when it is used. Other packages provide plugins through the
+    entry points of the registry's group, read the first time a name is not found.
+    """
+
+    def __init__(self, group: str, kind: str, plugins: dict[str, str] | None = None):
+        """Initialize class.
+
+        Args:
+            group (str): group of the entry points of the plugins.
+            kind (str): kind of plugins, used in the errors.
+            plugins (dict[str, str] | None, optional): import path of each plugin of the
+                package, by name. Defaults to None.
+        """
+        self.group = group
+        self.kind = kind
+        self._paths = dict(plugins or {})
+        self._discovered = False
+
+    def register(self, name: str, path: str) -> None:
+        """Register a plugin, replacing any plugin of the same name.
+
+        Args:
+            name (str): name of the plugin.
+            path (str): import path of the plugin, as 'module:attribute'.
+        """
+        self._paths[name] = path
+
+    def _discover(self) -> None:
+        """Register the plugins declared by the installed packages, once."""
+        if self._discovered:
+            return
+        self._discovered = True
+        for entry_point in entry_points(group=self.group):
+            self._paths.setdefault(entry_point.name, entry_point.value)
+
+    def names(self) -> list[str]:
+        """Names of all the available plugins.
+
+        Returns:
+            list[str]: The names, sorted.
+        """
+        self._discover()
+        return sorted(self._paths)
+
+    def load(self, name: str) -> Any:
+        """Import a plugin.
+
+        Args:
+            name (str): name of the plugin.
+
+        Raises:
+            ValueError: The plugin is unknown.
+
+        Returns:
+            Any: The plugin (a class, or a function creating the plugin).
+        """
+        if name not in self._paths:
+            self._discover()
+        if name not in self._paths:
+            raise ValueError(f"The {self.kind} '{name}' is not supported.")
+        module_name, _, attribute = self._paths[name].partition(":")
+        plugin = import_module(module_name)
+        for part in attribute.split(".") if attribute else ():
+            plugin = getattr(plugin, part)
+        return plugin
+
+    def create(self, name: str, **options: Any) -> Any:
+        """Import a plugin and create it.
+
+        Args:
+            name (str): name of the plugin.
+            options (Any): parameters of the plugin.
+
+        Returns:
+            Any: The plugin created with its parameters.
+        """
+        return self.load(name)(**options)
+
+
+BACKENDS = PluginRegistry(
+    "football_commentator.backends",
+    "LLM backend",
+    {
+        "openai": "football_commentator.backends.openai_backend:OpenAIBackend",
+        "fake": "football_commentator.backends.fake:FakeBackend",
+    },
+)
+
+SOURCES = PluginRegistry(
+    "football_commentator.sources",
+    "source of events",
+    {"json": "football_commentator.data.preprocessor_json:JSONPreprocessor"},
+)
@@ -1,11 +1,16 @@
 """Module to process prompts."""
 
+# Version of the templates, to change with them (it invalidates cached commentaries)
+PROMPT_TEMPLATE_VERSION = "2"
+
 SYSTEM_PROMPT_TEMPLATE = """
     You are a professional football commentator. 
     You provide concise, engaging, and insightful live commentary on football matches.
 """
 
 USER_PROMPT_TEMPLATE = """
+    {match_context}
+
     Given the following match events: 
     
     {list_events}, 
@@ -0,0 +1,182 @@
+"""Module to select the most important events of a window, within a token budget."""
+
+from collections.abc import Callable
+
+from football_commentator.constants import DESCRIPTION_PREFIX
+from football_commentator.event import EventType, FootballEvent
+from football_commentator.match_state import GOAL_OUTCOME
+from football_commentator.utils import estimate_tokens
+
+# Importance of each event type for a commentary, unknown types weigh 1.
+EVENT_IMPORTANCE: dict[str, float] = {
+    EventType.SHOT.value: 10.0,
+    EventType.BAD_BEHAVIOUR.value: 8.0,
+    EventType.HALF_START.value: 7.0,
+    EventType.HALF_END.value: 7.0,
+    EventType.GOAL_KEEPER.value: 6.0,
+    EventType.ERROR.value: 6.0,
+    EventType.FOUL_COMMITTED.value: 5.0,
+    EventType.SUBSTITUTION.value: 5.0,
+    EventType.OFFSIDE.value: 5.0,
+    EventType.INJURY_STOPPAGE.value: 4.0,
+    EventType.DRIBBLE.value: 4.0,
+    EventType.BLOCK.value: 4.0,
+    EventType.INTERCEPTION.value: 3.0,
+    EventType.DUEL.value: 3.0,
+    EventType.DISPOSSESSED.value: 3.0,
+    EventType.CLEARANCE.value: 3.0,
+    EventType.FOUL_WON.value: 3.0,
+    EventType.TACTICAL_SHIFT.value: 3.0,
+    EventType.PLAYER_ON.value: 3.0,
+    EventType.PLAYER_OFF.value: 3.0,
+    EventType.MISCONTROL.value: 2.0,
+    EventType.BALL_RECOVERY.value: 2.0,
+    EventType.DRIBBLED_PAST.value: 2.0,
+    EventType.PASS.value: 1.0,
+    EventType.SHIELD.value: 1.0,
+    EventType.PRESSURE.value: 1.0,
+    EventType.BALL_RECEIPT.value: 0.5,
+    EventType.CAMERA_ON.value: 0.0,
+    EventType.CAMERA_OFF.value: 0.0,
+    EventType.STARTING_XI.value: 0.0,
+}
+
+# Events of a team keeping the ball, collapsed in a summary when they follow each other.
+CHAIN_EVENT_TYPES = {EventType.PASS.value, EventType.BALL_RECEIPT.value, "Carry"}
+PASS_SEQUENCE = "Pass Sequence"
+EVENT_IMPORTANCE[PASS_SEQUENCE] = 2.0
+
+
+def zone_weight(event: FootballEvent) -> float:
+    """Weight of the zone of the field where the event happens.
+
+    Positions follow StatsBomb: a 120x80 field, each team attacking towards x = 120.
+
+    Args:
+        event (FootballEvent): The event.
+
+    Returns:
+        float: 2 in the penalty box, 1.5 in the attacking third, 1 elsewhere or unknown.
+    """
+    if event.position_x is None or event.position_y is None:
+        return 1.0
+    if event.position_x >= 102 and 18 <= event.position_y <= 62:
+        return 2.0
+    if event.position_x >= 80:
+        return 1.5
+    return 1.0
+
+
+def score_event(event: FootballEvent) -> float:
+    """Score the importance of an event for the commentary.
+
+    Args:
+        event (FootballEvent): The event.
+
+    Returns:
+        float: The score, by event type and zone, with a bonus for goals.
+    """
+    score = EVENT_IMPORTANCE.get(event.event_type, 1.0) * zone_weight(event)
+    if event.outcome == GOAL_OUTCOME:
+        score += 100.0
+    return score
+
+
+def summarize_chain(chain: list[FootballEvent]) -> FootballEvent:
+    """Summarize successive passes and receipts of a team in one event.
+
+    Args:
+        chain (list[FootballEvent]): The events of the chain, in order.
+
+    Returns:
+        FootballEvent: The summary, at the time of the first event and the position of
+            the last one.
+    """
+    passes = sum(event.event_type == EventType.PASS.value for event in chain)
+    players = list(dict.fromkeys(event.player for event in chain if event.player))
+    return FootballEvent(
+        team=chain[0].team,
+        event_type=PASS_SEQUENCE,
+        timestamp=chain[0].timestamp,
+        period=chain[0].period,
+        clock=chain[0].clock,
+        player=players[-1] if players else None,
+        position_x=chain[-1].position_x,
+        position_y=chain[-1].position_y,
+        description=(f"{DESCRIPTION_PREFIX}(passes: {passes}), (players: {', '.join(players)})"),
+    )
+
+
+def collapse_pass_chains(
+    list_events: list[FootballEvent], min_chain: int = 3
+) -> list[FootballEvent]:
+    """Collapse the chains of passes and receipts of a same team.
+
+    Args:
+        list_events (list[FootballEvent]): The events, in order.
+        min_chain (int, optional): minimal number of events of a collapsed chain.
+            Defaults to 3.
+
+    Returns:
+        list[FootballEvent]: The events, chains being replaced by their summary.
+    """
+    collapsed: list[FootballEvent] = []
+    chain: list[FootballEvent] = []
+    for event in [*list_events, None]:
+        if (
+            event is not None
+            and event.event_type in CHAIN_EVENT_TYPES
+            and (not chain or chain[0].team == event.team)
+        ):
+            chain.append(event)
+            continue
+        if len(chain) >= min_chain:
+            collapsed.append(summarize_chain(chain))
+        else:
+            collapsed.extend(chain)
+        chain = []
+        if event is not None:
+            if event.event_type in CHAIN_EVENT_TYPES:
+                chain.append(event)
+            else:
+                collapsed.append(event)
+    return collapsed
+
+
+def prune_events(
+    list_events: list[FootballEvent],
+    token_budget: int,
+    count_tokens: Callable[[FootballEvent], int] = lambda event: estimate_tokens(str(event)),
+    min_chain: int = 3,
+) -> list[FootballEvent]:
+    """Keep the most important events of a window, within a token budget.
+
+    Pass chains are collapsed first, then events are kept by decreasing score while they
+    fit in the budget. The most important event is always kept.
+
+    Args:
+        list_events (list[FootballEvent]): The events of the window, in order.
+        token_budget (int): maximal number of tokens of the kept events.
+        count_tokens (Callable[[FootballEvent], int], optional): number of tokens of an
+            event in the prompt. Defaults to an estimation on `str(event)`.
+        min_chain (int, optional): minimal number of events of a collapsed chain.
+            Defaults to 3.
+
+    Returns:
+        list[FootballEvent]: The kept events, in order.
+    """
+    candidates = collapse_pass_chains(list_events, min_chain=min_chain)
+    ranking = sorted(
+        range(len(candidates)),
+        key=lambda position: score_event(candidates[position]),
+        reverse=True,
+    )
+    kept: set[int] = set()
+    used = 0
+    for position in ranking:
+        tokens = count_tokens(candidates[position])
+        if kept and used + tokens > token_budget:
+            continue
+        kept.add(position)
+        used += tokens
+    return [event for position, event in enumerate(candidates) if position in kept]
@@ -0,0 +1,191 @@
+"""Module to summarize where the teams play, from the positions of their events."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from football_commentator.data.event_batch import EventBatch
+from football_commentator.match_state import POSSESSION_EVENT_TYPES
+
+# Positions follow StatsBomb: a 120x80 field, each team attacking towards x = 120, with
+# its left touchline at y = 0.
+PITCH_LENGTH = 120.0
+PITCH_WIDTH = 80.0
+CHANNELS = ("left", "centre", "right")
+
+
+@dataclass(frozen=True)
+class ZoneGrid:
+    """Class to cut the field in zones, along its length (columns) and width (rows).
+
+    The columns are grouped in thirds of the length, the rows in channels of the width,
+    so both must be multiples of 3.
+    """
+
+    columns: int = 6
+    rows: int = 3
+
+    def __post_init__(self):
+        """Check the size of the grid."""
+        if self.columns % 3 or self.rows % 3 or not (self.columns and self.rows):
+            raise ValueError("The columns and rows of the grid must be multiples of 3.")
+
+    @property
+    def size(self) -> int:
+        """Number of zones."""
+        return self.columns * self.rows
+
+    def zones(self, positions_x: np.ndarray, positions_y: np.ndarray) -> np.ndarray:
+        """Find the zone of positions.
+
+        Args:
+            positions_x (np.ndarray): X of the positions, NaN if unknown.
+            positions_y (np.ndarray): Y of the positions, NaN if unknown.
+
+        Returns:
+            np.ndarray: The index of the zone (column * rows + row), -1 for the unknown
+                positions.
+        """
+        known = ~(np.isnan(positions_x) | np.isnan(positions_y))
+        x = np.where(known, positions_x, 0.0)
+        y = np.where(known, positions_y, 0.0)
+        columns = np.clip(
+            (x * (self.columns / PITCH_LENGTH)).astype(np.int64), 0, self.columns - 1
+        )
+        rows = np.clip((y * (self.rows / PITCH_WIDTH)).astype(np.int64), 0, self.rows - 1)
+        return np.where(known, columns * self.rows + rows, -1)
+
+    def count_zones(self, batch: EventBatch) -> dict[str, np.ndarray]:
+        """Count the actions with the ball of each team, per zone.
+
+        Args:
+            batch (EventBatch): The events, e.g. of a window.
+
+        Returns:
+            dict[str, np.ndarray]: The counts (columns x rows) of each team with actions.
+        """
+        columns = batch.columns
+        event_types = batch.tables["event_types"].values
+        on_ball = np.array([event_type in POSSESSION_EVENT_TYPES for event_type in event_types])
+        zones = self.zones(columns["positions_x"], columns["positions_y"])
+        team_codes = columns["team_codes"]
+        kept = on_ball[columns["event_type_codes"]] & (zones >= 0) & (team_codes >= 0)
+
+        teams = batch.tables["teams"]
+        counts = np.bincount(
+            team_codes[kept] * self.size + zones[kept], minlength=len(teams) * self.size
+        ).reshape(len(teams), self.columns, self.rows)
+        return {
+            str(teams.value(int(code))): counts[code]
+            for code in np.flatnonzero(counts.sum(axis=(1, 2)))
+        }
+
+    def thirds(self, counts: np.ndarray) -> np.ndarray:
+        """Count the actions of a team per third of the length.
+
+        Args:
+            counts (np.ndarray): The counts of the team per zone (columns x rows).
+
+        Returns:
+            np.ndarray: The counts in its defensive, middle and final thirds.
+        """
+        return counts.reshape(3, self.columns // 3, self.rows).sum(axis=(1, 2))
+
+    def attacking_channels(self, counts: np.ndarray) -> np.ndarray:
+        """Count the actions of a team in its final third, per channel of the width.
+
+        Args:
+            counts (np.ndarray): The counts of the team per zone (columns x rows).
+
+        Returns:
+            np.ndarray: The counts down its left, centre and right channels.
+        """
+        final_third = counts[-(self.columns // 3) :]
+        return final_third.reshape(-1, 3, self.rows // 3).sum(axis=(0, 2))
+
+    def describe(self, team: str, counts: np.ndarray) -> str:
+        """Summarize where a team plays, for the prompt.
+
+        Args:
+            team (str): name of the team.
+            counts (np.ndarray): The counts of the team per zone (columns x rows).
+
+        Returns:
+            str: The summary, in one line.
+        """
+        total = int(counts.sum())
+        if not total:
+            return f"{team}: no action"
+        thirds = self.thirds(counts)
+        channels = self.attacking_channels(counts)
+        summary = f"{team}: {total} actions, {thirds[2] / total:.0%} in the final third"
+        if thirds[2]:
+            channel = int(np.argmax(channels))
+            summary += (
+                f", attacks mostly down the {CHANNELS[channel]} "
+                f"({channels[channel]} of {thirds[2]})"
+            )
+        return summary
+
+
+class ZoneHeatmaps:
+    """Class to follow the zones where each team plays, window after window.
+
+    The heatmap of a team counts its actions with the ball per zone of the grid. Each
+    window is counted at once on the columns of its `EventBatch`, and added to the
+    heatmaps of the game, so a window costs a few vectorized operations whatever the
+    progress of the game.
+    """
+
+    def __init__(self, grid: ZoneGrid | None = None):
+        """Initialize class.
+
+        Args:
+            grid (ZoneGrid | None, optional): zones of the field. Defaults to None
+                (6 columns x 3 rows).
+        """
+        self.grid = grid or ZoneGrid()
+        self.heatmaps: dict[str, np.ndarray] = {}
+
+    def heatmap(self, team: str) -> np.ndarray:
+        """Get the heatmap of a team.
+
+        Args:
+            team (str): name of the team.
+
+        Returns:
+            np.ndarray: The counts of its actions per zone (columns x rows).
+        """
+        heatmap = self.heatmaps.get(team)
+        if heatmap is None:
+            return np.zeros((self.grid.columns, self.grid.rows), dtype=np.int64)
+        return heatmap
+
+    def add_batch(self, batch: EventBatch) -> dict[str, np.ndarray]:
+        """Add the events of a window to the heatmaps.
+
+        Args:
+            batch (EventBatch): The events of the window.
+
+        Returns:
+            dict[str, np.ndarray]: The counts of the window, per team.
+        """
+        counts = self.grid.count_zones(batch)
+        for team, team_counts in counts.items():
+            self.heatmaps[team] = self.heatmap(team) + team_counts
+        return counts
+
+    def summary(self, counts: dict[str, np.ndarray] | None = None) -> str:
+        """Summarize where the teams play, for the prompt.
+
+        Args:
+            counts (dict[str, np.ndarray] | None, optional): counts per team, e.g. of a
+                window. Defaults to None (the heatmaps of the game).
+
+        Returns:
+            str: The summary, one line per team, empty without action.
+        """
+        counts = self.heatmaps if counts is None else counts
+        return "\n".join(
+            self.grid.describe(team, team_counts) for team, team_counts in counts.items()
+        )
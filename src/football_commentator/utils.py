@@ -4,31 +4,83 @@ from functools import cache
 from pathlib import Path
 from typing import Any
 
-import yaml  # type: ignore
-
+from football_commentator.constants import PERIOD_CLOCK_OFFSET_MS
 from football_commentator.event import FootballEvent
 from football_commentator.match_info import Competition, MatchInfo, Team
 
 
+def timestamp_to_milliseconds(timestamp: str) -> int:
+    """Convert an event timestamp to milliseconds since the start of its period.
+
+    Args:
+        timestamp (str): timestamp of the event (HH:MM:SS.fff).
+
+    Returns:
+        int: The number of milliseconds.
+    """
+    hours, minutes, seconds = timestamp.split(":")
+    whole_seconds, _, fraction = seconds.partition(".")
+    return (
+        (int(hours) * 60 + int(minutes)) * 60_000
+        + int(whole_seconds) * 1000
+        + (int(fraction[:3].ljust(3, "0")) if fraction else 0)
+    )
+
+
+def compute_match_clock(period: int, timestamp: str) -> int:
+    """Compute the game clock of an event, monotonic over all periods.
+
+    Args:
+        period (int): period of the game (1 and 2 for halves, 3 and 4 for extra time ..)
+        timestamp (str): timestamp of the event within its period (HH:MM:SS.fff).
+
+    Returns:
+        int: The game clock in milliseconds.
+    """
+    return (period - 1) * PERIOD_CLOCK_OFFSET_MS + timestamp_to_milliseconds(timestamp)
+
+
+def clock_to_timestamp(clock: int) -> str:
+    """Format the position of a game clock within its period as a timestamp.
+
+    Args:
+        clock (int): The game clock in milliseconds.
+
+    Returns:
+        str: The timestamp within the period (HH:MM:SS.fff).
+    """
+    minutes, milliseconds = divmod(clock % PERIOD_CLOCK_OFFSET_MS, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"00:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
 def filter_timestamp_event(event: FootballEvent, start: int, end: int) -> bool:
     """Get only events from a time range.
 
     Args:
         event (FootballEvent): a event to verify.
-        start (int): Start of the time interval (in sec)
-        end (int): End of the time interval (in sec)
+        start (int): Start of the time interval (in sec, within the period of the event)
+        end (int): End of the time interval (in sec, within the period of the event)
 
     Returns:
         bool: Either the event is within the range or not.
     """
-    timestamp = event.timestamp
-    timestamp_minutes = int(timestamp[3:5])
-    timestamp_seconds = int(timestamp[6:8])
-
-    timestamp_total_sec = 60 * timestamp_minutes + timestamp_seconds
+    timestamp_total_sec = (event.clock % PERIOD_CLOCK_OFFSET_MS) // 1000
     return start <= timestamp_total_sec <= end
 
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text, about 4 characters per token.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The number of tokens.
+    """
+    return max(1, len(text) // 4)
+
+
 def format_events_to_string(list_events: list[FootballEvent]) -> str:
     """Format the events as str before calling LLM.
 
@@ -97,6 +149,8 @@ def load_match_info_from_config(path_to_yaml: Path) -> MatchInfo:
     Returns:
         MatchInfo: A MatchInfo object representing the game.
     """
+    import yaml  # type: ignore
+
     with open(path_to_yaml) as match_info_file:
         match_info = yaml.safe_load(match_info_file)
         # The YAML file is okay, check if all manadatory fields exist.
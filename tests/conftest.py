@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+
+def make_raw_event(
+    index,
+    timestamp,
+    event_type="Pass",
+    team="Chelsea FCW",
+    player="Millie Bright",
+    period=1,
+    location=(60.0, 40.0),
+    details=None,
+):
+    event = {
+        "id": f"event-{index}",
+        "index": index,
+        "period": period,
+        "timestamp": timestamp,
+        "minute": int(timestamp[3:5]) + 45 * (period - 1),
+        "second": int(timestamp[6:8]),
+        "type": {"id": 30, "name": event_type},
+        "team": {"id": 971, "name": team},
+    }
+    if player is not None:
+        event["player"] = {"id": 4640, "name": player}
+    if location is not None:
+        event["location"] = list(location)
+    if details is not None:
+        event[event_type.lower().replace(" ", "_")] = details
+    return event
+
+
+@pytest.fixture
+def raw_events():
+    return [
+        make_raw_event(1, "00:00:00.000", event_type="Starting XI", player=None, location=None),
+        make_raw_event(2, "00:00:01.200", details={"height": {"id": 1, "name": "Ground Pass"}}),
+        make_raw_event(3, "00:00:05.000", event_type="Ball Receipt*", player="Sam Kerr"),
+        make_raw_event(4, "00:00:19.900", event_type="Pressure", team="Manchester City WFC"),
+        make_raw_event(5, "00:00:21.000", event_type="Pass", team="Manchester City WFC"),
+        make_raw_event(
+            6,
+            "00:00:44.500",
+            event_type="Shot",
+            player="Sam Kerr",
+            location=(110.0, 38.0),
+            details={"outcome": {"id": 97, "name": "Goal"}, "statsbomb_xg": 0.41},
+        ),
+        make_raw_event(7, "00:00:02.000", period=2, team="Manchester City WFC"),
+        make_raw_event(8, "00:00:30.000", period=2, event_type="Pressure"),
+    ]
+
+
+@pytest.fixture
+def events_file(tmp_path, raw_events):
+    path = tmp_path / "events.json"
+    path.write_text(json.dumps(raw_events))
+    return path
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import shutil
+import sys
+from pathlib import Path
+
+from football_commentator import batch
+from football_commentator.backends.openai_backend import OpenAIBackend
+from football_commentator.batch import load_done_windows, run_batch
+
+METADATA_TEMPLATE = Path(__file__).parents[1] / "match_metadata_template.yaml"
+
+
+def make_corpus(tmp_path, events_file):
+    events_dir, metadata_dir = tmp_path / "events", tmp_path / "metadata"
+    events_dir.mkdir()
+    metadata_dir.mkdir()
+    shutil.copy(events_file, events_dir / "game.json")
+    shutil.copy(events_file, events_dir / "no_metadata.json")
+    shutil.copy(METADATA_TEMPLATE, metadata_dir / "game.yaml")
+    return events_dir, metadata_dir
+
+
+def test_batch_comments_all_windows_and_resumes(tmp_path, events_file):
+    events_dir, metadata_dir = make_corpus(tmp_path, events_file)
+    calls = []
+
+    async def commentate(events):
+        calls.append(len(events))
+        return f"{len(events)} events"
+
+    report = asyncio.run(
+        run_batch(events_dir, metadata_dir, tmp_path / "output", commentate, workers=1)
+    )
+    # 44.5s of first half + 30s of second half
+    assert report.matches == 1
+    assert report.windows == 4
+    assert sum(calls) == 7
+    assert set(report.errors) == {"no_metadata"}
+
+    lines = [json.loads(line) for line in open(tmp_path / "output" / "game.jsonl")]
+    assert {line["home_team"] for line in lines} == {"Chelsea LFC"}
+    assert sorted(line["window"] for line in lines) == [0, 1, 2, 3]
+
+    report = asyncio.run(
+        run_batch(events_dir, metadata_dir, tmp_path / "output", commentate, workers=1)
+    )
+    assert report.windows == 0
+    assert report.skipped_windows == 4
+
+
+def test_failed_windows_are_retried(tmp_path, events_file):
+    events_dir, metadata_dir = make_corpus(tmp_path, events_file)
+
+    async def failing(events):
+        if len(events) == 3:
+            raise TimeoutError
+        return "ok"
+
+    report = asyncio.run(run_batch(events_dir, metadata_dir, tmp_path / "output", failing))
+    assert report.failed_windows == 1
+    assert load_done_windows(tmp_path / "output" / "game.jsonl") == {1, 2, 3}
+
+
+def test_interrupted_output_is_repaired(tmp_path, events_file):
+    events_dir, metadata_dir = make_corpus(tmp_path, events_file)
+    shutil.copy(metadata_dir / "game.yaml", metadata_dir / "no_metadata.yaml")
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    with open(output_dir / "game.jsonl", "w") as output:
+        output.write(json.dumps({"window": 0, "commentary": "ok"}) + "\n")
+        output.write('{"window": 1, "comm')
+
+    async def commentate(events):
+        return "ok"
+
+    report = asyncio.run(
+        run_batch(events_dir, metadata_dir, output_dir, commentate, workers=1, max_matches=1)
+    )
+    assert report.matches == 2
+    assert report.skipped_windows == 1
+    lines = [json.loads(line) for line in open(output_dir / "game.jsonl")]
+    assert sorted(line["window"] for line in lines) == [0, 1, 2, 3]
+
+
+def test_main_builds_only_the_selected_backend(tmp_path, events_file, monkeypatch, capsys):
+    events_dir, metadata_dir = make_corpus(tmp_path, events_file)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    def no_openai(*args, **kwargs):
+        raise AssertionError("The OpenAI backend is built.")
+
+    monkeypatch.setattr(OpenAIBackend, "__init__", no_openai)
+    arguments = [str(events_dir), str(metadata_dir), str(tmp_path / "output")]
+    monkeypatch.setattr(sys, "argv", ["batch", *arguments, "--backend", "fake", "--workers", "1"])
+    batch.main()
+    assert "1 matches, 4 windows commented" in capsys.readouterr().out
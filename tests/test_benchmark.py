@@ -0,0 +1,68 @@
+import json
+
+from football_commentator.benchmark import suite
+from football_commentator.benchmark.suite import (BENCHMARKS,
+                                                  compare_to_baseline,
+                                                  missing_decoder, run_suite,
+                                                  save_baseline)
+from football_commentator.benchmark.synthetic import (generate_match_events,
+                                                      write_match_events)
+from football_commentator.data.decoding import get_decoder
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+
+
+def test_synthetic_match_is_seeded():
+    assert generate_match_events(200, seed=1) == generate_match_events(200, seed=1)
+    assert generate_match_events(200, seed=1) != generate_match_events(200, seed=2)
+    assert len(generate_match_events(200)) == 200
+
+
+def test_synthetic_match_is_processed_like_statsbomb(tmp_path):
+    path = write_match_events(tmp_path / "game.json", 1000)
+    store = JSONPreprocessor(source=path).event_store
+    assert len(store) == 998  # Starting XI are skipped
+    assert set(store.period_durations) == {1, 2}
+
+
+def test_suite_saves_and_compares_baselines(tmp_path):
+    results = run_suite([300], repeat=1)
+    assert {result.name for result in results} == {
+        name for name in BENCHMARKS if missing_decoder(name) is None
+    }
+    assert all(result.items > 0 for result in results)
+
+    save_baseline(results, tmp_path / "baseline.json")
+    baseline = json.loads((tmp_path / "baseline.json").read_text())
+    assert compare_to_baseline(results, baseline) == []
+
+    baseline["results"]["json_load@300"]["items_per_second"] *= 10
+    assert compare_to_baseline(results, baseline)[0].startswith("json_load@300")
+
+
+def test_benchmarks_ignore_the_match_cache(tmp_path, monkeypatch):
+    path = write_match_events(tmp_path / "game.json", 300)
+    options = []
+
+    class RecordingPreprocessor(JSONPreprocessor):
+        def __init__(self, **kwargs):
+            options.append(kwargs)
+            super().__init__(**kwargs)
+
+    monkeypatch.setattr(suite, "JSONPreprocessor", RecordingPreprocessor)
+    for name, benchmark in BENCHMARKS.items():
+        if name != "match_cache_load" and missing_decoder(name) is None:
+            assert benchmark(path)() > 0
+    assert options and all(option["cache_dir"] is None for option in options)
+
+
+def test_benchmarks_of_missing_decoders_are_skipped(monkeypatch):
+    def without_orjson(name):
+        if name == "orjson":
+            raise ImportError("No module named 'orjson'")
+        return get_decoder(name)
+
+    monkeypatch.setattr(suite, "get_decoder", without_orjson)
+    assert missing_decoder("json_load_orjson") == "orjson"
+    assert missing_decoder("json_load") is None
+    results = run_suite([300], names=["json_load", "json_load_orjson"], repeat=1)
+    assert [result.name for result in results] == ["json_load"]
@@ -0,0 +1,113 @@
+import threading
+
+from football_commentator.broadcast import CommentaryBroadcast
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.pipeline import LookAheadCommentator
+
+
+def make_broadcast(events_file, calls):
+    store = JSONPreprocessor(source=events_file).event_store
+
+    def commentate(events):
+        calls.append(len(events))
+        return f"{len(events)} events"
+
+    return CommentaryBroadcast(LookAheadCommentator(store, commentate=commentate, lookahead=1))
+
+
+def test_viewers_share_one_generation(events_file):
+    calls = []
+    broadcast = make_broadcast(events_file, calls)
+    broadcast.tick(elapsed=0)
+    broadcast.commentator._futures[broadcast.commentator.window(0)].result()
+    broadcast.tick(elapsed=20_000)
+    broadcast.commentator._futures[broadcast.commentator.window(1)].result()
+
+    viewers = [broadcast.entries_since(0) for _ in range(10)]
+    assert all(viewer == viewers[0] for viewer in viewers)
+    entries, cursor = viewers[0]
+    assert [entry["Time"] for entry in entries] == ["00'00", "00'20"]
+    assert cursor == 2
+    assert calls == [3, 1]  # first window, and the next one generated ahead
+    assert broadcast.entries_since(cursor) == ([], 2)
+
+
+def test_entries_since_waits_for_publication(events_file):
+    broadcast = make_broadcast(events_file, [])
+    received = []
+    viewer = threading.Thread(target=lambda: received.append(broadcast.entries_since(1, 5)))
+    viewer.start()
+    broadcast.tick(elapsed=0)
+    broadcast.commentator._futures[broadcast.commentator.window(0)].result()
+    broadcast.tick(elapsed=20_000)
+    viewer.join()
+    assert received[0][1] == 2
+
+
+def test_producer_thread_publishes(events_file):
+    broadcast = make_broadcast(events_file, [])
+    broadcast.tick_duration = 0.01
+    broadcast.start()
+    broadcast.start_time -= 20
+    entries, _ = broadcast.entries_since(1, timeout=5)
+    broadcast.stop()
+    assert entries[0]["Commentary"] == "3 events"
+
+
+def test_streamed_entry_is_shared_until_published(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    first_part, release = threading.Event(), threading.Event()
+
+    def commentate(events):
+        yield "Bright "
+        first_part.set()
+        release.wait(timeout=5)
+        yield "scores!"
+
+    broadcast = CommentaryBroadcast(LookAheadCommentator(store, commentate=commentate, lookahead=1))
+    broadcast.tick(elapsed=0)
+    first_part.wait(timeout=5)
+    broadcast.tick(elapsed=20_000)
+    assert broadcast.partial_entry == {"Time": "00'20", "Commentary": "Bright "}
+    assert broadcast.entries_since(1) == ([], 1)
+
+    release.set()
+    broadcast.commentator._futures[broadcast.commentator.window(0)].result()
+    broadcast.tick(elapsed=20_000)
+    assert broadcast.partial_entry is None
+    assert broadcast.entries_since(1)[0] == [{"Time": "00'20", "Commentary": "Bright scores!"}]
+
+
+def test_producer_stops_after_the_last_window(events_file):
+    calls = []
+    broadcast = make_broadcast(events_file, calls)
+    broadcast.tick_duration = 0.01
+    broadcast.start()
+    broadcast.start_time -= 3600
+    broadcast._thread.join(timeout=5)
+    assert not broadcast._thread.is_alive()
+    assert broadcast.commentator.finished
+    # 44.5s of first half + 30s of second half, in 20s windows
+    assert len(broadcast.entries) == 1 + 4
+    assert sum(calls) == 7
+    broadcast.stop()
+
+
+def test_producer_survives_a_failed_tick(events_file, monkeypatch):
+    broadcast = make_broadcast(events_file, [])
+    broadcast.tick_duration = 0.01
+    schedule = broadcast.commentator.schedule
+    failures = []
+
+    def failing_schedule(elapsed):
+        if not failures:
+            failures.append(elapsed)
+            raise RuntimeError("Source unavailable.")
+        schedule(elapsed)
+
+    monkeypatch.setattr(broadcast.commentator, "schedule", failing_schedule)
+    broadcast.start()
+    broadcast.start_time -= 20
+    entries, _ = broadcast.entries_since(1, timeout=5)
+    broadcast.stop()
+    assert failures and entries[0]["Commentary"] == "3 events"
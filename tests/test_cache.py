@@ -0,0 +1,43 @@
+import time
+
+from football_commentator.cache import CommentaryCache
+
+
+def test_key_depends_on_model_temperature_and_prompt():
+    key = CommentaryCache.make_key("events", "gpt-4o-mini", 0.05, "1")
+    assert key == CommentaryCache.make_key("events", "gpt-4o-mini", 0.05, "1")
+    assert key != CommentaryCache.make_key("events", "gpt-4o", 0.05, "1")
+    assert key != CommentaryCache.make_key("events", "gpt-4o-mini", 0.5, "1")
+    assert key != CommentaryCache.make_key("events", "gpt-4o-mini", 0.05, "2")
+    assert key != CommentaryCache.make_key("other events", "gpt-4o-mini", 0.05, "1")
+
+
+def test_cache_counts_hits_and_misses(tmp_path):
+    cache = CommentaryCache(path=tmp_path / "cache.sqlite")
+    assert cache.get("window") is None
+    cache.set("window", "What a goal!")
+    assert cache.get("window") == "What a goal!"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    cache.close()
+    assert CommentaryCache(path=tmp_path / "cache.sqlite").get("window") == "What a goal!"
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CommentaryCache(max_entries=2)
+    cache.set("a", "A")
+    time.sleep(0.01)
+    cache.set("b", "B")
+    time.sleep(0.01)
+    cache.get("a")
+    cache.set("c", "C")
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+
+def test_cache_expires_old_entries():
+    cache = CommentaryCache(max_age=0.01)
+    cache.set("a", "A")
+    time.sleep(0.02)
+    assert cache.get("a") is None
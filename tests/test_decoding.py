@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from football_commentator.benchmark.synthetic import write_match_events
+from football_commentator.data.decoding import EventDecoder, get_decoder
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from tests.conftest import make_raw_event
+
+DECODERS = ["json", "orjson", "msgspec"]
+
+
+def _events(path, decoder):
+    # The faster decoders are optional (the 'fast' extra)
+    if decoder != "json":
+        pytest.importorskip(decoder)
+    return JSONPreprocessor(source=path, cache_dir=None, decoder=decoder).event_store
+
+
+@pytest.mark.parametrize("decoder", DECODERS)
+def test_decoders_produce_the_same_events(events_file, decoder):
+    assert _events(events_file, decoder).batch.to_events() == (
+        _events(events_file, "json").batch.to_events()
+    )
+
+
+@pytest.mark.parametrize("decoder", DECODERS)
+def test_decoders_match_on_synthetic_game(tmp_path, decoder):
+    path = write_match_events(tmp_path / "game.json", 2000)
+    assert _events(path, decoder).batch.to_events() == _events(path, "json").batch.to_events()
+
+
+@pytest.mark.parametrize("decoder", DECODERS)
+def test_decoders_read_json_lines(tmp_path, raw_events, decoder):
+    path = tmp_path / "events.jsonl"
+    path.write_text("\n".join(json.dumps(event) for event in raw_events) + "\n")
+    assert len(_events(path, decoder)) == len(raw_events) - 1  # Starting XI is skipped
+
+
+def test_typed_decoder_describes_named_details_only(tmp_path):
+    details = {
+        "outcome": {"id": 97, "name": "Goal"},
+        "end_location": [120.0, 40.0, 1.2],
+        "freeze_frame": [{"location": [1.0, 2.0]}],
+        "aerial_won": True,
+        "assisted_by": {"id": 7},
+    }
+    event = make_raw_event(1, "00:01:00.000", event_type="Shot", player=None, details=details)
+    path = tmp_path / "events.json"
+    path.write_text(json.dumps([event]))
+
+    typed = _events(path, "msgspec").batch.to_events()[0]
+    assert typed == _events(path, "json").batch.to_events()[0]
+    assert typed.description == "Additional Informations: (outcome: Goal)"
+    assert typed.player is None
+
+
+def test_get_decoder():
+    pytest.importorskip("msgspec")
+    assert get_decoder("auto").name == "msgspec"
+    assert type(get_decoder("json")) is EventDecoder
+    with pytest.raises(ValueError, match="not supported"):
+        get_decoder("yaml")
+
+
+def test_all_paths_describe_the_declared_details(tmp_path):
+    # A pass also carrying the section of another event type, which is not described
+    details = {
+        "height": {"id": 1, "name": "Ground Pass"},
+        "length": 12.5,
+        "outcome": {"id": 9, "name": "Incomplete"},
+    }
+    event = make_raw_event(1, "00:01:00.000", details=details)
+    event["ball_receipt"] = {"outcome": {"id": 9, "name": "Incomplete"}}
+    path = tmp_path / "events.json"
+    path.write_text(json.dumps([event]))
+
+    description = "Additional Informations: (height: Ground Pass), (outcome: Incomplete)"
+    preprocessor = JSONPreprocessor(source=path, cache_dir=None, decoder="json")
+    assert preprocessor.load_description(event) == description
+    assert preprocessor.load_event_fields(event)["description"] == description
+    assert _events(path, "msgspec").batch.to_events()[0].description == description
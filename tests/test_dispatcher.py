@@ -0,0 +1,362 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from football_commentator.backends.fake import (FakeBackend, FakeLLMError,
+                                                FakeRateLimitError)
+from football_commentator.backends.openai_backend import OpenAIBackend
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.dispatcher import (CircuitBreaker, CircuitOpenError,
+                                             LLMDispatcher, RetryPolicy,
+                                             TokenBucket)
+from football_commentator.llm import CommentatorEngine, degraded_commentary
+from football_commentator.metrics import METRICS
+
+FAST_RETRY = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def flaky(failures, error=FakeRateLimitError):
+    calls = []
+
+    def function():
+        calls.append(len(calls))
+        if len(calls) <= failures:
+            raise error("Rate limit reached.")
+        return "ok"
+
+    return function, calls
+
+
+def test_token_bucket_spreads_the_budget():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=60, capacity=2, clock=clock)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    clock.now = 10.0
+    assert bucket.level == 2
+    bucket.reserve(1)
+    bucket.adjust(-5)
+    assert bucket.level == 2
+    with pytest.raises(ValueError, match="positive"):
+        TokenBucket(rate_per_minute=0)
+
+
+def test_retry_delays_are_bounded():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    dispatcher = LLMDispatcher(seed=0)
+    for attempt in range(6):
+        delay = policy.delay(attempt, dispatcher._random)
+        assert 0 <= delay <= min(5.0, 2**attempt)
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    clock.now = 10.0
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_dispatcher_retries_rate_limits():
+    METRICS.reset()
+    function, calls = flaky(2)
+    dispatcher = LLMDispatcher(retry=FAST_RETRY, seed=0)
+    assert dispatcher.call(function, retryable=(FakeRateLimitError,)) == "ok"
+    assert len(calls) == 3
+    assert METRICS.counter("llm_retries_total", "FakeRateLimitError") == 2
+    assert dispatcher.breaker.state == "closed"
+
+
+def test_dispatcher_raises_other_errors_at_once():
+    function, calls = flaky(1, error=FakeLLMError)
+    with pytest.raises(FakeLLMError):
+        LLMDispatcher(retry=FAST_RETRY).call(function, retryable=(FakeRateLimitError,))
+    assert len(calls) == 1
+
+
+def test_dispatcher_sheds_calls_when_the_circuit_is_open():
+    dispatcher = LLMDispatcher(retry=FAST_RETRY, breaker=CircuitBreaker(failure_threshold=2))
+    function, calls = flaky(10)
+    for _ in range(2):
+        with pytest.raises(CircuitOpenError):
+            dispatcher.call(function, retryable=(FakeRateLimitError,))
+    assert len(calls) == 2
+    assert METRICS.counter("llm_shed_total") >= 2
+
+
+def test_dispatcher_times_out_asynchronous_calls():
+    attempts = []
+
+    async def slow():
+        attempts.append(None)
+        await asyncio.sleep(1 if len(attempts) == 1 else 0)
+        return "ok"
+
+    dispatcher = LLMDispatcher(retry=FAST_RETRY, timeout=0.05)
+    assert asyncio.run(dispatcher.acall(slow)) == "ok"
+    assert len(attempts) == 2
+
+
+def test_dispatcher_retries_streams_until_their_first_part():
+    attempts = []
+
+    def stream(fail_after):
+        def function():
+            attempts.append(None)
+            if len(attempts) == 1:
+                yield from ["a", "b"][:fail_after]
+                raise FakeRateLimitError("Rate limit reached.")
+            yield from ["a", "b"]
+
+        return function
+
+    dispatcher = LLMDispatcher(retry=FAST_RETRY)
+    assert list(dispatcher.stream(stream(0), retryable=(FakeRateLimitError,))) == ["a", "b"]
+    attempts.clear()
+    parts = []
+    with pytest.raises(FakeRateLimitError):
+        for part in dispatcher.stream(stream(1), retryable=(FakeRateLimitError,)):
+            parts.append(part)
+    assert parts == ["a"] and len(attempts) == 1
+
+
+def test_dispatcher_waits_for_the_requests_budget():
+    dispatcher = LLMDispatcher(requests_per_minute=600)
+    dispatcher.requests = TokenBucket(rate_per_minute=600, capacity=1)
+    start = time.perf_counter()
+    for _ in range(3):
+        dispatcher.call(lambda: None)
+    assert time.perf_counter() - start >= 0.15
+
+
+def test_dispatcher_reconciles_the_tokens_used():
+    clock = FakeClock()
+    dispatcher = LLMDispatcher(tokens_per_minute=1000)
+    dispatcher.tokens = TokenBucket(rate_per_minute=1000, clock=clock)
+    assert dispatcher._admit(300) == 0
+    dispatcher.record_usage(300, 100)
+    assert dispatcher.tokens.level == 900
+
+
+def test_engine_degrades_when_the_circuit_is_open(events_file):
+    METRICS.reset()
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    breaker = CircuitBreaker()
+    breaker.state, breaker._opened_at = "open", time.monotonic()
+    engine = CommentatorEngine(backend=FakeBackend(), dispatcher=LLMDispatcher(breaker=breaker))
+    commentary = engine.invoke(events)
+    assert commentary == degraded_commentary(events) == "Shot for Chelsea FCW by Sam Kerr, goal."
+    assert list(engine.stream(events)) == [commentary]
+    assert asyncio.run(engine.ainvoke(events)) == commentary
+    assert METRICS.counter("llm_degraded_total", "fake") == 3
+    assert degraded_commentary([]) == "The game goes on."
+
+
+class ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """Stand-in of an OpenAI-compatible server, failing the first requests."""
+
+    rate_limited = 1
+    error_status = 429
+    requests: list[dict] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+        if len(self.requests) <= self.rate_limited:
+            payload = {"error": {"message": "Rate limit reached.", "type": "requests"}}
+            self._send(self.error_status, payload, {"Retry-After": "0"})
+            return
+        completion = {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "Goal for the home side!"},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 5, "total_tokens": 55},
+        }
+        self._send(200, completion)
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def provider():
+    handler = type("Handler", (ChatCompletionsHandler,), {"requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def openai_engine(server, dispatcher):
+    backend = OpenAIBackend(
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="test", max_retries=0
+    )
+    return CommentatorEngine(backend=backend, dispatcher=dispatcher)
+
+
+def test_openai_rate_limits_are_retried(provider, events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    dispatcher = LLMDispatcher(tokens_per_minute=100_000, retry=FAST_RETRY)
+    engine = openai_engine(provider, dispatcher)
+    assert engine.invoke(events) == "Goal for the home side!"
+    assert len(provider.RequestHandlerClass.requests) == 2
+    assert asyncio.run(engine.ainvoke(events)) == "Goal for the home side!"
+    engine.close()
+
+
+@pytest.mark.parametrize("status", [408, 409, 500, 503])
+def test_openai_server_errors_are_retried(provider, events_file, status):
+    provider.RequestHandlerClass.error_status = status
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    engine = openai_engine(provider, LLMDispatcher(retry=FAST_RETRY))
+    assert engine.invoke(events) == "Goal for the home side!"
+    assert len(provider.RequestHandlerClass.requests) == 2
+    engine.close()
+
+
+def test_openai_server_errors_are_degraded(provider, events_file):
+    provider.RequestHandlerClass.rate_limited = 100
+    provider.RequestHandlerClass.error_status = 502
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    engine = openai_engine(provider, LLMDispatcher(retry=FAST_RETRY))
+    assert engine.invoke(events) == degraded_commentary(events)
+    assert len(provider.RequestHandlerClass.requests) == 4
+    engine.close()
+
+
+def test_openai_rate_limits_open_the_circuit(provider, events_file):
+    provider.RequestHandlerClass.rate_limited = 100
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    breaker = CircuitBreaker(failure_threshold=2)
+    engine = openai_engine(provider, LLMDispatcher(retry=FAST_RETRY, breaker=breaker))
+    assert engine.invoke(events) == degraded_commentary(events)
+    assert breaker.state == "open"
+    assert engine.invoke(events) == degraded_commentary(events)
+    assert len(provider.RequestHandlerClass.requests) == 2
+    engine.close()
+
+
+def test_dispatcher_only_counts_provider_failures():
+    breaker = CircuitBreaker(failure_threshold=1)
+    dispatcher = LLMDispatcher(retry=FAST_RETRY, breaker=breaker)
+    function, calls = flaky(1, error=FakeLLMError)
+    with pytest.raises(FakeLLMError):
+        dispatcher.call(function, retryable=(FakeRateLimitError,))
+    assert breaker.state == "closed" and breaker.failures == 0
+    function, calls = flaky(1, error=ConnectionError)
+    with pytest.raises(CircuitOpenError):
+        dispatcher.call(function)
+    assert len(calls) == 1
+
+
+def half_open_dispatcher():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    return LLMDispatcher(retry=FAST_RETRY, breaker=breaker), breaker
+
+
+def test_interrupted_probes_are_released():
+    dispatcher, breaker = half_open_dispatcher()
+
+    async def cancelled():
+        raise asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(dispatcher.acall(cancelled))
+    assert breaker.state == "open" and breaker.allow()
+
+    dispatcher, breaker = half_open_dispatcher()
+    parts = dispatcher.stream(lambda: iter(["a", "b"]))
+    assert next(parts) == "a"
+    parts.close()
+    assert breaker.state == "open" and breaker.allow()
+
+
+def test_streams_only_count_provider_failures():
+    def stream(error):
+        def function():
+            yield "a"
+            raise error("Failed.")
+
+        return function
+
+    breaker = CircuitBreaker(failure_threshold=1)
+    dispatcher = LLMDispatcher(retry=FAST_RETRY, breaker=breaker)
+    with pytest.raises(FakeLLMError):
+        list(dispatcher.stream(stream(FakeLLMError), retryable=(FakeRateLimitError,)))
+    assert breaker.state == "closed"
+    with pytest.raises(FakeRateLimitError):
+        list(dispatcher.stream(stream(FakeRateLimitError), retryable=(FakeRateLimitError,)))
+    assert breaker.state == "open"
+
+
+def test_engine_leaves_the_retries_to_the_dispatcher():
+    dispatcher = LLMDispatcher(timeout=5)
+    backends = [
+        OpenAIBackend(api_key="test"),
+        OpenAIBackend(api_key="test", timeout=10, max_retries=1),
+    ]
+    engines = [CommentatorEngine(backend=backend, dispatcher=dispatcher) for backend in backends]
+    assert (engines[0].llm.max_retries, engines[0].llm.request_timeout) == (0, 5)
+    assert (engines[1].llm.max_retries, engines[1].llm.request_timeout) == (1, 10)
+    # Without dispatcher, the client keeps its own retries
+    engines.append(CommentatorEngine(backend=OpenAIBackend(api_key="test")))
+    assert engines[2].llm.max_retries is None
+    for engine in engines:
+        engine.close()
+
+
+def test_dispatcher_times_out_synchronous_calls(events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    dispatcher = LLMDispatcher(retry=FAST_RETRY, timeout=0.02)
+    engine = CommentatorEngine(backend=FakeBackend(latency_mean=1.0), dispatcher=dispatcher)
+    start = time.perf_counter()
+    assert engine.invoke(events) == degraded_commentary(events)
+    assert list(engine.stream(events)) == [degraded_commentary(events)]
+    assert time.perf_counter() - start < 0.5
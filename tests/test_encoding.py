@@ -0,0 +1,49 @@
+import pytest
+
+from football_commentator.benchmark.prompt_size import compare_prompt_sizes
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.encoding import (compact_description,
+                                           compact_timestamp,
+                                           format_events_compact,
+                                           get_prompt_format)
+
+
+def test_compact_description():
+    description = "Additional Informations: (height: Ground Pass), (outcome: Incomplete)"
+    assert compact_description(description) == "height=Ground Pass;outcome=Incomplete"
+    assert compact_description("Additional Informations: ") == ""
+
+
+def test_format_events_compact(events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    header, codes, *rows = format_events_compact(events).split("\n")
+    assert header.startswith("time|team|player|event|x,y|details")
+    assert codes == "PAS=Pass, REC=Ball Receipt*, PRE=Pressure, SHO=Shot"
+    assert len(rows) == len(events)
+    assert rows[0] == "00:01|Chelsea FCW|Millie Bright|PAS|60,40|height=Ground Pass"
+    # Team and player are only given when they change
+    assert rows[1] == "00:05||Sam Kerr|REC|60,40|"
+    assert "Additional Informations" not in "\n".join(rows)
+
+
+def test_compact_format_is_smaller(events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    sizes = {size.format: size for size in compare_prompt_sizes([events, events[:2]])}
+    assert sizes["compact"].tokens < sizes["verbose"].tokens
+    assert sizes["verbose"].windows == 2
+
+
+def test_unknown_prompt_format():
+    with pytest.raises(ValueError, match="not supported"):
+        get_prompt_format("unknown")
+
+
+def test_compact_rows_give_the_match_time(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    second_half = store.load_events_between(3_600_000, 7_200_000)
+    assert second_half[0].period == 2
+    row = format_events_compact(second_half).split("\n")[2]
+    assert row.startswith(f"45:{second_half[0].timestamp[6:8]}|")
+    assert compact_timestamp("00:05:01.200", period=2) == "50:01"
+    assert compact_timestamp("00:05:01.200") == "05:01"
+    assert compact_timestamp("00:01:00.000", period=3) == "91:00"
@@ -0,0 +1,70 @@
+import numpy as np
+
+from football_commentator.data.event_batch import EventBatch, StringTable
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+
+
+def test_string_table_interns_values():
+    table = StringTable(["Pass"])
+    assert table.code("Pass") == 0
+    assert table.code("Shot") == 1
+    assert table.code("Shot") == 1
+    assert table.code(None) == -1
+    assert table.value(1) == "Shot"
+    assert table.value(-1) is None
+
+
+def test_batch_round_trips_football_events(events_file):
+    preprocessor = JSONPreprocessor(source=events_file)
+    expected = [
+        preprocessor.process_football_event(raw_event) for raw_event in preprocessor.events
+    ]
+    expected = [event for event in expected if event is not None]
+
+    batch = EventBatch()
+    for event in expected:
+        batch.append(**event.model_dump())
+    assert len(batch) == len(expected)
+    assert batch.to_events() == expected
+
+
+def test_batch_slices_share_tables(events_file):
+    batch = JSONPreprocessor(source=events_file).event_store.batch
+    window = batch[1:3]
+    assert len(window) == 2
+    assert window.tables is batch.tables
+    assert np.array_equal(window.clocks, batch.clocks[1:3])
+    assert len(batch.tables["teams"]) == 2
+
+
+def test_batch_sort_is_stable():
+    batch = EventBatch()
+    for clock, team in [(20, "B"), (10, "A"), (20, "C")]:
+        batch.append(
+            team=team,
+            event_type="Pass",
+            period=1,
+            clock=clock,
+            player=None,
+            position_x=None,
+            position_y=None,
+            description="",
+        )
+    batch.sort()
+    assert [event.team for event in batch.to_events()] == ["A", "B", "C"]
+
+
+def test_empty_batch_grows():
+    empty = {name: column[:0] for name, column in EventBatch().columns.items()}
+    batch = EventBatch(columns=empty)
+    batch.append(
+        team="A",
+        event_type="Pass",
+        period=1,
+        clock=10,
+        player=None,
+        position_x=None,
+        position_y=None,
+        description="",
+    )
+    assert len(batch) == 1 and batch.clocks.tolist() == [10]
@@ -0,0 +1,61 @@
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from tests.conftest import make_raw_event
+
+
+def test_store_skips_starting_xi(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    assert len(store) == 7
+    assert all(event.event_type != "Starting XI" for event in store.load_all_events_in_intervall(0, 3600))
+
+
+def test_store_interval_bounds_are_inclusive(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    assert [event.event_type for event in store.load_all_events_in_intervall(21, 29)] == ["Pass"]
+    assert [event.event_type for event in store.load_all_events_in_intervall(31, 44)] == ["Shot"]
+
+
+def test_preprocessor_reuses_store(events_file):
+    preprocessor = JSONPreprocessor(source=events_file)
+    assert preprocessor.event_store is preprocessor.event_store
+    assert preprocessor.load_all_events_in_intervall(21, 21)[0].team == "Manchester City WFC"
+
+
+def test_store_extend_keeps_events_sorted(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    added = store.extend(
+        [
+            make_raw_event(20, "00:00:43.000", event_type="Duel"),
+            make_raw_event(21, "00:00:22.000", event_type="Dribble"),
+        ]
+    )
+    assert added == 2
+    events = store.load_all_events_in_intervall(start=21, end=29)
+    assert [event.event_type for event in events] == ["Pass", "Dribble"]
+    events = store.load_all_events_in_intervall(start=31, end=44)
+    assert [event.event_type for event in events] == ["Duel", "Shot"]
+
+
+def test_store_separates_periods(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    first_half = store.load_all_events_in_intervall(start=0, end=44)
+    assert {event.period for event in first_half} == {1}
+    assert len(first_half) == 5
+    second_half = store.load_all_events_in_intervall(start=3600, end=3630)
+    assert [event.timestamp for event in second_half] == ["00:00:02.000", "00:00:30.000"]
+
+
+def test_store_windows_are_half_open(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    assert store.load_events_between(start=1200, end=5000)[0].timestamp == "00:00:01.200"
+    assert [event.timestamp for event in store.load_events_between(5000, 19900)] == [
+        "00:00:05.000"
+    ]
+
+
+def test_elapsed_to_clock_chains_periods(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    assert store.period_durations == {1: 44500, 2: 30000}
+    assert store.elapsed_to_clock(10_000) == 10_000
+    assert store.elapsed_to_clock(46_500) == 3_600_000 + 2000
+    assert store.clock_to_elapsed(3_600_000 + 2000) == 46_500
+    assert store.clock_to_elapsed(10_000) == 10_000
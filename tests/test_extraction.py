@@ -0,0 +1,114 @@
+import pytest
+
+from football_commentator.data.extraction import (STATSBOMB_SPEC,
+                                                  ExtractionSpec,
+                                                  compile_extraction_spec)
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from tests.conftest import make_raw_event
+
+FLAT_SPEC = ExtractionSpec(
+    name="flat",
+    event_type=("action",),
+    team=("side",),
+    timestamp=("time",),
+    player=("actor",),
+    position_x=("coordinates", "x"),
+    position_y=("coordinates", "y"),
+    skipped_event_types=frozenset({"Lineup"}),
+    detail_paths={
+        "Shot": {
+            "outcome": ("shot", "outcome", "label"),
+            "body_part": ("shot", "body_part", "label"),
+            "pattern": ("context", "pattern", "label"),
+        }
+    },
+    outcome_detail="outcome",
+)
+
+
+def test_statsbomb_spec_matches_load_methods(events_file, raw_events):
+    preprocessor = JSONPreprocessor(source=events_file, cache_dir=None, decoder="json")
+    extract = compile_extraction_spec(STATSBOMB_SPEC)
+    assert extract(raw_events[0]) is None  # Starting XI
+    for event in raw_events[1:]:
+        fields = extract(event)
+        assert fields is not None
+        assert fields["event_type"] == preprocessor.load_event_type(event)
+        assert fields["team"] == preprocessor.load_team(event)
+        assert fields["player"] == preprocessor.load_player(event)
+        assert (fields["position_x"], fields["position_y"]) == preprocessor.load_loaction(event)
+        assert fields["period"] == preprocessor.load_period(event)
+        assert fields["description"] == preprocessor.load_description(event)
+        assert fields["xg"] == preprocessor.load_xg(event)
+        assert fields["outcome"] == preprocessor.load_outcome(event)
+        assert fields["card"] == preprocessor.load_card(event)
+
+
+def test_statsbomb_spec_handles_missing_optional_fields():
+    event = make_raw_event(1, "00:01:00.000", event_type="Half Start", player=None, location=None)
+    del event["period"]
+    fields = compile_extraction_spec(STATSBOMB_SPEC)(event)
+    assert fields is not None
+    assert fields["player"] is None
+    assert fields["position_x"] is None and fields["position_y"] is None
+    assert fields["period"] == 1 and fields["clock"] == 60_000
+    assert fields["description"] == "Additional Informations: "
+
+
+def test_spec_of_another_provider():
+    extract = compile_extraction_spec(FLAT_SPEC)
+    assert extract({"action": "Lineup", "side": "Home", "time": "00:00:00"}) is None
+
+    fields = extract(
+        {
+            "action": "Shot",
+            "side": "Home",
+            "time": "00:10:05.500",
+            "actor": "Sam Kerr",
+            "coordinates": {"x": 110.0, "y": 38.0},
+            "shot": {"outcome": {"label": "Saved"}, "body_part": {"label": "Head"}},
+            "context": {"outcome": {"label": "Rebound"}, "pattern": {"label": "Counter"}},
+        }
+    )
+    assert fields == {
+        "timestamp": "00:10:05.500",
+        "period": 1,
+        "clock": 605_500,
+        "event_type": "Shot",
+        "team": "Home",
+        "player": "Sam Kerr",
+        "position_x": 110.0,
+        "position_y": 38.0,
+        # Only the declared details are described
+        "description": (
+            "Additional Informations: (outcome: Saved), (body_part: Head), (pattern: Counter)"
+        ),
+        "xg": None,
+        "outcome": "Saved",
+        "card": None,
+    }
+
+
+def test_spec_rejects_empty_paths():
+    with pytest.raises(ValueError, match="at least one key"):
+        compile_extraction_spec(ExtractionSpec(name="empty", event_type=(), team=(), timestamp=()))
+    with pytest.raises(ValueError, match="detail path"):
+        compile_extraction_spec(
+            ExtractionSpec(
+                name="short",
+                event_type=("type",),
+                team=("team",),
+                timestamp=("time",),
+                detail_paths={"Shot": {"outcome": ("outcome", "name")}},  # type: ignore
+            )
+        )
+
+
+def test_json_preprocessor_extracts_with_statsbomb_spec(events_file):
+    preprocessor = JSONPreprocessor(source=events_file, cache_dir=None, decoder="json")
+    details = {"outcome": {"id": 97, "name": "Goal"}}
+    event = make_raw_event(1, "00:00:44.500", event_type="Shot", details=details)
+    assert JSONPreprocessor.extraction_spec is STATSBOMB_SPEC
+    assert preprocessor.load_event_fields(event)["description"] == (
+        "Additional Informations: (outcome: Goal)"
+    )
@@ -0,0 +1,50 @@
+import json
+import shutil
+
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.ingest import CorpusIndex, run_ingestion
+
+
+def make_corpus(tmp_path, events_file):
+    events_dir, matches_dir = tmp_path / "events", tmp_path / "matches" / "37"
+    (events_dir / "season").mkdir(parents=True)
+    matches_dir.mkdir(parents=True)
+    shutil.copy(events_file, events_dir / "101.json")
+    shutil.copy(events_file, events_dir / "season" / "102.json")
+    (events_dir / "season" / "broken.json").write_text('[{"period": 1}]')
+    match = {
+        "match_id": 101,
+        "match_date": "2020-02-29",
+        "competition": {"competition_name": "FA Women's Super League"},
+        "season": {"season_name": "2019/2020"},
+        "home_team": {"home_team_name": "Chelsea FCW"},
+        "away_team": {"away_team_name": "Manchester City WFC"},
+    }
+    (matches_dir / "42.json").write_text(json.dumps([match]))
+    return events_dir, matches_dir.parent
+
+
+def test_ingestion_converts_indexes_and_resumes(tmp_path, events_file):
+    events_dir, matches_dir = make_corpus(tmp_path, events_file)
+    output_dir = tmp_path / "corpus"
+    report = run_ingestion(events_dir, output_dir, matches_dir, workers=1)
+    assert (report.converted, report.skipped, report.failed) == (2, 0, 1)
+    assert list(report.errors) == [str(events_dir / "season" / "broken.json")]
+
+    index = CorpusIndex(output_dir / "index.sqlite")
+    assert [match["match_id"] for match in index.find(team="Manchester City WFC")] == [
+        "101",
+        "102",
+    ]
+    [match] = index.find(competition="FA Women's Super League")
+    assert (match["match_id"], match["season"], match["events"]) == ("101", "2019/2020", 7)
+    assert index.find(match_id="broken") == []
+    assert list(index.errors()) == list(report.errors)
+
+    # The converted game is loaded without parsing its JSON
+    preprocessor = JSONPreprocessor(source=events_dir / "101.json", cache_dir=output_dir / "matches")
+    assert preprocessor.cached
+    index.close()
+
+    report = run_ingestion(events_dir, output_dir, matches_dir, workers=1)
+    assert (report.converted, report.skipped, report.failed) == (0, 2, 1)
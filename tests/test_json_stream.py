@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from football_commentator.data.json_stream import (JSONEventsDecoder,
+                                                   JSONEventsTail,
+                                                   iter_json_events)
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from tests.conftest import make_raw_event
+
+
+def test_decoder_handles_events_split_between_chunks():
+    text = json.dumps([{"a": 1}, {"b": {"c": [1, 2]}}, {"d": "x]"}])
+    decoder = JSONEventsDecoder()
+    events = []
+    for position in range(0, len(text), 7):
+        events += decoder.feed(text[position : position + 7])
+    decoder.close()
+    assert events == [{"a": 1}, {"b": {"c": [1, 2]}}, {"d": "x]"}]
+
+
+def test_decoder_rejects_truncated_event():
+    decoder = JSONEventsDecoder()
+    assert list(decoder.feed('[{"a": 1}, {"b": ')) == [{"a": 1}]
+    with pytest.raises(ValueError, match="Invalid JSON event"):
+        decoder.close()
+
+
+def test_decoder_skips_malformed_events(caplog):
+    decoder = JSONEventsDecoder()
+    assert list(decoder.feed('[{"a": 1}, {"b": tru}, {"c": "}"')) == [{"a": 1}]
+    assert list(decoder.feed('}, {"d": [1,, 2]}\n{"e": 5}]')) == [{"c": "}"}, {"e": 5}]
+    decoder.close()
+    assert decoder.pending == ""
+    assert caplog.text.count("Skipped a malformed JSON event") == 2
+
+
+def test_iter_json_events_matches_json_load(events_file, raw_events):
+    assert list(iter_json_events(events_file, chunk_size=50)) == raw_events
+
+
+def test_tail_reads_only_appended_events(tmp_path, raw_events):
+    source = tmp_path / "live.jsonl"
+    source.write_text("".join(json.dumps(event) + "\n" for event in raw_events[:3]))
+    tail = JSONEventsTail(source, chunk_size=64)
+    assert list(tail.read_new_events()) == raw_events[:3]
+    assert list(tail.read_new_events()) == []
+
+    with open(source, "a") as file:
+        file.write(json.dumps(raw_events[3]) + "\n" + json.dumps(raw_events[4])[:20])
+    assert list(tail.read_new_events()) == [raw_events[3]]
+    with open(source, "a") as file:
+        file.write(json.dumps(raw_events[4])[20:] + "\n")
+    assert list(tail.read_new_events()) == [raw_events[4]]
+
+
+def test_streaming_store_follows_the_source(tmp_path, raw_events):
+    source = tmp_path / "live.json"
+    source.write_text("[" + ",".join(json.dumps(event) for event in raw_events[:4]))
+    store = JSONPreprocessor(source=source, streaming=True).event_store
+    assert len(store) == 3
+
+    with open(source, "a") as file:
+        file.write("," + json.dumps(make_raw_event(9, "00:00:10.000", event_type="Duel")) + "]")
+    assert store.refresh() == 1
+    assert [event.event_type for event in store.load_all_events_in_intervall(5, 15)] == [
+        "Ball Receipt*",
+        "Duel",
+    ]
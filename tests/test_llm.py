@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from football_commentator.backends import get_backend
+from football_commentator.backends.fake import (FakeBackend, FakeChatModel,
+                                                FakeLLMError,
+                                                FakeRateLimitError)
+from football_commentator.cache import CommentaryCache
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.llm import CommentatorEngine
+from football_commentator.metrics import METRICS
+
+
+def test_engine_builds_model_once(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    backend = get_backend("openai", max_connections=2)
+    engine = CommentatorEngine(model_name="gpt-4o-mini", temperature=0.3, backend=backend)
+    assert engine.llm.temperature == 0.3
+    assert engine.llm.model_name == "gpt-4o-mini"
+    assert engine.llm.root_client._client is backend.http_client
+    engine.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="not supported"):
+        get_backend("unknown")
+
+
+def test_fake_backend_is_deterministic(events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    first = CommentatorEngine(backend=FakeBackend(seed=3)).invoke(events)
+    assert first == CommentatorEngine(backend=FakeBackend(seed=3)).invoke(events)
+    assert "mostly pass" in first
+    assert asyncio.run(CommentatorEngine(backend=FakeBackend(seed=3)).ainvoke(events)) == first
+
+
+def test_fake_model_simulates_latency_and_errors():
+    model = FakeChatModel(latency_mean=0.5, tokens_per_second=10, seed=1)
+    _, latency, usage = model._simulate("Pass Pass Shot")
+    assert latency == pytest.approx(0.5 + usage["output_tokens"] / 10)
+
+    failing = FakeChatModel(error_rate=1.0)
+    with pytest.raises(FakeLLMError):
+        failing.invoke("Pass")
+
+
+def test_fake_model_enforces_tokens_per_minute():
+    model = FakeChatModel(tokens_per_minute=30)
+    model.invoke("x" * 40)
+    with pytest.raises(FakeRateLimitError):
+        model.invoke("x" * 40)
+
+
+def test_engine_serves_repeated_windows_from_cache(events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    cache = CommentaryCache()
+    engine = CommentatorEngine(backend=FakeBackend(), cache=cache)
+    assert engine.invoke(events) == engine.invoke(events)
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+    # The state of the game is part of the prompt
+    engine.invoke(events, match_context="Score: Chelsea FCW 1 - Manchester City WFC 0")
+    assert cache.stats()["entries"] == 2
+
+
+def test_engine_streams_commentary(events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    cache = CommentaryCache()
+    engine = CommentatorEngine(backend=FakeBackend(tokens_per_second=1000), cache=cache)
+    parts = list(engine.stream(events))
+    assert len(parts) > 1
+    assert "".join(parts) == CommentatorEngine(backend=FakeBackend()).invoke(events)
+    # The streamed commentary is cached whole
+    assert list(engine.stream(events)) == ["".join(parts)]
+    assert METRICS.stage_count("llm_first_token") >= 1
+
+
+def test_engine_streams_commentary_asynchronously(events_file):
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    engine = CommentatorEngine(backend=FakeBackend())
+
+    async def collect():
+        return [part async for part in engine.astream(events)]
+
+    assert "".join(asyncio.run(collect())) == engine.invoke(events)
@@ -0,0 +1,42 @@
+import json
+import os
+
+import numpy as np
+
+from football_commentator.data.match_cache import MatchCache
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from tests.conftest import make_raw_event
+
+
+def test_cached_store_matches_source(events_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    converted = JSONPreprocessor(source=events_file, cache_dir=cache_dir)
+    assert not converted.cached
+    store = converted.event_store
+    assert converted.cached
+
+    preprocessor = JSONPreprocessor(source=events_file, cache_dir=cache_dir)
+    assert preprocessor.cached
+    assert preprocessor.events == []  # The JSON is not parsed
+    cached_store = preprocessor.event_store
+    assert isinstance(cached_store.batch.clocks, np.memmap)
+    assert cached_store.period_durations == store.period_durations
+    assert cached_store.load_events_between(0, 10**8) == store.load_events_between(0, 10**8)
+
+
+def test_cache_follows_source(events_file, raw_events, tmp_path):
+    cache = MatchCache(events_file, tmp_path)
+    assert not cache.is_valid()
+    JSONPreprocessor(source=events_file, cache_dir=tmp_path).event_store  # noqa: B018
+    assert cache.is_valid()
+
+    # Touched without change, the content hash keeps the cache
+    os.utime(events_file, ns=(0, 0))
+    assert cache.is_valid()
+
+    raw_events[1] = make_raw_event(2, "00:00:01.300")
+    events_file.write_text(json.dumps(raw_events))
+    assert not cache.is_valid()
+    store = JSONPreprocessor(source=events_file, cache_dir=tmp_path).event_store
+    assert store.load_events_between(0, 2000)[0].timestamp == "00:00:01.300"
+    assert cache.is_valid()
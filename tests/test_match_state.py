@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from football_commentator.app.render import render_scoreboard
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.event import FootballEvent
+from football_commentator.match_state import MatchState, MatchStateAggregator
+from tests.conftest import make_raw_event
+
+HOME = "Chelsea FCW"
+AWAY = "Manchester City WFC"
+
+
+def event(clock, event_type="Pass", team=HOME, outcome=None, card=None, period=1, xg=None):
+    # The statistics only read the structured fields, not the description
+    return FootballEvent(
+        team=team,
+        event_type=event_type,
+        timestamp="00:00:00.000",
+        period=period,
+        clock=clock,
+        player=None,
+        position_x=None,
+        position_y=None,
+        description="Additional Informations: ",
+        xg=xg,
+        outcome=outcome,
+        card=card,
+    )
+
+
+GAME = [
+    event(0),
+    event(10_000, "Shot", outcome="Saved", xg=0.1),
+    event(12_000, "Pass", team=AWAY),
+    event(30_000, "Shot", team=AWAY, outcome="Goal", xg=0.4),
+    event(31_000, "Foul Committed", card="Yellow Card"),
+    event(40_000, "Own Goal For"),
+    event(45_000, "Bad Behaviour", team=AWAY, card="Second Yellow"),
+    event(3_600_000, "Substitution", team=AWAY, period=2),
+    event(3_605_000, "Shot", team=AWAY, outcome="Off T", xg=0.05, period=2),
+]
+
+
+def test_state_keeps_running_totals():
+    state = MatchState()
+    for game_event in GAME:
+        state.update(game_event)
+    home, away = state.team(HOME), state.team(AWAY)
+    assert (home.goals, away.goals) == (1, 1)
+    assert (home.shots, home.shots_on_target) == (1, 1)
+    assert (away.shots, away.shots_on_target) == (2, 1)
+    assert away.xg == pytest.approx(0.45)
+    assert (home.yellow_cards, away.red_cards) == (1, 1)
+    assert away.substitutions == 1
+    # Away keeps the ball after its goal, until the end of the first half, and the
+    # second half starts without possession
+    assert home.possession_ms == 12_000
+    assert away.possession_ms == 33_000
+    assert state.possession_share(HOME) == pytest.approx(12 / 45)
+    assert state.summary().splitlines()[0] == f"Score: {HOME} 1 - {AWAY} 1"
+
+
+def test_empty_state():
+    state = MatchState()
+    assert state.summary() == ""
+    assert state.team(HOME).goals == 0
+    assert state.possession_share(HOME) == 0.0
+
+
+@pytest.mark.parametrize("checkpoint_interval", [1, 2, 256])
+def test_snapshots_replay_the_game(checkpoint_interval):
+    aggregator = MatchStateAggregator(checkpoint_interval=checkpoint_interval)
+    aggregator.extend(GAME)
+    for position, game_event in enumerate(GAME):
+        expected = MatchState()
+        for previous in GAME[:position]:
+            expected.update(previous)
+        assert aggregator.snapshot(game_event.clock) == expected
+    assert aggregator.snapshot() == aggregator.snapshot(10_000_000)
+    assert aggregator.snapshot(0) == MatchState()
+
+
+def test_late_events_are_inserted_in_order():
+    aggregator = MatchStateAggregator(checkpoint_interval=2)
+    aggregator.extend(GAME[:3] + GAME[4:])
+    aggregator.update(GAME[3])
+    in_order = MatchStateAggregator(checkpoint_interval=2)
+    in_order.extend(GAME)
+    assert len(aggregator) == len(GAME)
+    assert aggregator.snapshot() == in_order.snapshot()
+    assert aggregator.snapshot(40_000) == in_order.snapshot(40_000)
+
+
+def test_xg_is_extracted_from_shots(events_file):
+    store = JSONPreprocessor(source=events_file, cache_dir=None).event_store
+    events = store.load_events_between(0, 10_000_000)
+    assert [shot.xg for shot in events if shot.event_type == "Shot"] == [0.41]
+    aggregator = MatchStateAggregator()
+    aggregator.extend(events)
+    assert aggregator.snapshot().team(HOME).xg == pytest.approx(0.41)
+
+
+def test_cards_of_fouls_are_described(events_file):
+    details = {"card": {"id": 7, "name": "Yellow Card"}}
+    raw_event = make_raw_event(9, "00:01:00.000", event_type="Foul Committed", details=details)
+    preprocessor = JSONPreprocessor(source=events_file, cache_dir=None, decoder="json")
+    foul = preprocessor.process_football_event(raw_event)
+    assert "(card: Yellow Card)" in foul.description
+    assert foul.card == "Yellow Card" and foul.outcome is None
+
+
+@pytest.mark.parametrize("decoder", ["json", "msgspec"])
+def test_outcomes_and_cards_are_kept_by_the_store(tmp_path, decoder):
+    if decoder != "json":
+        pytest.importorskip(decoder)
+    raw_events = [
+        make_raw_event(1, "00:00:10.000", event_type="Shot", details={"outcome": {"name": "Goal"}}),
+        make_raw_event(
+            2, "00:00:20.000", event_type="Foul Committed", details={"card": {"name": "Red Card"}}
+        ),
+    ]
+    path = tmp_path / "events.json"
+    path.write_text(json.dumps(raw_events))
+    store = JSONPreprocessor(source=path, cache_dir=tmp_path / "cache", decoder=decoder).event_store
+    shot, foul = store.batch.to_events()
+    assert (shot.outcome, shot.card, foul.outcome, foul.card) == ("Goal", None, None, "Red Card")
+    cached = JSONPreprocessor(source=path, cache_dir=tmp_path / "cache").event_store
+    assert cached.batch.to_events() == [shot, foul]
+
+
+def test_scoreboard_shows_the_state():
+    state = MatchState()
+    for game_event in GAME:
+        state.update(game_event)
+    html = render_scoreboard(state, HOME, AWAY)
+    assert "1 - 1" in html
+    assert "0.10" in html and "0.45" in html
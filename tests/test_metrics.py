@@ -0,0 +1,67 @@
+import json
+import pstats
+import urllib.request
+
+from football_commentator.backends.fake import FakeBackend
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.llm import CommentatorEngine
+from football_commentator.metrics import (METRICS, PipelineMetrics, profile,
+                                          start_metrics_server)
+
+
+def test_spans_are_exported_as_prometheus_histograms(tmp_path):
+    metrics = PipelineMetrics(trace_path=tmp_path / "trace.jsonl")
+    with metrics.span("llm", window=3) as span:
+        span["events"] = 12
+    metrics.observe("llm", 0.2)
+    metrics.count("llm_tokens_total", 42, label="prompt")
+
+    text = metrics.to_prometheus()
+    assert 'football_commentator_stage_duration_seconds_count{stage="llm"} 2' in text
+    assert 'football_commentator_stage_duration_seconds_bucket{stage="llm",le="0.25"} 2' in text
+    assert 'football_commentator_llm_tokens_total{kind="prompt"} 42' in text
+
+    spans = [json.loads(line) for line in open(tmp_path / "trace.jsonl")]
+    assert spans[0]["stage"] == "llm"
+    assert spans[0]["events"] == 12
+    assert spans[0]["window"] == 3
+
+
+def test_engine_records_stages_and_tokens(events_file):
+    METRICS.reset()
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    CommentatorEngine(backend=FakeBackend()).invoke(events)
+    assert METRICS.stage_count("json_load") == 1
+    assert METRICS.stage_count("prompt_format") == 1
+    assert METRICS.stage_count("llm") == 1
+    assert METRICS.counter("llm_tokens_total", label="prompt") > 0
+    assert METRICS.counter("llm_tokens_total", label="completion") > 0
+
+
+def test_metrics_server():
+    metrics = PipelineMetrics()
+    metrics.count("llm_calls_total")
+    server = start_metrics_server(0, metrics)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    with urllib.request.urlopen(url) as response:
+        assert "football_commentator_llm_calls_total 1" in response.read().decode()
+    server.shutdown()
+
+
+def test_profile_dumps_stats(tmp_path):
+    with profile(tmp_path / "tick.prof"):
+        sum(range(1000))
+    assert pstats.Stats(str(tmp_path / "tick.prof")).total_calls > 0
+
+
+def test_llm_spans_record_the_tokens_of_each_call(events_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(METRICS, "trace_path", tmp_path / "trace.jsonl")
+    events = JSONPreprocessor(source=events_file).load_all_events_in_intervall(0, 44)
+    engine = CommentatorEngine(backend=FakeBackend())
+    engine.invoke(events)
+    list(engine.stream(events))
+    spans = [json.loads(line) for line in open(tmp_path / "trace.jsonl")]
+    spans = [span for span in spans if span["stage"] == "llm"]
+    assert len(spans) == 2
+    for span in spans:
+        assert span["input_tokens"] > 0 and span["output_tokens"] > 0
@@ -0,0 +1,210 @@
+import json
+import threading
+
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.match_state import MatchStateAggregator
+from football_commentator.pipeline import (LookAheadCommentator,
+                                          WindowScheduler)
+from tests.conftest import make_raw_event
+
+
+def wait_for_generations(commentator):
+    for future in list(commentator._futures.values()):
+        future.result()
+
+
+def test_replay_generates_windows_ahead(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    calls = []
+
+    def commentate(events):
+        calls.append([event.event_type for event in events])
+        return f"{len(events)} events"
+
+    commentator = LookAheadCommentator(store, commentate=commentate, lookahead=2)
+    commentator.schedule(elapsed=0)
+    wait_for_generations(commentator)
+    assert len(calls) == 2
+    assert commentator.pop_ready(elapsed=19_999) == []
+
+    ready = commentator.pop_ready(elapsed=40_000)
+    assert [(window.timer, text) for window, text in ready] == [
+        ("00'20", "3 events"),
+        ("00'40", "1 events"),
+    ]
+
+
+def test_windows_are_commented_with_the_match_state(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    contexts = []
+
+    def commentate(events, match_context):
+        contexts.append(match_context)
+        return "ok"
+
+    match_state = MatchStateAggregator()
+    commentator = LookAheadCommentator(
+        store, commentate=commentate, lookahead=3, match_state=match_state
+    )
+    commentator.schedule(elapsed=0)
+    wait_for_generations(commentator)
+    # The first window starts before any event
+    first, *others = sorted(contexts)
+    assert first == ""
+    score = "Score: Chelsea FCW 0 - Manchester City WFC 0"
+    assert len(others) == 2 and all(context.startswith(score) for context in others)
+    # The state follows the submitted windows, the goal is in the third one
+    assert match_state.snapshot().team("Chelsea FCW").goals == 1
+    assert match_state.snapshot(store.elapsed_to_clock(40_000)).team("Chelsea FCW").goals == 0
+
+
+def test_pop_ready_keeps_window_order():
+    release = threading.Event()
+
+    class Store:
+        duration = 3_600_000
+
+        def elapsed_to_clock(self, elapsed):
+            return elapsed
+
+        def load_events_between(self, start, end):
+            return []
+
+        def load_batch_between(self, start, end):
+            class Batch:
+                def to_events(self):
+                    return [start]
+
+            return Batch()
+
+    def commentate(events):
+        if events == [0]:
+            release.wait(timeout=5)
+        return str(events[0])
+
+    commentator = LookAheadCommentator(Store(), commentate=commentate, lookahead=2)
+    commentator.schedule(elapsed=0)
+    commentator._futures[commentator.window(1)].result()
+    assert commentator.pop_ready(elapsed=60_000) == []
+    release.set()
+    wait_for_generations(commentator)
+    assert [text for _, text in commentator.pop_ready(elapsed=60_000)] == ["0", "20000"]
+
+
+def test_live_mode_waits_for_closed_windows(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    commentator = LookAheadCommentator(store, commentate=lambda events: "ok", live=True)
+    commentator.schedule(elapsed=19_000)
+    assert commentator._futures == {}
+    commentator.schedule(elapsed=20_000)
+    wait_for_generations(commentator)
+    assert [window.index for window, _ in commentator.pop_ready(elapsed=20_000)] == [0]
+
+
+def test_failed_window_is_skipped(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+
+    def commentate(events):
+        if len(events) == 3:
+            raise TimeoutError
+        return "ok"
+
+    commentator = LookAheadCommentator(store, commentate=commentate, lookahead=2)
+    commentator.schedule(elapsed=0)
+    errors = [future.exception() for future in commentator._futures.values()]
+    assert isinstance(errors[0], TimeoutError)
+    assert [window.index for window, _ in commentator.pop_ready(elapsed=40_000)] == [1]
+
+
+def test_streamed_commentary_is_partial_until_done(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    first_part, release = threading.Event(), threading.Event()
+
+    def commentate(events):
+        yield "Bright "
+        first_part.set()
+        release.wait(timeout=5)
+        yield "scores!"
+
+    commentator = LookAheadCommentator(store, commentate=commentate, lookahead=1)
+    commentator.schedule(elapsed=0)
+    first_part.wait(timeout=5)
+    assert commentator.partial(elapsed=19_999) is None
+    window, text = commentator.partial(elapsed=20_000)
+    assert (window.index, text) == (0, "Bright ")
+    assert commentator.pop_ready(elapsed=20_000) == []
+
+    release.set()
+    wait_for_generations(commentator)
+    assert [text for _, text in commentator.pop_ready(elapsed=20_000)] == ["Bright scores!"]
+    assert commentator.partial(elapsed=20_000) is None
+
+
+def test_scheduler_closes_window_after_shot(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    scheduler = WindowScheduler(store, close_on_score=10.0)
+    assert scheduler.next_window(0, 0, horizon=20_000).end == 20_000
+    assert scheduler.next_window(2, 40_000, horizon=47_000) is None
+    assert scheduler.next_window(2, 40_000, horizon=47_500).end == 47_500  # shot at 44.5s
+
+
+def test_scheduler_merges_quiet_windows(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    scheduler = WindowScheduler(store, quiet_events=2)
+    assert scheduler.next_window(0, 0, horizon=100_000).end == 20_000
+    assert scheduler.next_window(1, 20_000, horizon=59_999) is None
+    assert scheduler.next_window(1, 20_000, horizon=100_000).end == 60_000
+    scheduler.max_duration = 20_000
+    assert scheduler.next_window(1, 20_000, horizon=100_000).end == 40_000
+
+
+def test_live_mode_catches_up_after_stall(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    commentator = LookAheadCommentator(store, commentate=lambda events: "ok", live=True)
+    commentator.schedule(elapsed=0)
+    commentator.schedule(elapsed=65_000)
+    windows = [(window.start, window.end) for window in commentator._windows]
+    assert windows == [(0, 20_000), (20_000, 40_000), (40_000, 60_000)]
+    wait_for_generations(commentator)
+    assert len(commentator.pop_ready(elapsed=65_000)) == 3
+
+
+def test_live_windows_follow_the_feed_after_half_time(tmp_path, raw_events, caplog):
+    source = tmp_path / "live.jsonl"
+    source.write_text("".join(json.dumps(event) + "\n" for event in raw_events[:6]))
+    store = JSONPreprocessor(source=source, streaming=True).event_store
+    commented = []
+
+    def commentate(events):
+        commented.extend(event.clock for event in events)
+        return "ok"
+
+    commentator = LookAheadCommentator(store, commentate=commentate, live=True)
+    commentator.schedule(elapsed=47_000)
+    windows = [(window.start, window.end) for window in commentator._windows]
+    assert windows == [(0, 20_000)]  # The feed is only 4.5s past the second window
+
+    late_events = [
+        make_raw_event(9, "00:00:10.000", event_type="Duel"),  # Its window is closed
+        make_raw_event(10, "00:00:38.000", event_type="Duel"),  # Within the grace
+    ]
+    second_half = [
+        make_raw_event(11, "00:00:02.000", period=2),
+        make_raw_event(12, "00:00:30.000", period=2),
+        make_raw_event(13, "00:00:45.000", period=2),
+    ]
+    with open(source, "a") as file:
+        file.writelines(json.dumps(event) + "\n" for event in late_events + second_half)
+    # After a break of 15 minutes, the windows follow the clock of the second half
+    commentator.schedule(elapsed=47_000 + 900_000 + 45_000)
+    windows = [(window.start, window.end) for window in commentator._windows]
+    assert windows == [(0, 20_000), (20_000, 40_000), (40_000, 60_000), (60_000, 80_000)]
+    assert "Skipped 1 events received after their window closed" in caplog.text
+
+    wait_for_generations(commentator)
+    assert len(commentator.pop_ready(elapsed=992_000)) == 4
+    assert 38_000 in commented
+    assert sorted(clock for clock in commented if clock > 3_600_000) == [
+        3_602_000,
+        3_630_000,
+    ]
@@ -0,0 +1,69 @@
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from pathlib import Path
+
+import pytest
+
+from football_commentator import plugins
+from football_commentator.backends import get_backend
+from football_commentator.backends.fake import FakeBackend
+from football_commentator.benchmark.startup import parse_import_times
+from football_commentator.data import get_source
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.plugins import PluginRegistry
+
+
+def test_registry_imports_plugins_once_selected():
+    registry = PluginRegistry("tests.plugins", "plugin", {"missing": "not_a_module:Plugin"})
+    registry.register("date", "datetime:date")
+    assert registry.load("date").__name__ == "date"
+    assert registry.create("date", year=2024, month=5, day=18).day == 18
+    with pytest.raises(ModuleNotFoundError):
+        registry.load("missing")
+
+
+def test_registry_discovers_entry_points(monkeypatch):
+    entry_point = EntryPoint("path", "pathlib:Path", "tests.plugins")
+    monkeypatch.setattr(
+        plugins, "entry_points", lambda group: [entry_point] if group == "tests.plugins" else []
+    )
+    registry = PluginRegistry("tests.plugins", "plugin")
+    assert registry.names() == ["path"]
+    assert registry.load("path") is Path
+    with pytest.raises(ValueError, match="The plugin 'other' is not supported."):
+        registry.load("other")
+
+
+def test_builtin_plugins(events_file):
+    assert isinstance(get_backend("fake", seed=1), FakeBackend)
+    source = get_source("json", source=events_file, cache_dir=None)
+    assert isinstance(source, JSONPreprocessor)
+    assert len(source.event_store) == 7
+
+
+def test_heavy_dependencies_are_imported_lazily():
+    code = (
+        "import sys; import football_commentator.pipeline, football_commentator.backends; "
+        "print(sorted(m for m in ('langchain_core', 'openai', 'yaml') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert output.stdout.strip() == "[]"
+
+
+def test_parse_import_times():
+    report = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 | encodings",
+            "import time:      1000 |       3000 | site",
+            "import time:       500 |        500 |   json.decoder",
+            "import time:       250 |        750 | json",
+            "import time:       100 |        850 | football_commentator",
+        ]
+    )
+    assert parse_import_times(report) == {
+        "json.decoder": 0.0005,
+        "json": 0.00075,
+        "football_commentator": 0.00085,
+    }
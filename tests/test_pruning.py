@@ -0,0 +1,52 @@
+from football_commentator.event import FootballEvent
+from football_commentator.pruning import (PASS_SEQUENCE, collapse_pass_chains,
+                                          prune_events, score_event)
+
+
+def make_event(second, event_type="Pass", team="Chelsea FCW", x=60.0, outcome=None):
+    return FootballEvent(
+        team=team,
+        event_type=event_type,
+        timestamp=f"00:00:{second:02d}.000",
+        clock=1000 * second,
+        player=f"Player {second}",
+        position_x=x,
+        position_y=40.0,
+        description="",
+        outcome=outcome,
+    )
+
+
+def test_score_favours_dangerous_events():
+    shot = make_event(1, "Shot", x=110.0)
+    assert score_event(shot) > score_event(make_event(1, "Shot", x=50.0))
+    assert score_event(make_event(1, "Pass", x=110.0)) < score_event(shot)
+    assert score_event(make_event(1, "Shot", outcome="Goal")) > score_event(shot)
+
+
+def test_collapse_pass_chains():
+    events = [
+        make_event(1),
+        make_event(2, "Ball Receipt*"),
+        make_event(3),
+        make_event(4, "Ball Receipt*"),
+        make_event(5, "Shot"),
+        make_event(6, team="Manchester City WFC"),
+        make_event(7, team="Manchester City WFC"),
+    ]
+    collapsed = collapse_pass_chains(events)
+    assert [event.event_type for event in collapsed] == [PASS_SEQUENCE, "Shot", "Pass", "Pass"]
+    assert collapsed[0].clock == 1000
+    assert "(passes: 2)" in collapsed[0].description
+    assert "Player 4" in collapsed[0].description
+
+
+def test_prune_events_keeps_important_events_within_budget():
+    events = [make_event(second, "Pressure", team=str(second)) for second in range(30)]
+    events.insert(10, make_event(10, "Shot", x=112.0))
+    pruned = prune_events(events, token_budget=200)
+    assert any(event.event_type == "Shot" for event in pruned)
+    assert len(pruned) < len(events)
+    assert sum(len(str(event)) // 4 for event in pruned) <= 200
+    assert [event.clock for event in pruned] == sorted(event.clock for event in pruned)
+    assert len(prune_events(events[:1], token_budget=1)) == 1
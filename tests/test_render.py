@@ -0,0 +1,72 @@
+from football_commentator.app.render import (CommentaryFeed,
+                                             CommentaryHistory,
+                                             render_commentary_html)
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.body = None
+        self.updates = 0
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.body = body
+        self.updates += 1
+
+
+def entry(index):
+    return {"Time": f"00'{index:02d}", "Commentary": f"Commentary {index}"}
+
+
+def test_feed_only_sends_new_entries():
+    slots = [FakePlaceholder() for _ in range(3)]
+    feed = CommentaryFeed(slots)
+    assert feed.append([entry(0)]) == 1
+    assert feed.append([]) == 0
+    assert feed.append([entry(1)]) == 1
+    assert [slot.updates for slot in slots] == [1, 1, 0]
+
+
+def test_feed_caps_visible_entries():
+    slots = [FakePlaceholder() for _ in range(3)]
+    feed = CommentaryFeed(slots)
+    feed.append([entry(index) for index in range(2)])
+    assert feed.append([entry(2), entry(3)]) == 3
+    assert feed.visible == [entry(1), entry(2), entry(3)]
+    assert "Commentary 1" in slots[0].body
+    assert "Commentary 3" in slots[2].body
+
+
+def test_commentary_html_contains_all_entries():
+    html = render_commentary_html([entry(0), entry(1)])
+    assert html.startswith('<div class="commentary-container">')
+    assert html.count("commentary-entry") == 2
+
+
+def test_feed_renders_partial_entry_apart():
+    slots, partial_slot = [FakePlaceholder() for _ in range(2)], FakePlaceholder()
+    feed = CommentaryFeed(slots, partial_slot=partial_slot)
+    assert feed.show_partial({"Time": "00'20", "Commentary": "Bright"})
+    assert not feed.show_partial({"Time": "00'20", "Commentary": "Bright"})
+    assert feed.show_partial({"Time": "00'20", "Commentary": "Bright scores"})
+    assert "Bright scores" in partial_slot.body
+    feed.append([{"Time": "00'20", "Commentary": "Bright scores!"}])
+    assert feed.show_partial(None)
+    assert partial_slot.body == ""
+    assert partial_slot.updates == 3
+    assert [slot.updates for slot in slots] == [1, 0]
+
+
+def test_history_follows_the_entries_leaving_the_feed():
+    slot = FakePlaceholder()
+    history = CommentaryHistory(slot, page_size=2)
+    assert history.update([entry(0), entry(1)])
+    assert slot.body.count("commentary-entry") == 0
+    assert not history.update([entry(0), entry(1)])
+    history.update([entry(index) for index in range(5)])
+    assert "Commentary 1" in slot.body and "Commentary 2" in slot.body
+    assert "Commentary 0" not in slot.body
+
+    older = CommentaryHistory(FakePlaceholder(), page_size=2, pages_back=1)
+    older.update([entry(index) for index in range(5)])
+    assert older.slot.body.count("commentary-entry") == 1
+    assert "Commentary 0" in older.slot.body
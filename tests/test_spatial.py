@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from football_commentator.data.event_batch import EventBatch
+from football_commentator.data.preprocessor_json import JSONPreprocessor
+from football_commentator.match_state import MatchStateAggregator
+from football_commentator.pipeline import LookAheadCommentator
+from football_commentator.spatial import ZoneGrid, ZoneHeatmaps
+
+HOME = "Chelsea FCW"
+AWAY = "Manchester City WFC"
+
+
+def make_batch(actions):
+    batch = EventBatch()
+    for clock, (team, event_type, x, y) in enumerate(actions):
+        batch.append(
+            team=team,
+            event_type=event_type,
+            period=1,
+            clock=clock,
+            player=None,
+            position_x=x,
+            position_y=y,
+            description="",
+        )
+    return batch
+
+
+def test_zones_of_positions():
+    grid = ZoneGrid(columns=6, rows=3)
+    zones = grid.zones(
+        np.array([0.0, 119.9, 120.0, 65.0, np.nan]), np.array([0.0, 79.9, 80.0, 40.0, 10.0])
+    )
+    assert zones.tolist() == [0, 17, 17, 3 * 3 + 1, -1]
+
+
+def test_grid_must_split_in_thirds():
+    with pytest.raises(ValueError, match="multiples of 3"):
+        ZoneGrid(columns=4)
+
+
+def test_counts_only_actions_with_the_ball():
+    batch = make_batch(
+        [
+            (HOME, "Pass", 100.0, 5.0),
+            (HOME, "Carry", 110.0, 10.0),
+            (HOME, "Shot", 112.0, 40.0),
+            (HOME, "Pass", 30.0, 70.0),
+            (HOME, "Pressure", 110.0, 70.0),
+            (HOME, "Pass", None, None),
+            (AWAY, "Pass", 60.0, 75.0),
+        ]
+    )
+    grid = ZoneGrid()
+    counts = grid.count_zones(batch)
+    assert set(counts) == {HOME, AWAY}
+    assert counts[HOME].sum() == 4
+    assert grid.thirds(counts[HOME]).tolist() == [1, 0, 3]
+    assert grid.attacking_channels(counts[HOME]).tolist() == [2, 1, 0]
+    assert grid.describe(HOME, counts[HOME]) == (
+        f"{HOME}: 4 actions, 75% in the final third, attacks mostly down the left (2 of 3)"
+    )
+    assert grid.describe(AWAY, counts[AWAY]) == f"{AWAY}: 1 actions, 0% in the final third"
+
+
+def test_heatmaps_add_the_windows():
+    heatmaps = ZoneHeatmaps()
+    first = heatmaps.add_batch(make_batch([(HOME, "Pass", 100.0, 5.0)]))
+    heatmaps.add_batch(make_batch([(HOME, "Pass", 100.0, 75.0), (AWAY, "Shot", 110.0, 40.0)]))
+    assert heatmaps.heatmap(HOME).sum() == 2
+    assert heatmaps.heatmap("Unknown").sum() == 0
+    assert heatmaps.summary(first) == (
+        f"{HOME}: 1 actions, 100% in the final third, attacks mostly down the left (1 of 1)"
+    )
+    assert len(heatmaps.summary().splitlines()) == 2
+    assert ZoneHeatmaps().summary() == ""
+
+
+def test_windows_are_commented_with_the_field(events_file):
+    store = JSONPreprocessor(source=events_file).event_store
+    contexts = []
+
+    def commentate(events, match_context):
+        contexts.append(match_context)
+        return "ok"
+
+    commentator = LookAheadCommentator(
+        store,
+        commentate=commentate,
+        lookahead=1,
+        match_state=MatchStateAggregator(),
+        heatmaps=ZoneHeatmaps(),
+    )
+    commentator.schedule(elapsed=0)
+    commentator._futures[commentator.window(0)].result()
+    assert contexts == [
+        f"Field in this window:\n{HOME}: 2 actions, 0% in the final third\n\n"
+        f"Field since the kick off:\n{HOME}: 2 actions, 0% in the final third"
+    ]
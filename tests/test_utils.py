@@ -0,0 +1,35 @@
+from football_commentator.event import FootballEvent
+from football_commentator.utils import (compute_match_clock,
+                                        filter_timestamp_event,
+                                        timestamp_to_milliseconds)
+
+
+def test_timestamp_to_milliseconds():
+    assert timestamp_to_milliseconds("00:00:00.000") == 0
+    assert timestamp_to_milliseconds("00:45:12.345") == 2_712_345
+    assert timestamp_to_milliseconds("01:00:01.5") == 3_601_500
+    assert timestamp_to_milliseconds("00:01:02") == 62_000
+
+
+def test_match_clock_is_monotonic_over_periods():
+    end_of_first_half = compute_match_clock(1, "00:48:59.999")
+    start_of_second_half = compute_match_clock(2, "00:00:00.000")
+    assert end_of_first_half < start_of_second_half
+    assert compute_match_clock(2, "00:00:01.000") == start_of_second_half + 1000
+
+
+def test_filter_timestamp_event_keeps_seconds_and_inclusive_end():
+    event = FootballEvent(
+        team="Chelsea FCW",
+        event_type="Pass",
+        timestamp="00:00:44.500",
+        period=2,
+        clock=compute_match_clock(2, "00:00:44.500"),
+        player=None,
+        position_x=None,
+        position_y=None,
+        description="",
+    )
+    assert filter_timestamp_event(event, 0, 44)
+    assert filter_timestamp_event(event, 44, 60)
+    assert not filter_timestamp_event(event, 0, 43)